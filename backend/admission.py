@@ -0,0 +1,157 @@
+"""Per-tenant admission control for the API.
+
+Every tenant shares one deployment, so a single tenant's burst (a badge printing
+run, thousands of scanner saves, a stack of exports) must not eat the capacity
+everyone else depends on. Routes opt in with ``Depends(admit("<class>"))``:
+
+* each (tenant, route class) pair has its own token bucket, so one tenant running
+  dry never delays another tenant's requests;
+* route classes marked heavy also take one of ``ADMISSION_HEAVY_CONCURRENCY`` slots
+  per tenant until the response has been sent in full. FastAPI runs the exit code
+  of yield dependencies before a ``StreamingResponse`` body goes out, so the slot is
+  handed back by ``AdmissionMiddleware`` instead of the dependency.
+
+Requests over the limit wait their turn (FIFO per tenant) rather than failing, and
+only get a 429 with ``Retry-After`` after ``ADMISSION_MAX_WAIT`` seconds. Limits are
+enforced per API process; divide the rates by the worker count if needed.
+
+Rates are requests per minute and can be overridden per class, e.g.
+``ADMISSION_RATE_SCAN=3000``. ``ADMISSION_ENABLED=0`` turns admission off entirely,
+for load tests that measure raw capacity (see ``tests/perf/loadtest.py``).
+"""
+import asyncio
+import math
+import os
+import time
+from collections import defaultdict
+from typing import Dict, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+
+from auth import get_current_user
+from metrics import ADMISSION_HEAVY_ACTIVE, ADMISSION_REJECTED, ADMISSION_WAIT, ADMISSION_WAITING
+
+# route class -> (requests per minute, burst size, heavy)
+ROUTE_CLASSES: Dict[str, Tuple[int, int, bool]] = {
+    "scan": (1200, 200, False),   # lead capture from scanner apps
+    "print": (600, 50, False),    # single badge renders, previews and spooling
+    "bulk": (30, 5, True),        # exports, batch prints, campaigns, syncs
+}
+ADMISSION_HEAVY_CONCURRENCY = int(os.getenv('ADMISSION_HEAVY_CONCURRENCY', '2'))
+ADMISSION_MAX_WAIT = float(os.getenv('ADMISSION_MAX_WAIT', '30'))
+ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', '1') != '0'
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at rate_per_minute; waiters are served FIFO"""
+
+    def __init__(self, rate_per_minute: int, capacity: float = None):
+        self.rate_per_minute = rate_per_minute
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(self.rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int = 1):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+def _class_rate(route_class: str) -> Tuple[int, int]:
+    rate, burst, _ = ROUTE_CLASSES[route_class]
+    return int(os.getenv(f'ADMISSION_RATE_{route_class.upper()}', str(rate))), burst
+
+
+class TenantAdmission:
+    """Buckets and heavy-operation slots for every tenant seen by this process"""
+
+    def __init__(self):
+        self.buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self.heavy_slots: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(ADMISSION_HEAVY_CONCURRENCY)
+        )
+
+    def bucket(self, tenant_id: str, route_class: str) -> TokenBucket:
+        bucket = self.buckets.get((tenant_id, route_class))
+        if bucket is None:
+            rate, burst = _class_rate(route_class)
+            bucket = self.buckets[(tenant_id, route_class)] = TokenBucket(rate, burst)
+        return bucket
+
+    async def enter(self, tenant_id: str, route_class: str):
+        await self.bucket(tenant_id, route_class).acquire()
+        if ROUTE_CLASSES[route_class][2]:
+            await self.heavy_slots[tenant_id].acquire()
+            ADMISSION_HEAVY_ACTIVE.labels(tenant_id).inc()
+
+    def leave(self, tenant_id: str, route_class: str):
+        if ROUTE_CLASSES[route_class][2]:
+            self.heavy_slots[tenant_id].release()
+            ADMISSION_HEAVY_ACTIVE.labels(tenant_id).dec()
+
+
+tenant_admission = TenantAdmission()
+
+
+class AdmissionMiddleware:
+    """Releases what ``admit`` took once the response, streamed or not, has been sent"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        held = scope["admission_held"] = []
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            for tenant_id, route_class in held:
+                tenant_admission.leave(tenant_id, route_class)
+
+
+def admit(route_class: str):
+    """Route dependency that admits the caller's tenant under `route_class`"""
+    if route_class not in ROUTE_CLASSES:
+        raise ValueError(f"Unknown route class {route_class!r}")
+
+    async def dependency(request: Request, current_user: dict = Depends(get_current_user)):
+        if not ADMISSION_ENABLED:
+            yield
+            return
+        tenant_id = current_user["tenant_id"]
+        start = time.perf_counter()
+        ADMISSION_WAITING.labels(tenant_id, route_class).inc()
+        try:
+            await asyncio.wait_for(tenant_admission.enter(tenant_id, route_class), ADMISSION_MAX_WAIT)
+        except asyncio.TimeoutError:
+            ADMISSION_REJECTED.labels(tenant_id, route_class).inc()
+            rate, _ = _class_rate(route_class)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests for this organisation, please retry shortly",
+                headers={"Retry-After": str(max(1, math.ceil(60 / rate)))},
+            )
+        finally:
+            ADMISSION_WAITING.labels(tenant_id, route_class).dec()
+        ADMISSION_WAIT.labels(tenant_id, route_class).observe(time.perf_counter() - start)
+        held = request.scope.get("admission_held")
+        if held is not None:
+            held.append((tenant_id, route_class))
+            yield
+            return
+        # Mounted without AdmissionMiddleware: release when the dependency exits
+        try:
+            yield
+        finally:
+            tenant_admission.leave(tenant_id, route_class)
+
+    return dependency
@@ -0,0 +1,71 @@
+"""Move finished events to cold storage, or bring one back.
+
+Usage (from the backend directory):
+    python archive_events.py archive --event-id <id>             # one event that has ended
+    python archive_events.py archive --ended-before 2025-01-01   # every event that ended before a date
+    python archive_events.py archive --event-id <id> --force     # even if it hasn't ended
+    python archive_events.py restore --event-id <id>
+
+Runs the same code as the event_archive / event_restore jobs, in this process.
+Archives are written under ARCHIVE_DIR (see cold_storage.py).
+"""
+import argparse
+import asyncio
+import logging
+
+from database import db, close_clients
+from routers.archive import archive_event, event_is_finished, restore_event
+
+logger = logging.getLogger("archive_events")
+
+
+async def archive(event_id: str = None, ended_before: str = None, force: bool = False):
+    if event_id:
+        events = await db.events.find({"event_id": event_id}, {"_id": 0}).to_list(1)
+    else:
+        events = await db.events.find(
+            {"dates.end": {"$lt": ended_before}, "archive_status": {"$ne": "archived"}}, {"_id": 0}
+        ).to_list(None)
+    if not events:
+        logger.info("No matching events")
+    for event in events:
+        if not force and not event_is_finished(event):
+            logger.info(f"Skipping {event['event_id']}: it hasn't ended (use --force)")
+            continue
+        result = await archive_event(db, event)
+        logger.info(f"Archived {event['event_id']} ({event.get('name')}): {result['archived']}")
+
+
+async def restore(event_id: str):
+    event = await db.events.find_one({"event_id": event_id}, {"_id": 0})
+    if not event:
+        logger.info(f"Event {event_id} not found")
+        return
+    result = await restore_event(db, event)
+    logger.info(f"Restored {event_id}: {result['restored']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive finished events to disk or restore them")
+    commands = parser.add_subparsers(dest="command", required=True)
+    archive_cmd = commands.add_parser("archive")
+    target = archive_cmd.add_mutually_exclusive_group(required=True)
+    target.add_argument("--event-id")
+    target.add_argument("--ended-before", help="ISO date; archives every event whose end date is earlier")
+    archive_cmd.add_argument("--force", action="store_true", help="Archive events that haven't ended yet")
+    restore_cmd = commands.add_parser("restore")
+    restore_cmd.add_argument("--event-id", required=True)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    try:
+        if args.command == "archive":
+            asyncio.run(archive(args.event_id, args.ended_before, args.force))
+        else:
+            asyncio.run(restore(args.event_id))
+    finally:
+        close_clients()
+
+
+if __name__ == "__main__":
+    main()
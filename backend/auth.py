@@ -0,0 +1,96 @@
+from fastapi import HTTPException, status, Request
+from typing import Optional, Dict
+from datetime import datetime, timezone, timedelta
+from functools import lru_cache
+import os
+
+from database import db
+
+# Security
+SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-change-in-production-super-secret-key-eventpass-2025')
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
+
+# passlib/bcrypt and jose are imported on first use to keep worker cold start fast
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def verify_password(plain_password, hashed_password):
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+def get_password_hash(password):
+    return get_pwd_context().hash(password)
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    from jose import jwt
+
+    to_encode = data.copy()
+    if expires_delta:
+        expire = datetime.now(timezone.utc) + expires_delta
+    else:
+        expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire})
+    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return encoded_jwt
+
+def decode_access_token(token: str) -> Optional[dict]:
+    """Token payload, or None if the token is invalid or expired"""
+    from jose import JWTError, jwt
+
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+
+async def get_current_user(request: Request):
+    auth_header = request.headers.get("Authorization")
+    if not auth_header or not auth_header.startswith("Bearer "):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await get_user_from_token(auth_header.split(" ")[1])
+
+async def get_current_user_from_query(request: Request):
+    """For EventSource clients, which can't send headers: accepts ?access_token= as well"""
+    if request.headers.get("Authorization"):
+        return await get_current_user(request)
+    token = request.query_params.get("access_token")
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await get_user_from_token(token)
+
+async def get_user_from_token(token: str):
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    payload = decode_access_token(token)
+    if payload is None or payload.get("sub") is None:
+        raise credentials_exception
+
+    user = await db.users.find_one({"user_id": payload["sub"]}, {"_id": 0})
+    if user is None:
+        raise credentials_exception
+    return user
+
+def require_super_admin(current_user: dict):
+    if current_user["role"] != "super_admin":
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+
+def token_is_super_admin(headers: Dict[str, str]) -> bool:
+    """Used by the profiling middleware, which runs before route dependencies"""
+    auth_header = headers.get("authorization", "")
+    if not auth_header.startswith("Bearer "):
+        return False
+    payload = decode_access_token(auth_header.split(" ")[1])
+    return payload is not None and payload.get("role") == "super_admin"
@@ -0,0 +1,206 @@
+"""Uploaded images for badge templates and the decoded-image cache used to print them.
+
+Assets live in GridFS (bucket ``badge_assets``) and are addressed by the SHA-256 of
+their bytes: uploading the same logo twice stores it once per tenant, and an image
+element's ``content`` is simply the asset id.
+
+Badge rendering is synchronous ReportLab code running on worker threads, so images
+are resolved before a render starts. ``load_badge_images`` returns an ImageReader
+for every asset a template references, taking it from ``badge_image_cache`` when
+this process has already decoded it; ``draw_badge_on_canvas`` only draws what it is
+given. A batch of 5,000 badges sharing a sponsor logo decodes it once per worker,
+and ReportLab embeds it in the PDF once.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from io import BytesIO
+from typing import Any, Dict, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from pymongo.errors import DuplicateKeyError
+
+from metrics import BADGE_IMAGE_CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+BADGE_ASSETS_BUCKET = "badge_assets"
+BADGE_ASSET_MAX_BYTES = int(os.getenv('BADGE_ASSET_MAX_BYTES', str(5 * 1024 * 1024)))
+BADGE_ASSET_MAX_PIXELS = 25_000_000  # well past 600 dpi over a whole 4x6 badge
+BADGE_IMAGE_CACHE_MB = int(os.getenv('BADGE_IMAGE_CACHE_MB', '256'))
+ASSET_CONTENT_TYPES = {"PNG": "image/png", "JPEG": "image/jpeg", "GIF": "image/gif"}
+
+_ASSET_ID = re.compile(r"[0-9a-f]{64}")
+
+
+class InvalidAsset(Exception):
+    pass
+
+
+def asset_id_from_content(content: Optional[str]) -> Optional[str]:
+    """Image elements hold an asset id, or a URL ending in one"""
+    candidate = (content or "").rstrip("/").rsplit("/", 1)[-1]
+    return candidate if _ASSET_ID.fullmatch(candidate) else None
+
+
+def inspect_image(data: bytes) -> Dict[str, Any]:
+    """Content type and size of an uploaded image; raises InvalidAsset for anything else"""
+    from PIL import Image
+
+    if len(data) > BADGE_ASSET_MAX_BYTES:
+        raise InvalidAsset(f"Images are limited to {BADGE_ASSET_MAX_BYTES // (1024 * 1024)} MB")
+    try:
+        with Image.open(BytesIO(data)) as image:
+            image_format = image.format
+            width, height = image.size
+            # Checked before anything is decoded, so a tiny file can't expand into gigabytes
+            if width * height > BADGE_ASSET_MAX_PIXELS:
+                raise InvalidAsset(f"Image is {width}x{height} pixels, too large for a badge")
+            image.verify()
+    except InvalidAsset:
+        raise
+    except Exception as e:
+        raise InvalidAsset("File is not a readable image") from e
+    if image_format not in ASSET_CONTENT_TYPES:
+        raise InvalidAsset(f"Unsupported image format {image_format}; use PNG, JPEG or GIF")
+    return {"content_type": ASSET_CONTENT_TYPES[image_format], "width": width, "height": height}
+
+
+async def ensure_badge_asset_indexes(db):
+    await db.badge_assets.create_index([("tenant_id", 1), ("asset_id", 1)], unique=True)
+
+
+async def store_badge_asset(db, tenant_id: str, filename: str, data: bytes) -> Dict[str, Any]:
+    """Save an image once per tenant and content hash; returns the asset document"""
+    asset_id = hashlib.sha256(data).hexdigest()
+    existing = await db.badge_assets.find_one({"tenant_id": tenant_id, "asset_id": asset_id}, {"_id": 0})
+    if existing:
+        return existing
+
+    info = await asyncio.to_thread(inspect_image, data)
+    bucket = AsyncIOMotorGridFSBucket(db, bucket_name=BADGE_ASSETS_BUCKET)
+    file_id = await bucket.upload_from_stream(
+        asset_id, data, metadata={"tenant_id": tenant_id, "content_type": info["content_type"]}
+    )
+    asset = {
+        "asset_id": asset_id,
+        "tenant_id": tenant_id,
+        "file_id": file_id,
+        "filename": filename,
+        "size": len(data),
+        **info,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+    try:
+        await db.badge_assets.insert_one(asset)
+    except DuplicateKeyError:
+        # The same bytes were uploaded concurrently; keep theirs
+        await bucket.delete(file_id)
+        return await db.badge_assets.find_one({"tenant_id": tenant_id, "asset_id": asset_id}, {"_id": 0})
+    asset.pop("_id", None)
+    return asset
+
+
+async def read_badge_asset(db, asset: Dict[str, Any]) -> bytes:
+    bucket = AsyncIOMotorGridFSBucket(db, bucket_name=BADGE_ASSETS_BUCKET)
+    stream = await bucket.open_download_stream(asset["file_id"])
+    return await stream.read()
+
+
+def decode_image(data: bytes) -> Tuple[Any, int]:
+    """ImageReader for an asset plus the memory it holds, converted up front so render
+    threads sharing it only ever read it"""
+    from PIL import Image
+    from reportlab.lib.utils import ImageReader
+
+    image = Image.open(BytesIO(data))
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    reader = ImageReader(image)
+    rgb = reader.getRGBData()
+    return reader, len(rgb) + image.width * image.height * len(image.getbands())
+
+
+class ImageCache:
+    """Decoded images by asset id, least recently used first out past `max_bytes`.
+
+    Shared by every render in the process; safe to read from render threads.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.decodes = 0
+        self._items: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, asset_id: str):
+        with self._lock:
+            item = self._items.get(asset_id)
+            if item is None:
+                BADGE_IMAGE_CACHE_LOOKUPS.labels("miss").inc()
+                return None
+            self._items.move_to_end(asset_id)
+        BADGE_IMAGE_CACHE_LOOKUPS.labels("hit").inc()
+        return item[0]
+
+    def put(self, asset_id: str, reader, size: int):
+        with self._lock:
+            if asset_id in self._items:
+                return self._items[asset_id][0]
+            self._items[asset_id] = (reader, size)
+            self.size += size
+            self.decodes += 1
+            # Always keep the newest entry, even if it alone exceeds the budget
+            while self.size > self.max_bytes and len(self._items) > 1:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.size -= evicted
+            return reader
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"images": len(self._items), "bytes": self.size, "decodes": self.decodes}
+
+
+badge_image_cache = ImageCache(BADGE_IMAGE_CACHE_MB * 1024 * 1024)
+# Cold loads are rare; one at a time keeps two renders from decoding the same logo
+_load_lock = asyncio.Lock()
+
+
+async def load_badge_image(db, tenant_id: str, asset_id: str):
+    """ImageReader for one of the tenant's assets, or None if it has no such asset"""
+    if not await db.badge_assets.count_documents({"tenant_id": tenant_id, "asset_id": asset_id}, limit=1):
+        return None
+    reader = badge_image_cache.get(asset_id)
+    if reader is not None:
+        return reader
+    async with _load_lock:
+        reader = badge_image_cache.get(asset_id)
+        if reader is None:
+            asset = await db.badge_assets.find_one({"tenant_id": tenant_id, "asset_id": asset_id})
+            data = await read_badge_asset(db, asset)
+            reader, size = await asyncio.to_thread(decode_image, data)
+            reader = badge_image_cache.put(asset_id, reader, size)
+    return reader
+
+
+async def load_badge_images(db, tenant_id: str, template: Dict[str, Any]) -> Dict[str, Any]:
+    """ImageReaders for every asset the template's image elements reference, by asset id"""
+    images = {}
+    for element in template["elements"]:
+        if element["type"] != "image":
+            continue
+        asset_id = asset_id_from_content(element.get("content"))
+        if asset_id is None or asset_id in images:
+            continue
+        reader = await load_badge_image(db, tenant_id, asset_id)
+        if reader is None:
+            logger.warning(f"Badge template {template.get('template_id')} references unknown image {asset_id}")
+            continue
+        images[asset_id] = reader
+    return images
@@ -0,0 +1,233 @@
+"""On-disk archive format for finished events.
+
+Each archived event is a directory under ``ARCHIVE_DIR``:
+
+    <tenant_id>/<event_id>/manifest.json
+    <tenant_id>/<event_id>/<collection>.jsonl.zst
+
+Every ``.jsonl.zst`` file holds one document per line in MongoDB Extended JSON
+(relaxed), so ObjectIds, dates and binaries survive a round trip, compressed with a
+single zstd frame. Files and the manifest are written under a temporary name and
+renamed into place, so a reader never sees a partial file and the manifest only
+exists once every file it lists is complete.
+
+Reading is streaming: documents are decompressed and parsed in batches, off the
+event loop, so exporting a 100k-contact archive never holds it in memory.
+"""
+import asyncio
+import io
+import json
+import os
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from bson import json_util
+
+ARCHIVE_DIR = Path(os.getenv('ARCHIVE_DIR', str(Path(__file__).parent / 'archive')))
+ARCHIVE_ZSTD_LEVEL = int(os.getenv('ARCHIVE_ZSTD_LEVEL', '10'))
+ARCHIVE_FORMAT_VERSION = 1
+READ_BATCH_SIZE = 1000
+
+_SAFE_ID = re.compile(r"[A-Za-z0-9_-]+")
+
+
+class ArchiveNotFound(Exception):
+    pass
+
+
+class ArchiveError(Exception):
+    """The archive could not be written completely; nothing was deleted"""
+
+
+def event_archive_dir(tenant_id: str, event_id: str) -> Path:
+    # IDs become path components; refuse anything that could escape ARCHIVE_DIR
+    for value in (tenant_id, event_id):
+        if not _SAFE_ID.fullmatch(value):
+            raise ValueError(f"Invalid archive id {value!r}")
+    return ARCHIVE_DIR / tenant_id / event_id
+
+
+def _atomic_write_bytes(path: Path, data: bytes):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class CollectionWriter:
+    """Appends documents to <collection>.jsonl.zst; call close() to publish the file"""
+
+    def __init__(self, directory: Path, collection: str):
+        import zstandard  # only archive and restore runs need it
+
+        directory.mkdir(parents=True, exist_ok=True)
+        self.collection = collection
+        self.path = directory / f"{collection}.jsonl.zst"
+        self._tmp = self.path.with_name(self.path.name + ".tmp")
+        self._raw = open(self._tmp, "wb")
+        self._writer = zstandard.ZstdCompressor(level=ARCHIVE_ZSTD_LEVEL).stream_writer(self._raw, closefd=False)
+        self.count = 0
+        self.last_id = None  # highest _id written, bounds what may be deleted afterwards
+
+    async def write_many(self, docs: Iterable[Dict[str, Any]]):
+        docs = list(docs)
+        if docs:
+            data = "".join(json_util.dumps(doc) + "\n" for doc in docs).encode("utf-8")
+            # Compression is CPU bound; keep the event loop (and job lease) responsive
+            await asyncio.to_thread(self._writer.write, data)
+            self.count += len(docs)
+            batch_last = max(doc["_id"] for doc in docs)
+            if self.last_id is None or batch_last > self.last_id:
+                self.last_id = batch_last
+
+    def close(self) -> Dict[str, Any]:
+        self._writer.close()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        self._raw.close()
+        os.replace(self._tmp, self.path)
+        last_id = json.loads(json_util.dumps(self.last_id)) if self.last_id is not None else None
+        return {"count": self.count, "bytes": self.path.stat().st_size, "last_id": last_id}
+
+    def abort(self):
+        self._writer.close()
+        self._raw.close()
+        self._tmp.unlink(missing_ok=True)
+
+
+def write_manifest(directory: Path, tenant_id: str, event: Dict[str, Any], files: Dict[str, Dict[str, Any]]):
+    manifest = {
+        "format_version": ARCHIVE_FORMAT_VERSION,
+        "tenant_id": tenant_id,
+        "event_id": event["event_id"],
+        "event": json.loads(json_util.dumps(event)),
+        "files": files,
+        "archived_at": datetime.now(timezone.utc).isoformat(),
+    }
+    _atomic_write_bytes(directory / "manifest.json", json.dumps(manifest, indent=2).encode("utf-8"))
+    return manifest
+
+
+def read_manifest(tenant_id: str, event_id: str) -> Dict[str, Any]:
+    path = event_archive_dir(tenant_id, event_id) / "manifest.json"
+    if not path.exists():
+        raise ArchiveNotFound(f"No archive for event {event_id}")
+    return json.loads(path.read_text())
+
+
+def archived_id_range(file_entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Query on _id covering what a manifest entry says was written: every _id up to the highest"""
+    if file_entry.get("last_id") is None:
+        return {"_id": {"$exists": False}}  # nothing written, nothing matches
+    return {"_id": {"$lte": json_util.loads(json.dumps(file_entry["last_id"]))}}
+
+
+_MISSING = object()
+_COMPARISONS = {
+    "$gt": lambda a, b: a > b,
+    "$gte": lambda a, b: a >= b,
+    "$lt": lambda a, b: a < b,
+    "$lte": lambda a, b: a <= b,
+}
+
+
+def _lookup(doc: Dict[str, Any], key: str):
+    value = doc
+    for part in key.split("."):
+        value = value.get(part, _MISSING) if isinstance(value, dict) else _MISSING
+    return value
+
+
+def _operator_matches(value, op: str, expected, options: str = "") -> bool:
+    present = value is not _MISSING
+    value = value if present else None
+    if op == "$exists":
+        return present == bool(expected)
+    if op == "$in":
+        return value in expected
+    if op == "$nin":
+        return value not in expected
+    if op == "$ne":
+        return value != expected
+    if op == "$regex":
+        flags = re.IGNORECASE if "i" in options else 0
+        return isinstance(value, str) and re.search(expected, value, flags) is not None
+    if op in _COMPARISONS:
+        # Like Mongo, only values of the same kind compare; missing and null never do
+        if value is None or isinstance(value, bool) != isinstance(expected, bool):
+            return False
+        try:
+            return _COMPARISONS[op](value, expected)
+        except TypeError:
+            return False
+    raise ValueError(f"Unsupported operator {op} in archive query")
+
+
+def _matches(doc: Dict[str, Any], match: Dict[str, Any]) -> bool:
+    """The subset of Mongo query syntax archive reads need: equality on top-level or
+    dotted keys, $and, and $exists/$in/$nin/$ne/$regex/$gt/$gte/$lt/$lte conditions"""
+    for key, expected in match.items():
+        if key == "$and":
+            if not all(_matches(doc, clause) for clause in expected):
+                return False
+            continue
+        value = _lookup(doc, key)
+        if isinstance(expected, dict) and expected and all(k.startswith("$") for k in expected):
+            options = expected.get("$options", "")
+            if not all(_operator_matches(value, op, arg, options) for op, arg in expected.items() if op != "$options"):
+                return False
+        elif (None if value is _MISSING else value) != expected:
+            return False
+    return True
+
+
+class _CollectionReader:
+    def __init__(self, path: Path):
+        import zstandard
+
+        self._raw = open(path, "rb")
+        self._lines = io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(self._raw), encoding="utf-8")
+
+    def read_batch(self, size: int) -> List[str]:
+        batch = []
+        for line in self._lines:
+            batch.append(line)
+            if len(batch) >= size:
+                break
+        return batch
+
+    def close(self):
+        self._lines.close()
+        self._raw.close()
+
+
+async def iter_archive(
+    tenant_id: str,
+    event_id: str,
+    collection: str,
+    match: Optional[Dict[str, Any]] = None,
+    projection_exclude: Iterable[str] = ("_id",),
+) -> AsyncIterator[Dict[str, Any]]:
+    """Stream documents of one archived collection, optionally filtered by `match`"""
+    manifest = read_manifest(tenant_id, event_id)
+    if collection not in manifest["files"]:
+        return
+    reader = _CollectionReader(event_archive_dir(tenant_id, event_id) / f"{collection}.jsonl.zst")
+    try:
+        while True:
+            lines = await asyncio.to_thread(reader.read_batch, READ_BATCH_SIZE)
+            if not lines:
+                return
+            for line in lines:
+                doc = json_util.loads(line)
+                if match and not _matches(doc, match):
+                    continue
+                for field in projection_exclude:
+                    doc.pop(field, None)
+                yield doc
+    finally:
+        reader.close()
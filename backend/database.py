@@ -0,0 +1,44 @@
+"""MongoDB connection profiles shared by the API, routers and job workers.
+
+- db: hot paths (check-in, scanner, CRUD). Primary reads, w=1 acknowledged writes.
+- analytics_db: reports and exports. Secondary reads on a separate, smaller pool so
+  long scans can't take primary capacity or connections from the door.
+- payments_db: payment state. Majority writes and reads so a failover can't lose a paid order.
+"""
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import WriteConcern
+from pymongo.read_concern import ReadConcern
+import os
+from pathlib import Path
+
+from metrics import MongoCommandMetrics
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+mongo_url = os.environ['MONGO_URL']
+mongo_db_name = os.environ['DB_NAME']
+client = AsyncIOMotorClient(
+    mongo_url,
+    maxPoolSize=int(os.getenv('MONGO_MAX_POOL_SIZE', '100')),
+    event_listeners=[MongoCommandMetrics()]
+)
+db = client.get_database(mongo_db_name, write_concern=WriteConcern(w=1))
+payments_db = client.get_database(
+    mongo_db_name,
+    write_concern=WriteConcern(w="majority", wtimeout=10000),
+    read_concern=ReadConcern("majority")
+)
+analytics_client = AsyncIOMotorClient(
+    mongo_url,
+    maxPoolSize=int(os.getenv('MONGO_ANALYTICS_POOL_SIZE', '10')),
+    readPreference="secondaryPreferred",
+    maxStalenessSeconds=int(os.getenv('MONGO_ANALYTICS_MAX_STALENESS', '120')),  # server minimum is 90
+    event_listeners=[MongoCommandMetrics()]
+)
+analytics_db = analytics_client[mongo_db_name]
+
+def close_clients():
+    client.close()
+    analytics_client.close()
@@ -0,0 +1,117 @@
+"""Local stand-in for a raw TCP (port 9100) label printer.
+
+Accepts connections like a Zebra printer, prints nothing, and records every byte it
+receives so spooler behaviour can be checked without hardware:
+
+    python fake_printer.py --port 9100 --out received.zpl
+
+or from code:
+
+    async with FakePrinter() as printer:  # ephemeral port on 127.0.0.1
+        spooler = PrintSpooler({"desk": ("127.0.0.1", printer.port)})
+        await spooler.submit("desk", label)
+        await printer.wait_for_labels(1)
+        printer.labels  # ["^XA...^XZ"]
+"""
+import argparse
+import asyncio
+import logging
+from typing import List, Optional, Set
+
+logger = logging.getLogger("fake_printer")
+
+LABEL_END = b"^XZ"
+
+
+class FakePrinter:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, label_delay: float = 0.0):
+        self.host = host
+        self.port = port
+        self.label_delay = label_delay  # seconds per label, to mimic print speed
+        self.data = bytearray()
+        self.connections = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._received = asyncio.Condition()
+
+    @property
+    def labels(self) -> List[str]:
+        return [part.decode() + "^XZ" for part in bytes(self.data).split(LABEL_END)[:-1]]
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self.drop_connections()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def drop_connections(self):
+        """Close every open connection, like a printer being power cycled"""
+        for writer in list(self._writers):
+            writer.close()
+
+    async def wait_for_labels(self, count: int, timeout: float = 5.0):
+        async with self._received:
+            await asyncio.wait_for(self._received.wait_for(lambda: len(self.labels) >= count), timeout)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while chunk := await reader.read(65536):
+                if self.label_delay:
+                    await asyncio.sleep(self.label_delay * chunk.count(LABEL_END))
+                async with self._received:
+                    self.data.extend(chunk)
+                    self._received.notify_all()
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+
+async def serve(host: str, port: int, out: Optional[str], label_delay: float):
+    printer = FakePrinter(host, port, label_delay)
+    await printer.start()
+    logger.info(f"Fake printer listening on {host}:{printer.port}")
+    try:
+        reported = 0
+        while True:
+            await asyncio.sleep(1)
+            if len(printer.labels) != reported:
+                reported = len(printer.labels)
+                logger.info(f"{reported} labels received over {printer.connections} connections")
+                if out:
+                    with open(out, "wb") as f:
+                        f.write(printer.data)
+    finally:
+        await printer.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record label printer traffic instead of printing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--out", help="File the received stream is written to")
+    parser.add_argument("--label-delay", type=float, default=0.0, help="Seconds to 'print' each label")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    try:
+        asyncio.run(serve(args.host, args.port, args.out, args.label_delay))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""Durable background jobs stored in the ``jobs`` collection.
+
+Request handlers enqueue a job and return its ``job_id`` straight away; worker
+processes (see ``worker.py``) lease jobs with an atomic ``find_one_and_update``,
+keep the lease alive while the handler runs and record progress, results and
+errors on the job document so clients can poll ``GET /api/jobs/{job_id}``.
+
+A job whose worker dies stops heartbeating, its lease expires and another worker
+picks it up again. Failed jobs are retried with exponential backoff until
+``max_attempts`` is reached.
+
+Workers skip tenants already running ``JOB_TENANT_CONCURRENCY`` jobs, so a tenant
+queueing dozens of exports can't occupy every worker while other tenants wait.
+
+Job documents are written with majority write concern whatever the profile of the
+``db`` passed in: a lease acknowledged by a primary that then fails over could be
+rolled back, and the job would run twice.
+"""
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from pymongo import ReturnDocument, WriteConcern
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', '60'))
+JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '1.0'))  # seconds between empty polls
+JOB_TENANT_CONCURRENCY = int(os.getenv('JOB_TENANT_CONCURRENCY', '2'))  # 0 disables the cap
+JOB_RETRY_BASE_DELAY = 5  # seconds, doubled on every attempt
+JOB_ERROR_MAX_DELAY = 30  # cap, in seconds, on a worker's backoff while the database is unreachable
+JOB_FILES_BUCKET = "job_files"
+JOB_WRITE_CONCERN = WriteConcern(w="majority", wtimeout=10000)
+
+# Higher runs first
+PRIORITY_LOW = -10
+PRIORITY_NORMAL = 0
+PRIORITY_HIGH = 10
+
+JobHandler = Callable[[Any, Dict[str, Any], "JobProgress"], Awaitable[Optional[Dict[str, Any]]]]
+_handlers: Dict[str, JobHandler] = {}
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying the job can't succeed"""
+
+
+def job_handler(job_type: str):
+    """Register an async handler(db, job, progress) for a job type"""
+    def decorator(fn: JobHandler):
+        _handlers[job_type] = fn
+        return fn
+    return decorator
+
+
+def registered_job_types() -> List[str]:
+    return list(_handlers)
+
+
+def jobs_collection(db):
+    return db.get_collection("jobs", write_concern=JOB_WRITE_CONCERN)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def ensure_job_indexes(db):
+    await db.jobs.create_index("job_id", unique=True)
+    await db.jobs.create_index([("status", 1), ("type", 1), ("priority", -1), ("run_at", 1)])
+    await db.jobs.create_index([("status", 1), ("lease_expires_at", 1)])
+
+
+async def enqueue_job(db, job_type: str, tenant_id: str, payload: Dict[str, Any], *,
+                      user_id: Optional[str] = None, priority: int = PRIORITY_NORMAL,
+                      max_attempts: int = 3) -> str:
+    job_id = str(uuid.uuid4())
+    now = _now().isoformat()
+    job_doc = {
+        "job_id": job_id,
+        "type": job_type,
+        "tenant_id": tenant_id,
+        "user_id": user_id,
+        "payload": payload,
+        "priority": priority,
+        "status": "queued",
+        "attempts": 0,
+        "max_attempts": max_attempts,
+        "progress": {"current": 0, "total": None, "message": None},
+        "result": None,
+        "error": None,
+        "worker_id": None,
+        "run_at": now,
+        "lease_expires_at": None,
+        "created_at": now,
+        "started_at": None,
+        "completed_at": None
+    }
+    await jobs_collection(db).insert_one(job_doc)
+    return job_id
+
+
+async def saturated_tenants(db, now: datetime) -> List[str]:
+    """Tenants holding JOB_TENANT_CONCURRENCY live leases or more"""
+    if JOB_TENANT_CONCURRENCY <= 0:
+        return []
+    pipeline = [
+        {"$match": {"status": "running", "lease_expires_at": {"$gte": now.isoformat()}}},
+        {"$group": {"_id": "$tenant_id", "running": {"$sum": 1}}},
+        {"$match": {"running": {"$gte": JOB_TENANT_CONCURRENCY}}}
+    ]
+    return [doc["_id"] async for doc in db.jobs.aggregate(pipeline)]
+
+
+async def claim_job(db, worker_id: str, job_types: List[str], tenant_cap: bool = True) -> Optional[Dict[str, Any]]:
+    """Lease the highest priority runnable job, including ones whose lease has expired"""
+    now = _now()
+    query = {
+        "type": {"$in": job_types},
+        "$or": [
+            {"status": "queued", "run_at": {"$lte": now.isoformat()}},
+            {"status": "running", "lease_expires_at": {"$lt": now.isoformat()}}
+        ]
+    }
+    # Soft cap: two workers racing may briefly let a tenant run one job over it
+    saturated = await saturated_tenants(db, now) if tenant_cap else []
+    if saturated:
+        query["tenant_id"] = {"$nin": saturated}
+    return await jobs_collection(db).find_one_and_update(
+        query,
+        {
+            "$set": {
+                "status": "running",
+                "worker_id": worker_id,
+                "started_at": now.isoformat(),
+                "lease_expires_at": (now + timedelta(seconds=JOB_LEASE_SECONDS)).isoformat()
+            },
+            "$inc": {"attempts": 1}
+        },
+        sort=[("priority", -1), ("run_at", 1)],
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+
+
+async def extend_lease(db, job_id: str, worker_id: str) -> bool:
+    result = await jobs_collection(db).update_one(
+        {"job_id": job_id, "worker_id": worker_id, "status": "running"},
+        {"$set": {"lease_expires_at": (_now() + timedelta(seconds=JOB_LEASE_SECONDS)).isoformat()}}
+    )
+    return result.matched_count == 1
+
+
+async def complete_job(db, job: Dict[str, Any], result: Optional[Dict[str, Any]]):
+    await jobs_collection(db).update_one(
+        {"job_id": job["job_id"], "worker_id": job["worker_id"]},
+        {"$set": {
+            "status": "completed",
+            "result": result,
+            "error": None,
+            "lease_expires_at": None,
+            "completed_at": _now().isoformat()
+        }}
+    )
+
+
+async def fail_job(db, job: Dict[str, Any], error: str, permanent: bool = False):
+    """Schedule a retry with backoff, or mark the job failed once attempts are used up"""
+    if permanent or job["attempts"] >= job["max_attempts"]:
+        update = {"status": "failed", "completed_at": _now().isoformat()}
+    else:
+        delay = JOB_RETRY_BASE_DELAY * 2 ** (job["attempts"] - 1)
+        update = {"status": "queued", "run_at": (_now() + timedelta(seconds=delay)).isoformat()}
+    update.update({"error": error, "lease_expires_at": None})
+    await jobs_collection(db).update_one({"job_id": job["job_id"], "worker_id": job["worker_id"]}, {"$set": update})
+
+
+class JobProgress:
+    """Handed to handlers so they can report progress on the job document"""
+
+    def __init__(self, db, job: Dict[str, Any]):
+        self.db = db
+        self.job = job
+
+    async def __call__(self, current: int, total: Optional[int] = None, message: Optional[str] = None):
+        progress = {"progress.current": current}
+        if total is not None:
+            progress["progress.total"] = total
+        if message is not None:
+            progress["progress.message"] = message
+        await jobs_collection(self.db).update_one({"job_id": self.job["job_id"]}, {"$set": progress})
+
+
+async def _keep_lease(db, job: Dict[str, Any]):
+    while True:
+        await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+        if not await extend_lease(db, job["job_id"], job["worker_id"]):
+            logger.warning(f"Lost lease on job {job['job_id']}")
+            return
+
+
+async def run_job(db, job: Dict[str, Any]):
+    handler = _handlers.get(job["type"])
+    if job["attempts"] > job["max_attempts"]:
+        # Lease expired after the final attempt, most likely the worker crashed mid-job
+        return await fail_job(db, job, job.get("error") or "Worker lost during final attempt", permanent=True)
+
+    heartbeat = asyncio.create_task(_keep_lease(db, job))
+    try:
+        result = await handler(db, job, JobProgress(db, job))
+    except PermanentJobError as e:
+        logger.error(f"Job {job['job_id']} ({job['type']}) failed permanently: {e}")
+        await fail_job(db, job, str(e), permanent=True)
+    except Exception as e:
+        logger.exception(f"Job {job['job_id']} ({job['type']}) failed on attempt {job['attempts']}")
+        await fail_job(db, job, str(e))
+    else:
+        await complete_job(db, job, result)
+    finally:
+        heartbeat.cancel()
+
+
+async def worker_loop(db, worker_id: str, stop: asyncio.Event, job_types: Optional[List[str]] = None, *,
+                      poll_interval: float = JOB_POLL_INTERVAL, tenant_cap: bool = True):
+    """Claim and run jobs until stop is set. A job in progress always finishes first.
+
+    `tenant_cap=False` is for loops serving short jobs that must not wait behind a
+    tenant's long-running exports, such as the print spooler.
+    """
+    job_types = job_types or registered_job_types()
+    error_delay = poll_interval
+    while not stop.is_set():
+        try:
+            job = await claim_job(db, worker_id, job_types, tenant_cap)
+            if job is not None:
+                logger.info(f"Worker {worker_id} running job {job['job_id']} ({job['type']})")
+                await run_job(db, job)
+                error_delay = poll_interval
+                continue
+            delay = error_delay = poll_interval
+        except PyMongoError as e:
+            # Failover or network trouble: keep the worker alive and back off until Mongo is back.
+            # A job whose result couldn't be recorded is retried once its lease expires.
+            delay, error_delay = error_delay, min(error_delay * 2, JOB_ERROR_MAX_DELAY)
+            logger.error(f"Worker {worker_id} hit a database error, retrying in {delay:g}s: {e}")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
+
+# ===== JOB FILES =====
+
+async def store_job_file(db, job: Dict[str, Any], filename: str, data: bytes, content_type: str) -> Dict[str, Any]:
+    """Save a generated file to GridFS and return the result dict the job should report"""
+    bucket = AsyncIOMotorGridFSBucket(db, bucket_name=JOB_FILES_BUCKET)
+    file_id = await bucket.upload_from_stream(
+        filename,
+        data,
+        metadata={"job_id": job["job_id"], "tenant_id": job["tenant_id"], "content_type": content_type}
+    )
+    return {"file_id": str(file_id), "filename": filename, "content_type": content_type, "size": len(data)}
+
+
+async def store_job_input(db, tenant_id: str, filename: str, data: bytes, content_type: str) -> str:
+    """Save a request body too large for a job payload; put the returned id in the payload"""
+    bucket = AsyncIOMotorGridFSBucket(db, bucket_name=JOB_FILES_BUCKET)
+    file_id = await bucket.upload_from_stream(
+        filename, data, metadata={"tenant_id": tenant_id, "content_type": content_type, "input": True}
+    )
+    return str(file_id)
+
+
+async def open_job_file(db, file_id: str):
+    bucket = AsyncIOMotorGridFSBucket(db, bucket_name=JOB_FILES_BUCKET)
+    return await bucket.open_download_stream(ObjectId(file_id))
+
+
+async def delete_job_file(db, file_id: str):
+    bucket = AsyncIOMotorGridFSBucket(db, bucket_name=JOB_FILES_BUCKET)
+    await bucket.delete(ObjectId(file_id))
@@ -0,0 +1,256 @@
+"""Live activity feeds for event screens (check-in desks, dashboards, reports).
+
+Each event with at least one subscriber gets exactly one MongoDB change stream,
+whatever the number of screens watching it. Changes are translated into small
+messages and fanned out in-process to a bounded queue per subscriber:
+
+* a subscriber that falls ``LIVE_QUEUE_SIZE`` messages behind is dropped back to a
+  single ``resync`` message, so a slow screen can never stall the others or grow
+  memory without bound;
+* the stream's resume token is kept so a dropped cursor resumes without gaps, and
+  screens are only told to ``resync`` when that history is gone from the oplog;
+  other failures are retried with exponential backoff;
+* recent messages are kept in a replay buffer keyed by sequence number so an SSE
+  client reconnecting with ``Last-Event-ID`` only receives what it missed;
+* a feed outlives its last subscriber by ``LIVE_FEED_LINGER`` seconds, so a lone
+  desk that reconnects still gets a replay rather than a full refetch.
+
+Sequence numbers only mean something to the feed that issued them. SSE ids are
+``<feed epoch>-<seq>``, and a ``Last-Event-ID`` from another feed (one that has
+since closed, or one in another API process) is answered with ``resync``.
+
+Change streams require MongoDB to run as a replica set.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from metrics import LIVE_FEEDS, LIVE_SUBSCRIBERS, LIVE_MESSAGES_DROPPED
+
+logger = logging.getLogger(__name__)
+
+LIVE_QUEUE_SIZE = 256
+LIVE_REPLAY_SIZE = 512
+LIVE_RETRY_DELAY = 2  # seconds before reopening a failed change stream
+LIVE_RETRY_MAX_DELAY = 60  # cap on the exponential backoff between reopen attempts
+LIVE_FEED_LINGER = 30  # seconds a feed keeps watching after its last subscriber leaves
+
+WATCHED_COLLECTIONS = ["contacts", "orders", "leads"]
+
+
+def _change_pipeline(tenant_id: str, event_id: str):
+    return [
+        {"$match": {
+            "ns.coll": {"$in": WATCHED_COLLECTIONS},
+            "fullDocument.tenant_id": tenant_id,
+            "fullDocument.event_id": event_id,
+            "$or": [
+                {"operationType": "insert", "ns.coll": {"$in": ["contacts", "leads"]}},
+                {"operationType": "update", "ns.coll": "contacts",
+                 "updateDescription.updatedFields.checked_in_at": {"$exists": True}},
+                {"operationType": "update", "ns.coll": "orders", "updateDescription.updatedFields.status": "paid"},
+            ]
+        }},
+        {"$project": {"fullDocument.qr_code": 0, "fullDocument.custom_data": 0}}
+    ]
+
+
+CHANGE_STREAM_HISTORY_LOST = 286
+CHANGE_STREAM_FATAL_ERROR = 280
+
+
+def history_lost(error: OperationFailure, resuming: bool) -> bool:
+    """Whether the stream cannot resume because its point fell off the oplog.
+
+    Only then have changes been missed, so only then must screens refetch. A fatal
+    error while resuming means the server no longer knows the stored token.
+    """
+    return error.code == CHANGE_STREAM_HISTORY_LOST or (error.code == CHANGE_STREAM_FATAL_ERROR and resuming)
+
+
+def change_to_message(change: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    doc = change.get("fullDocument") or {}
+    collection = change["ns"]["coll"]
+    if collection == "contacts" and change["operationType"] == "insert":
+        return {"type": "registration", "data": {
+            "contact_id": doc["contact_id"], "name": doc.get("name"), "email": doc.get("email"),
+            "company": doc.get("company"), "contact_type": doc.get("type"), "created_at": doc.get("created_at")
+        }}
+    if collection == "contacts":
+        return {"type": "check_in", "data": {
+            "contact_id": doc["contact_id"], "name": doc.get("name"), "company": doc.get("company"),
+            "contact_type": doc.get("type"), "checked_in_at": doc.get("checked_in_at")
+        }}
+    if collection == "orders":
+        return {"type": "order_paid", "data": {
+            "order_id": doc["order_id"], "contact_id": doc.get("contact_id"),
+            "total_amount": doc.get("total_amount"), "currency": doc.get("currency")
+        }}
+    if collection == "leads":
+        return {"type": "lead", "data": {
+            "lead_id": doc["lead_id"], "contact_id": doc.get("contact_id"), "user_id": doc.get("user_id"),
+            "contact_name": doc.get("contact_name"), "contact_company": doc.get("contact_company"),
+            "scanned_at": doc.get("scanned_at")
+        }}
+    return None
+
+
+class Subscription:
+    def __init__(self, feed: "EventFeed"):
+        self.feed = feed
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=LIVE_QUEUE_SIZE)
+
+    def push(self, message: Dict[str, Any]):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Too slow to keep up: discard the backlog and ask the client to refetch
+            dropped = self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            LIVE_MESSAGES_DROPPED.inc(dropped)
+            self.queue.put_nowait(self.feed.resync_message())
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventFeed:
+    """One change stream for one event, shared by all of its subscribers"""
+
+    def __init__(self, hub: "LiveHub", tenant_id: str, event_id: str):
+        self.hub = hub
+        self.tenant_id = tenant_id
+        self.event_id = event_id
+        self.subscribers: Set[Subscription] = set()
+        self.replay: deque = deque(maxlen=LIVE_REPLAY_SIZE)
+        self.epoch = uuid.uuid4().hex[:12]
+        self.seq = 0
+        self.resume_token = None
+        self.task: Optional[asyncio.Task] = None
+        self._linger: Optional[asyncio.TimerHandle] = None
+
+    def event_id_for(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def resync_message(self) -> Dict[str, Any]:
+        return {"id": self.event_id_for(self.seq), "seq": self.seq, "type": "resync", "data": {}}
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscription:
+        sub = Subscription(self)
+        if last_event_id is not None:
+            epoch, _, seq = last_event_id.partition("-")
+            last_seq = int(seq) if epoch == self.epoch and seq.isdigit() else None
+            if last_seq is None or last_seq > self.seq:
+                # Issued by an earlier feed or another process; what was missed is unknown
+                sub.push(self.resync_message())
+            elif last_seq < self.seq:
+                if self.replay and self.replay[0]["seq"] <= last_seq + 1:
+                    for message in self.replay:
+                        if message["seq"] > last_seq:
+                            sub.push(message)
+                else:
+                    sub.push(self.resync_message())
+        self.subscribers.add(sub)
+        LIVE_SUBSCRIBERS.inc()
+        if self._linger is not None:
+            self._linger.cancel()
+            self._linger = None
+        if self.task is None:
+            self.task = asyncio.create_task(self._watch())
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        if sub in self.subscribers:
+            self.subscribers.discard(sub)
+            LIVE_SUBSCRIBERS.dec()
+        if not self.subscribers and self._linger is None:
+            self._linger = asyncio.get_running_loop().call_later(LIVE_FEED_LINGER, self.close)
+
+    def close(self):
+        self._linger = None
+        if self.subscribers:
+            return
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        self.hub.remove(self)
+
+    def publish(self, message: Dict[str, Any]):
+        self.seq += 1
+        message["seq"] = self.seq
+        message["id"] = self.event_id_for(self.seq)
+        self.replay.append(message)
+        for sub in list(self.subscribers):
+            sub.push(message)
+
+    async def _watch(self):
+        pipeline = _change_pipeline(self.tenant_id, self.event_id)
+        delay = LIVE_RETRY_DELAY
+        while True:
+            try:
+                async with self.hub.db.watch(
+                    pipeline, full_document="updateLookup", resume_after=self.resume_token
+                ) as stream:
+                    async for change in stream:
+                        self.resume_token = stream.resume_token
+                        delay = LIVE_RETRY_DELAY
+                        message = change_to_message(change)
+                        if message is not None:
+                            self.publish(message)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if history_lost(e, self.resume_token is not None):
+                    # Changes were missed: start fresh and let screens refetch
+                    logger.warning(f"Live feed for event {self.event_id} lost its resume point: {e}")
+                    self.resume_token = None
+                    self.publish({"type": "resync", "data": {}})
+                    delay = LIVE_RETRY_DELAY
+                else:
+                    # Keep the token; nothing was missed, so clients stay as they are
+                    logger.error(f"Live feed for event {self.event_id} failed, retrying in {delay}s: {e}")
+            except PyMongoError as e:
+                logger.warning(f"Live feed for event {self.event_id} interrupted, retrying in {delay}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, LIVE_RETRY_MAX_DELAY)
+
+
+class LiveHub:
+    """Process-wide registry of active event feeds"""
+
+    def __init__(self, db):
+        self.db = db
+        self.feeds: Dict[str, EventFeed] = {}
+
+    def subscribe(self, tenant_id: str, event_id: str, last_event_id: Optional[str] = None) -> Subscription:
+        feed = self.feeds.get(event_id)
+        if feed is None:
+            feed = EventFeed(self, tenant_id, event_id)
+            self.feeds[event_id] = feed
+            LIVE_FEEDS.inc()
+        return feed.subscribe(last_event_id)
+
+    def remove(self, feed: EventFeed):
+        if self.feeds.get(feed.event_id) is feed:
+            del self.feeds[feed.event_id]
+            LIVE_FEEDS.dec()
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def format_sse(message: Dict[str, Any]) -> str:
+    return f"id: {message['id']}\nevent: {message['type']}\ndata: {json.dumps(message['data'], default=_json_default)}\n\n"
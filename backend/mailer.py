@@ -0,0 +1,418 @@
+"""Bulk email delivery for Communications campaigns.
+
+Messages are rendered per contact from the campaign's subject/content templates and
+sent either through a pool of persistent SMTP connections or through Resend's batch
+API, depending on the tenant's ``email_type``. Delivery state is written to the
+``email_messages`` collection with unordered bulk writes.
+
+Recipients are claimed (``status: "sending"``) in small batches before any of them
+is handed to a sender, so a campaign retried after a crash skips everyone it may
+already have emailed. Messages left ``sending`` were possibly delivered; they are
+never resent. Failures are only recorded once retries are exhausted, so they are
+not resent either.
+
+For local load testing point the tenant's SMTP settings at a stand-in server, e.g.
+``python -m aiosmtpd -n -l localhost:8025`` with ``smtp_host=localhost`` and
+``smtp_port=8025``.
+"""
+import asyncio
+import logging
+import os
+import random
+from datetime import datetime, timezone
+from email.message import EmailMessage
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiosmtplib
+import httpx
+from jinja2.sandbox import SandboxedEnvironment
+from pymongo import UpdateOne
+
+from admission import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+EMAIL_SMTP_POOL_SIZE = int(os.getenv('EMAIL_SMTP_POOL_SIZE', '8'))
+EMAIL_RATE_LIMIT_PER_MINUTE = int(os.getenv('EMAIL_RATE_LIMIT_PER_MINUTE', '12000'))
+EMAIL_DEFAULT_FROM = os.getenv('EMAIL_FROM', 'no-reply@eventpass.app')
+EMAIL_MAX_ATTEMPTS = 4
+EMAIL_RETRY_BASE_DELAY = 0.5  # seconds, doubled on every attempt
+EMAIL_STATE_FLUSH_SIZE = 500  # delivery state updates per bulk write
+EMAIL_CLAIM_BATCH = 100  # recipients marked sending per bulk write, ahead of delivery
+RESEND_BATCH_URL = "https://api.resend.com/emails/batch"
+RESEND_BATCH_SIZE = 100  # maximum messages per Resend batch request
+RESEND_CONCURRENCY = 4
+
+CONTACT_PROJECTION = {
+    "_id": 0, "contact_id": 1, "name": 1, "email": 1, "company": 1, "title": 1,
+    "type": 1, "ticket_type": 1, "booth_number": 1, "custom_data": 1
+}
+
+_template_env = SandboxedEnvironment(autoescape=False)
+
+
+class TransientEmailError(Exception):
+    """Delivery failed in a way that is worth retrying (4xx, dropped connection, 429)"""
+
+
+class PermanentEmailError(Exception):
+    """Delivery failed for good (5xx, rejected recipient, bad credentials)"""
+
+
+# ===== RATE LIMITING =====
+
+_tenant_buckets: Dict[str, TokenBucket] = {}
+
+
+def get_tenant_bucket(tenant_id: str, rate_per_minute: int) -> TokenBucket:
+    """Buckets are shared by every campaign a tenant runs in this process"""
+    bucket = _tenant_buckets.get(tenant_id)
+    if bucket is None or bucket.rate_per_minute != rate_per_minute:
+        bucket = TokenBucket(rate_per_minute, capacity=max(rate_per_minute / 60.0, RESEND_BATCH_SIZE))
+        _tenant_buckets[tenant_id] = bucket
+    return bucket
+
+
+# ===== RENDERING =====
+
+def compile_templates(subject: str, content: str):
+    return _template_env.from_string(subject), _template_env.from_string(content)
+
+
+def render_message(templates, contact: Dict[str, Any], sender: str) -> EmailMessage:
+    subject_tpl, content_tpl = templates
+    context = {**(contact.get("custom_data") or {}), **contact}
+    context["first_name"] = (contact.get("name") or "").split(" ")[0]
+
+    msg = EmailMessage()
+    msg["From"] = sender
+    msg["To"] = contact["email"]
+    msg["Subject"] = subject_tpl.render(context)
+    msg.set_content(content_tpl.render(context))
+    return msg
+
+
+# ===== TRANSPORTS =====
+
+class SMTPSender:
+    """A single persistent SMTP connection, reopened lazily after failures"""
+
+    def __init__(self, config: Dict[str, str]):
+        port = int(config.get("smtp_port") or 587)
+        self.options = {
+            "hostname": config["smtp_host"],
+            "port": port,
+            "use_tls": port == 465,
+            "username": config.get("smtp_username") or None,
+            "password": config.get("smtp_password") or None,
+            "timeout": 30,
+        }
+        self.smtp: Optional[aiosmtplib.SMTP] = None
+
+    async def send(self, msg: EmailMessage):
+        if self.smtp is None or not self.smtp.is_connected:
+            await self._connect()
+        try:
+            await self.smtp.send_message(msg)
+        except aiosmtplib.SMTPRecipientsRefused as e:
+            raise PermanentEmailError(str(e))
+        except aiosmtplib.SMTPResponseException as e:
+            if 400 <= e.code < 500:
+                raise TransientEmailError(f"{e.code} {e.message}")
+            raise PermanentEmailError(f"{e.code} {e.message}")
+        except (aiosmtplib.SMTPException, OSError) as e:
+            await self.close()
+            raise TransientEmailError(str(e))
+
+    async def _connect(self):
+        self.smtp = aiosmtplib.SMTP(**self.options)
+        try:
+            await self.smtp.connect()
+        except aiosmtplib.SMTPAuthenticationError as e:
+            self.smtp = None
+            raise PermanentEmailError(f"SMTP authentication failed: {e}")
+        except (aiosmtplib.SMTPException, OSError) as e:
+            self.smtp = None
+            raise TransientEmailError(f"SMTP connect failed: {e}")
+
+    async def close(self):
+        if self.smtp is not None and self.smtp.is_connected:
+            try:
+                await self.smtp.quit()
+            except (aiosmtplib.SMTPException, OSError):
+                self.smtp.close()
+        self.smtp = None
+
+
+class ResendSender:
+    """Sends lists of messages through Resend's batch endpoint over one pooled HTTP client"""
+
+    def __init__(self, config: Dict[str, str]):
+        self.client = httpx.AsyncClient(
+            headers={"Authorization": f"Bearer {config['resend_api_key']}"},
+            timeout=30,
+            limits=httpx.Limits(max_connections=RESEND_CONCURRENCY)
+        )
+
+    async def send_batch(self, messages: List[EmailMessage]):
+        payload = [
+            {"from": m["From"], "to": [m["To"]], "subject": m["Subject"], "text": m.get_content()}
+            for m in messages
+        ]
+        try:
+            response = await self.client.post(RESEND_BATCH_URL, json=payload)
+        except httpx.HTTPError as e:
+            raise TransientEmailError(str(e))
+        if response.status_code == 429 or response.status_code >= 500:
+            raise TransientEmailError(f"Resend {response.status_code}: {response.text}")
+        if response.status_code >= 400:
+            raise PermanentEmailError(f"Resend {response.status_code}: {response.text}")
+
+    async def close(self):
+        await self.client.aclose()
+
+
+async def send_with_retry(send) -> Tuple[int, Optional[str]]:
+    """Call send() with exponential backoff on transient errors. Returns (attempts, error)."""
+    for attempt in range(1, EMAIL_MAX_ATTEMPTS + 1):
+        try:
+            await send()
+            return attempt, None
+        except PermanentEmailError as e:
+            return attempt, str(e)
+        except TransientEmailError as e:
+            if attempt == EMAIL_MAX_ATTEMPTS:
+                return attempt, str(e)
+            delay = EMAIL_RETRY_BASE_DELAY * 2 ** (attempt - 1)
+            await asyncio.sleep(delay * (0.5 + random.random()))
+
+
+# ===== DELIVERY STATE =====
+
+class DeliveryStateWriter:
+    """Buffers per-message delivery results and writes them with bulk_write"""
+
+    def __init__(self, db, campaign: Dict[str, Any]):
+        self.db = db
+        self.campaign = campaign
+        self.ops: List[UpdateOne] = []
+        self.sent = 0
+        self.failed = 0
+
+    async def claim(self, contacts: List[Dict[str, Any]]):
+        """Mark contacts as sending before they are handed to a sender"""
+        now = datetime.now(timezone.utc).isoformat()
+        await self.db.email_messages.bulk_write([
+            UpdateOne(
+                {"campaign_id": self.campaign["campaign_id"], "contact_id": contact["contact_id"]},
+                {"$set": {
+                    "tenant_id": self.campaign["tenant_id"],
+                    "event_id": self.campaign["event_id"],
+                    "email": contact["email"],
+                    "status": "sending",
+                    "updated_at": now
+                }},
+                upsert=True
+            )
+            for contact in contacts
+        ], ordered=False)
+
+    async def record(self, contact: Dict[str, Any], attempts: int, error: Optional[str]):
+        now = datetime.now(timezone.utc).isoformat()
+        self.ops.append(UpdateOne(
+            {"campaign_id": self.campaign["campaign_id"], "contact_id": contact["contact_id"]},
+            {
+                "$set": {
+                    "tenant_id": self.campaign["tenant_id"],
+                    "event_id": self.campaign["event_id"],
+                    "email": contact["email"],
+                    "status": "failed" if error else "sent",
+                    "error": error,
+                    "updated_at": now,
+                    "sent_at": None if error else now
+                },
+                "$inc": {"attempts": attempts}
+            },
+            upsert=True
+        ))
+        if error:
+            self.failed += 1
+        else:
+            self.sent += 1
+        if len(self.ops) >= EMAIL_STATE_FLUSH_SIZE:
+            await self.flush()
+
+    async def flush(self):
+        if not self.ops:
+            return
+        ops, self.ops = self.ops, []
+        sent, self.sent = self.sent, 0
+        failed, self.failed = self.failed, 0
+        await self.db.email_messages.bulk_write(ops, ordered=False)
+        await self.db.email_campaigns.update_one(
+            {"campaign_id": self.campaign["campaign_id"]},
+            {"$inc": {"sent": sent, "failed": failed}}
+        )
+
+
+# ===== CAMPAIGN RUNNER =====
+
+def recipient_query(campaign: Dict[str, Any]) -> Dict[str, Any]:
+    query = {"tenant_id": campaign["tenant_id"], "event_id": campaign["event_id"]}
+    if campaign.get("recipient_type") and campaign["recipient_type"] != "all":
+        query["type"] = campaign["recipient_type"]
+    return query
+
+
+async def _smtp_worker(queue: asyncio.Queue, sender: SMTPSender, bucket: TokenBucket, templates,
+                       from_email: str, state: DeliveryStateWriter):
+    try:
+        while True:
+            contact = await queue.get()
+            if contact is None:
+                return
+            try:
+                msg = render_message(templates, contact, from_email)
+            except Exception as e:
+                await state.record(contact, 0, f"Template error: {e}")
+                continue
+            await bucket.acquire()
+            attempts, error = await send_with_retry(lambda: sender.send(msg))
+            await state.record(contact, attempts, error)
+    finally:
+        await sender.close()
+
+
+async def _resend_worker(queue: asyncio.Queue, sender: ResendSender, bucket: TokenBucket, templates,
+                         from_email: str, state: DeliveryStateWriter):
+    done = False
+    while not done:
+        batch = []
+        contact = await queue.get()
+        while contact is not None:
+            batch.append(contact)
+            if len(batch) >= RESEND_BATCH_SIZE or queue.empty():
+                break
+            contact = queue.get_nowait()
+        done = contact is None
+        if not batch:
+            continue
+
+        messages, recipients = [], []
+        for contact in batch:
+            try:
+                messages.append(render_message(templates, contact, from_email))
+                recipients.append(contact)
+            except Exception as e:
+                await state.record(contact, 0, f"Template error: {e}")
+        if not messages:
+            continue
+        await bucket.acquire(len(messages))
+        attempts, error = await send_with_retry(lambda: sender.send_batch(messages))
+        for contact in recipients:
+            await state.record(contact, attempts, error)
+
+
+async def send_campaign(db, campaign_id: str):
+    """Deliver a campaign to every matching contact an earlier attempt didn't reach"""
+    campaign = await db.email_campaigns.find_one({"campaign_id": campaign_id}, {"_id": 0})
+    if not campaign:
+        return
+    event = await db.events.find_one(
+        {"tenant_id": campaign["tenant_id"], "event_id": campaign["event_id"]}, {"_id": 0, "archive_status": 1}
+    )
+    settings = await db.settings.find_one({"tenant_id": campaign["tenant_id"]}, {"_id": 0}) or {}
+    email_type = settings.get("email_type") or "smtp"
+    config = settings.get("email_config") or {}
+
+    async def fail(error: str):
+        logger.error(f"Campaign {campaign_id} failed: {error}")
+        await db.email_campaigns.update_one(
+            {"campaign_id": campaign_id},
+            {"$set": {"status": "failed", "error": error, "completed_at": datetime.now(timezone.utc).isoformat()}}
+        )
+
+    if event and event.get("archive_status"):
+        # Queued before the event was archived; its contacts are no longer in Mongo
+        return await fail(f"Event is {event['archive_status']}")
+    if email_type == "resend" and not config.get("resend_api_key"):
+        return await fail("Resend API key not configured")
+    if email_type == "smtp" and not config.get("smtp_host"):
+        return await fail("SMTP host not configured")
+
+    try:
+        templates = compile_templates(campaign["subject"], campaign["content"])
+    except Exception as e:
+        return await fail(f"Invalid template: {e}")
+
+    from_email = config.get("from_email") or config.get("smtp_username") or EMAIL_DEFAULT_FROM
+    rate = int(config.get("rate_limit_per_minute") or EMAIL_RATE_LIMIT_PER_MINUTE)
+    bucket = get_tenant_bucket(campaign["tenant_id"], rate)
+    state = DeliveryStateWriter(db, campaign)
+
+    query = recipient_query(campaign)
+    # Anyone with a message from an earlier attempt, whatever its outcome, is skipped
+    handled = set(await db.email_messages.distinct("contact_id", {"campaign_id": campaign_id}))
+    counts = {
+        doc["_id"]: doc["count"] async for doc in db.email_messages.aggregate([
+            {"$match": {"campaign_id": campaign_id}},
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+        ])
+    }
+    total = await db.contacts.count_documents(query)
+    await db.email_campaigns.update_one(
+        {"campaign_id": campaign_id},
+        {"$set": {"status": "sending", "total": total, "sent": counts.get("sent", 0), "failed": counts.get("failed", 0)}}
+    )
+
+    resend = ResendSender(config) if email_type == "resend" else None
+    concurrency = RESEND_CONCURRENCY if resend else EMAIL_SMTP_POOL_SIZE
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * RESEND_BATCH_SIZE)
+    if resend:
+        workers = [_resend_worker(queue, resend, bucket, templates, from_email, state) for _ in range(concurrency)]
+    else:
+        workers = [
+            _smtp_worker(queue, SMTPSender(config), bucket, templates, from_email, state)
+            for _ in range(concurrency)
+        ]
+
+    async def enqueue(batch):
+        await state.claim(batch)
+        for contact in batch:
+            await queue.put(contact)
+
+    async def produce():
+        batch = []
+        async for contact in db.contacts.find(query, CONTACT_PROJECTION).batch_size(1000):
+            if contact["contact_id"] in handled:
+                continue
+            batch.append(contact)
+            if len(batch) >= EMAIL_CLAIM_BATCH:
+                await enqueue(batch)
+                batch = []
+        if batch:
+            await enqueue(batch)
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    tasks = [asyncio.create_task(produce())] + [asyncio.create_task(worker) for worker in workers]
+    try:
+        # The queue is bounded: once the workers are gone produce() would block on put()
+        # forever, so the first failure cancels everything else
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        error = next((task.exception() for task in done if task.exception() is not None), None)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await state.flush()
+        if resend:
+            await resend.close()
+    if error is not None:
+        return await fail(str(error) or repr(error))
+
+    await db.email_campaigns.update_one(
+        {"campaign_id": campaign_id},
+        {"$set": {"status": "completed", "completed_at": datetime.now(timezone.utc).isoformat()}}
+    )
+    logger.info(f"Campaign {campaign_id} completed")
@@ -0,0 +1,205 @@
+"""Prometheus metrics for HTTP requests and the MongoDB commands each request issues.
+
+``MetricsMiddleware`` times every request and stores a ``RequestStats`` object in a
+context variable. ``MongoCommandMetrics`` is a pymongo command listener; Motor runs
+pymongo calls on executor threads with the caller's context copied, so the listener
+can attribute round trips, time and returned documents to the request that caused
+them.
+"""
+import contextvars
+import os
+import threading
+import time
+from typing import Optional
+
+from pymongo import monitoring
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+HTTP_REQUESTS_TOTAL = Counter(
+    "http_requests_total", "HTTP requests by response status", ["method", "route", "status"]
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ["method"],
+    multiprocess_mode="livesum"
+)
+MONGO_COMMAND_DURATION = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency", ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+)
+MONGO_COMMANDS_TOTAL = Counter(
+    "mongo_commands_total", "MongoDB commands by outcome", ["command", "outcome"]
+)
+MONGO_ROUND_TRIPS_PER_REQUEST = Histogram(
+    "mongo_round_trips_per_request", "MongoDB commands issued while serving a request", ["route"],
+    buckets=(0, 1, 2, 3, 4, 5, 8, 13, 21, 50, 100)
+)
+MONGO_TIME_PER_REQUEST = Histogram(
+    "mongo_time_per_request_seconds", "Time spent waiting on MongoDB while serving a request", ["route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+)
+MONGO_DOCUMENTS_RETURNED = Counter(
+    "mongo_documents_returned_total", "Documents returned by MongoDB to a route", ["route"]
+)
+LIVE_FEEDS = Gauge(
+    "live_feeds", "Events with an open change stream in this process", multiprocess_mode="livesum"
+)
+LIVE_SUBSCRIBERS = Gauge(
+    "live_subscribers", "Connected live feed subscribers", multiprocess_mode="livesum"
+)
+LIVE_MESSAGES_DROPPED = Counter(
+    "live_messages_dropped_total", "Live feed messages discarded for subscribers that fell behind"
+)
+PRINT_JOBS_TOTAL = Counter(
+    "print_jobs_total", "Labels sent to network printers by outcome", ["printer", "outcome"]
+)
+PRINT_QUEUE_DEPTH = Gauge(
+    "print_queue_depth", "Labels waiting in a printer's spool queue", ["printer"], multiprocess_mode="livesum"
+)
+PRINT_SEND_DURATION = Histogram(
+    "print_send_duration_seconds", "Time to hand one label to a printer, including reconnects", ["printer"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+ADMISSION_WAIT = Histogram(
+    "admission_wait_seconds", "Time a request queued for its tenant's rate limit or heavy slot",
+    ["tenant", "route_class"], buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+ADMISSION_WAITING = Gauge(
+    "admission_waiting", "Requests currently queued for admission", ["tenant", "route_class"],
+    multiprocess_mode="livesum"
+)
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total", "Requests turned away after waiting the maximum time", ["tenant", "route_class"]
+)
+ADMISSION_HEAVY_ACTIVE = Gauge(
+    "admission_heavy_active", "Heavy operations a tenant is running", ["tenant"], multiprocess_mode="livesum"
+)
+BADGE_IMAGE_CACHE_LOOKUPS = Counter(
+    "badge_image_cache_lookups_total", "Decoded badge image cache lookups by result", ["result"]
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestStats:
+    """Mongo usage accumulated by one request"""
+
+    __slots__ = ("round_trips", "duration", "documents", "commands", "_lock")
+
+    def __init__(self):
+        self.round_trips = 0
+        self.duration = 0.0
+        self.documents = 0
+        self.commands = {}  # command name -> [count, seconds]
+        self._lock = threading.Lock()
+
+    def add(self, command: str, duration: float, documents: int):
+        with self._lock:
+            self.round_trips += 1
+            self.duration += duration
+            self.documents += documents
+            entry = self.commands.setdefault(command, [0, 0.0])
+            entry[0] += 1
+            entry[1] += duration
+
+
+_request_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "request_stats", default=None
+)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+def _documents_in_reply(reply) -> int:
+    cursor = reply.get("cursor")
+    if cursor:
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or [])
+    if "value" in reply:  # findAndModify
+        return 1 if reply["value"] is not None else 0
+    return 0
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Records every command globally and against the request that issued it"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        duration = event.duration_micros / 1e6
+        MONGO_COMMAND_DURATION.labels(event.command_name).observe(duration)
+        MONGO_COMMANDS_TOTAL.labels(event.command_name, "success").inc()
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.add(event.command_name, duration, _documents_in_reply(event.reply))
+
+    def failed(self, event):
+        duration = event.duration_micros / 1e6
+        MONGO_COMMAND_DURATION.labels(event.command_name).observe(duration)
+        MONGO_COMMANDS_TOTAL.labels(event.command_name, "failure").inc()
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.add(event.command_name, duration, 0)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and Mongo usage per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Lets browser devtools show the Mongo share of each response
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={stats.duration * 1000:.1f};desc="{stats.round_trips} mongo"'.encode()
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.labels(method).inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.labels(method).dec()
+            _request_stats.reset(token)
+            route = scope.get("route")
+            route_path = route.path if route is not None else UNMATCHED_ROUTE
+            status_label = str(status_code)
+            HTTP_REQUEST_DURATION.labels(method, route_path, status_label).observe(time.perf_counter() - start)
+            HTTP_REQUESTS_TOTAL.labels(method, route_path, status_label).inc()
+            MONGO_ROUND_TRIPS_PER_REQUEST.labels(route_path).observe(stats.round_trips)
+            MONGO_TIME_PER_REQUEST.labels(route_path).observe(stats.duration)
+            MONGO_DOCUMENTS_RETURNED.labels(route_path).inc(stats.documents)
+
+
+def render_metrics():
+    """Exposition payload and content type; aggregates worker processes in multiprocess mode"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
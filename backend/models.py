@@ -0,0 +1,321 @@
+from pydantic import BaseModel, Field, ConfigDict, EmailStr
+from typing import List, Optional, Dict, Any, Literal
+from datetime import datetime, timezone
+
+class TenantSettings(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    tenant_id: str
+    stripe_key: Optional[str] = None
+    email_type: Optional[Literal["smtp", "resend"]] = "smtp"
+    email_config: Optional[Dict[str, str]] = {}  # SMTP or Resend settings
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class UserCreate(BaseModel):
+    email: EmailStr
+    password: str
+    name: str
+    role: Literal["super_admin", "organiser_admin", "finance_admin", "registration_admin", "program_manager", "exhibitor_manager", "analyst"] = "organiser_admin"
+    tenant_id: Optional[str] = None
+
+class UserLogin(BaseModel):
+    email: EmailStr
+    password: str
+
+class UserResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    user_id: str
+    email: str
+    name: str
+    role: str
+    tenant_id: Optional[str] = None
+
+class Token(BaseModel):
+    access_token: str
+    token_type: str
+    user: UserResponse
+
+class EventCreate(BaseModel):
+    name: str
+    dates: Dict[str, str]  # {"start": "2025-06-01", "end": "2025-06-03"}
+    venue: str
+    description: Optional[str] = None
+
+class EventResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    event_id: str
+    tenant_id: str
+    name: str
+    dates: Dict[str, str]
+    venue: str
+    description: Optional[str] = None
+    archive_status: Optional[str] = None  # archiving | archived | restoring
+    archived_at: Optional[datetime] = None
+    created_at: datetime
+
+class ContactCreate(BaseModel):
+    event_id: str
+    type: Literal["attendee", "speaker", "exhibitor", "sponsor", "vip", "media"]
+    name: str
+    email: EmailStr
+    company: Optional[str] = None
+    title: Optional[str] = None
+    phone: Optional[str] = None
+    booth_number: Optional[str] = None
+    ticket_type: Optional[str] = None
+    custom_data: Optional[Dict[str, Any]] = {}
+    external_id: Optional[str] = None  # registration system ID; takes precedence over email for matching
+
+class ContactSyncItem(BaseModel):
+    type: Literal["attendee", "speaker", "exhibitor", "sponsor", "vip", "media"]
+    name: str
+    email: EmailStr
+    company: Optional[str] = None
+    title: Optional[str] = None
+    phone: Optional[str] = None
+    booth_number: Optional[str] = None
+    ticket_type: Optional[str] = None
+    custom_data: Optional[Dict[str, Any]] = {}
+    external_id: Optional[str] = None
+
+class ContactSyncRequest(BaseModel):
+    event_id: str
+    contacts: List[ContactSyncItem]
+    delete_missing: bool = True  # remove contacts of the event that are absent from the feed
+
+class ContactSyncResult(BaseModel):
+    inserted: int
+    updated: int
+    unchanged: int
+    deleted: int
+    duplicates: int  # feed rows whose key already appeared earlier in the feed
+    errors: int = 0
+
+class ContactResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    contact_id: str
+    tenant_id: str
+    event_id: str
+    type: str
+    name: str
+    email: str
+    company: Optional[str] = None
+    title: Optional[str] = None
+    phone: Optional[str] = None
+    booth_number: Optional[str] = None
+    ticket_type: Optional[str] = None
+    qr_code: Optional[str] = None
+    custom_data: Optional[Dict[str, Any]] = {}
+    external_id: Optional[str] = None
+    checked_in_at: Optional[datetime] = None
+    version: int = 0
+    created_at: datetime
+
+class ContactFilter(BaseModel):
+    field: str  # a contact field or "custom_data.<key>"
+    op: Literal["eq", "ne", "in", "nin", "gt", "gte", "lt", "lte", "exists", "prefix"] = "eq"
+    value: Any = None
+    value_type: Literal["string", "number", "boolean"] = "string"
+
+class ContactSort(BaseModel):
+    field: str
+    direction: Literal["asc", "desc"] = "asc"
+
+class ContactQuery(BaseModel):
+    event_id: str
+    filters: List[ContactFilter] = []
+    sort: List[ContactSort] = []
+    facets: List[str] = []  # fields to count, e.g. ["type", "custom_data.dietary"]
+    page: int = Field(1, ge=1)
+    page_size: int = Field(50, ge=1, le=200)
+
+class ContactSummary(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    contact_id: str
+    type: str
+    name: str
+    email: str
+    company: Optional[str] = None
+    title: Optional[str] = None
+    booth_number: Optional[str] = None
+    ticket_type: Optional[str] = None
+    custom_data: Optional[Dict[str, Any]] = {}
+    external_id: Optional[str] = None
+    checked_in_at: Optional[datetime] = None
+
+class FacetBucket(BaseModel):
+    value: Any = None
+    count: int
+
+class ContactQueryResult(BaseModel):
+    items: List[ContactSummary]
+    total: int
+    page: int
+    page_size: int
+    facets: Dict[str, List[FacetBucket]] = {}
+
+class BadgeTemplateElement(BaseModel):
+    id: str
+    type: Literal["text", "qrcode", "image", "field"]
+    content: str  # Text content, field name, or badge asset id
+    x: float
+    y: float
+    width: Optional[float] = None
+    height: Optional[float] = None
+    fontSize: Optional[int] = 16
+    fontFamily: Optional[str] = "Helvetica"
+    fontWeight: Optional[str] = "normal"
+    color: Optional[str] = "#000000"
+    align: Optional[str] = "left"
+
+class BadgeTemplateCreate(BaseModel):
+    event_id: str
+    name: str
+    width: float = 4.0  # inches
+    height: float = 6.0  # inches
+    elements: List[BadgeTemplateElement] = []
+    is_default: bool = False
+
+class BadgeTemplateResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    template_id: str
+    tenant_id: str
+    event_id: str
+    name: str
+    width: float
+    height: float
+    elements: List[BadgeTemplateElement]
+    is_default: bool
+    version: int = 0
+    created_at: datetime
+
+class BadgeAssetResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    asset_id: str  # SHA-256 of the image; what an image element's content refers to
+    filename: str
+    content_type: str
+    width: int
+    height: int
+    size: int
+    created_at: datetime
+
+class OrderCreate(BaseModel):
+    event_id: str
+    contact_id: str
+    items: List[Dict[str, Any]]  # [{"name": "VIP Ticket", "price": 299.00, "quantity": 1}]
+    currency: str = "usd"
+
+class OrderResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    order_id: str
+    tenant_id: str
+    event_id: str
+    contact_id: str
+    items: List[Dict[str, Any]]
+    total_amount: float
+    currency: str
+    status: Literal["draft", "pending", "paid", "refunded", "cancelled"]
+    stripe_session_id: Optional[str] = None
+    created_at: datetime
+
+class OrderContactSummary(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    contact_id: str
+    name: str
+    email: Optional[str] = None
+    company: Optional[str] = None
+
+class OrderListItem(OrderResponse):
+    contact: Optional[OrderContactSummary] = None  # None if the contact was deleted
+    ticket_names: List[str] = []
+
+class OrderListPage(BaseModel):
+    items: List[OrderListItem]
+    total: int
+    page: int
+    page_size: int
+
+class TicketCreate(BaseModel):
+    event_id: str
+    name: str
+    description: Optional[str] = None
+    price: float
+    currency: str = "usd"
+    quantity: Optional[int] = None  # None = unlimited
+    sold: int = 0
+    start_sale: Optional[str] = None
+    end_sale: Optional[str] = None
+
+class TicketResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    ticket_id: str
+    tenant_id: str
+    event_id: str
+    name: str
+    description: Optional[str] = None
+    price: float
+    currency: str
+    quantity: Optional[int] = None
+    sold: int
+    available: Optional[int] = None
+    start_sale: Optional[str] = None
+    end_sale: Optional[str] = None
+    created_at: datetime
+
+class LeadCreate(BaseModel):
+    contact_id: str
+    event_id: str
+    notes: Optional[str] = None
+
+class LeadResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    lead_id: str
+    tenant_id: str
+    user_id: str
+    event_id: str
+    contact_id: str
+    contact_name: str
+    contact_email: str
+    contact_company: Optional[str] = None
+    contact_title: Optional[str] = None
+    contact_phone: Optional[str] = None
+    contact_type: str
+    notes: Optional[str] = None
+    scanned_at: datetime
+
+class EmailCampaignCreate(BaseModel):
+    event_id: str
+    subject: str  # Jinja2 template rendered per contact, e.g. "Your badge, {{ first_name }}"
+    content: str
+    recipient_type: Literal["all", "attendee", "speaker", "exhibitor", "sponsor", "vip", "media"] = "all"
+
+class EmailCampaignResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    campaign_id: str
+    tenant_id: str
+    event_id: str
+    subject: str
+    content: str
+    recipient_type: str
+    status: Literal["queued", "sending", "completed", "failed"]
+    total: int = 0
+    sent: int = 0
+    failed: int = 0
+    error: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+class JobResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    job_id: str
+    type: str
+    status: Literal["queued", "running", "completed", "failed"]
+    priority: int
+    attempts: int
+    max_attempts: int
+    progress: Dict[str, Any]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
@@ -0,0 +1,167 @@
+"""Opt-in sampling profiler for individual requests.
+
+``ProfilingMiddleware`` profiles a random ``PROFILE_SAMPLE_RATE`` fraction of requests,
+plus any request carrying ``X-Profile: 1`` from an admin. While at least one profiled
+request is in flight a daemon thread snapshots the event loop thread's stack every
+``PROFILE_INTERVAL_MS``. Each request's coroutine frame in the middleware acts as a
+marker: a sample is attributed to a request only when that marker is on the stack,
+so concurrent requests on the same loop don't bleed into each other's profiles.
+
+Profiles slower than ``PROFILE_SLOW_MS`` (or explicitly requested) are handed to a
+store callback as collapsed stacks ("frame;frame;frame count" lines) that flamegraph.pl,
+speedscope and similar tools read directly, together with the request's Mongo
+command breakdown from ``metrics.RequestStats``.
+"""
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Optional
+
+from metrics import current_request_stats
+
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))  # 0 disables random sampling
+PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '5'))
+PROFILE_SLOW_MS = float(os.getenv('PROFILE_SLOW_MS', '500'))
+PROFILE_HEADER = "x-profile"
+PROFILE_MAX_DEPTH = 128
+
+
+class ProfileSession:
+    __slots__ = ("thread_id", "samples", "sample_count")
+
+    def __init__(self, thread_id: int):
+        self.thread_id = thread_id
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples thread stacks on a background thread while sessions are registered"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._sessions: Dict[object, ProfileSession] = {}  # marker frame -> session
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, marker_frame) -> ProfileSession:
+        session = ProfileSession(threading.get_ident())
+        with self._lock:
+            self._sessions[marker_frame] = session
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+        return session
+
+    def stop(self, marker_frame):
+        with self._lock:
+            self._sessions.pop(marker_frame, None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._sessions:
+                    self._thread = None
+                    return
+                sessions = dict(self._sessions)
+            thread_ids = {s.thread_id for s in sessions.values()}
+            frames = sys._current_frames()
+            for thread_id in thread_ids:
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None and len(stack) < PROFILE_MAX_DEPTH:
+                    session = sessions.get(frame)
+                    if session is not None:
+                        stack.reverse()
+                        session.samples[";".join(stack) or "<middleware>"] += 1
+                        session.sample_count += 1
+                        break
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+            del frames
+
+
+class ProfilingMiddleware:
+    """ASGI middleware; is_admin(headers) gates the X-Profile header, store(profile) persists"""
+
+    def __init__(self, app, is_admin: Callable[[Dict[str, str]], bool],
+                 store: Callable[[dict], Awaitable[None]]):
+        self.app = app
+        self.is_admin = is_admin
+        self.store = store
+        self.sampler = StackSampler(PROFILE_INTERVAL_MS / 1000)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        forced = False
+        if any(name == PROFILE_HEADER.encode() for name, _ in scope["headers"]):
+            headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+            forced = headers.get(PROFILE_HEADER) == "1" and self.is_admin(headers)
+        if not forced and (PROFILE_SAMPLE_RATE <= 0 or random.random() >= PROFILE_SAMPLE_RATE):
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        marker = sys._getframe()
+        session = self.sampler.start(marker)
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.sampler.stop(marker)
+            duration_ms = (time.perf_counter() - start) * 1000
+            if forced or duration_ms >= PROFILE_SLOW_MS:
+                await self.store(self._profile(scope, session, status_code, started_at, duration_ms, forced))
+
+    def _profile(self, scope, session: ProfileSession, status_code: int, started_at: datetime,
+                 duration_ms: float, forced: bool) -> dict:
+        route = scope.get("route")
+        stats = current_request_stats()
+        mongo = None
+        if stats is not None:
+            mongo = {
+                "round_trips": stats.round_trips,
+                "duration_ms": round(stats.duration * 1000, 2),
+                "documents": stats.documents,
+                "commands": {
+                    name: {"count": count, "duration_ms": round(seconds * 1000, 2)}
+                    for name, (count, seconds) in stats.commands.items()
+                }
+            }
+        return {
+            "profile_id": str(uuid.uuid4()),
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": route.path if route is not None else None,
+            "status": status_code,
+            "duration_ms": round(duration_ms, 2),
+            "forced": forced,
+            "interval_ms": PROFILE_INTERVAL_MS,
+            "sample_count": session.sample_count,
+            "folded": session.folded(),
+            "mongo": mongo,
+            "started_at": started_at.isoformat()
+        }
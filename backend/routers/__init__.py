@@ -0,0 +1,16 @@
+"""API routers, one module per area. Importing this package also registers their job handlers."""
+from routers import auth, events, contacts, badges, orders, tickets, leads, communications, jobs, profiles, archive
+
+all_routers = [
+    auth.router,
+    events.router,
+    contacts.router,
+    badges.router,
+    orders.router,
+    tickets.router,
+    leads.router,
+    communications.router,
+    jobs.router,
+    profiles.router,
+    archive.router,
+]
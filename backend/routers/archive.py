@@ -0,0 +1,350 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from bson import json_util
+from contextlib import aclosing
+from pymongo.errors import BulkWriteError
+from typing import Dict, Optional
+from datetime import datetime, timezone
+import asyncio
+import logging
+
+from admission import admit
+from auth import get_current_user
+from cold_storage import (
+    ArchiveError, ArchiveNotFound, CollectionWriter, archived_id_range, event_archive_dir, iter_archive, read_manifest,
+    write_manifest
+)
+from database import db
+from jobs import job_handler, enqueue_job, JobProgress, PermanentJobError, PRIORITY_LOW
+from routers.events import purge_collection_batched, purge_orders_batched
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+# ===== COLD STORAGE FOR FINISHED EVENTS =====
+
+# Collections keyed by event_id that move to disk. Payment transactions only carry
+# an order_id, so they are archived and deleted together with their orders.
+ARCHIVED_EVENT_COLLECTIONS = ["contacts", "leads", "email_messages"]
+ARCHIVED_COLLECTIONS = ARCHIVED_EVENT_COLLECTIONS + ["orders", "payment_transactions"]
+ARCHIVE_BATCH_SIZE = 1000
+ARCHIVE_WRITE_GRACE = 5  # seconds for writes that passed ensure_event_writable to land
+ARCHIVE_JOB_WAIT = 1800  # seconds to wait for contact syncs and campaigns still writing to the event
+ARCHIVE_JOB_POLL = 5
+DUPLICATE_KEY = 11000
+
+# While restoring, Mongo only holds part of the event, so reads stay on the archive
+ARCHIVE_READ_STATUSES = ["archived", "restoring"]
+
+
+def event_is_finished(event: dict) -> bool:
+    end = (event.get("dates") or {}).get("end")
+    return bool(end) and end < datetime.now(timezone.utc).date().isoformat()
+
+async def get_archived_event(tenant_id: str, event_id: str) -> Optional[dict]:
+    """The event, if its documents are currently served from cold storage"""
+    return await db.events.find_one(
+        {"event_id": event_id, "tenant_id": tenant_id, "archive_status": {"$in": ARCHIVE_READ_STATUSES}},
+        {"_id": 0}
+    )
+
+async def ensure_event_writable(tenant_id: str, event_id: str):
+    """409 while the event is archiving, archived or restoring: its documents are moving
+    between Mongo and disk, and a write made now would be lost"""
+    event = await db.events.find_one(
+        {"event_id": event_id, "tenant_id": tenant_id, "archive_status": {"$exists": True}},
+        {"_id": 0, "archive_status": 1}
+    )
+    if event:
+        raise HTTPException(status_code=409, detail=f"Event is {event['archive_status']}; its records are read-only")
+
+async def archived_documents(tenant_id: str, event_id: str, collection: str, match: dict, limit: int) -> list:
+    docs = []
+    async with aclosing(iter_archive(tenant_id, event_id, collection, match)) as archived:
+        async for doc in archived:
+            docs.append(doc)
+            if len(docs) >= limit:
+                break
+    return docs
+
+async def _export_collection(cursor, writer: CollectionWriter) -> Dict[str, int]:
+    try:
+        batch = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= ARCHIVE_BATCH_SIZE:
+                await writer.write_many(batch)
+                batch = []
+        await writer.write_many(batch)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.close()
+
+async def _export_orders(db, scope: dict, directory) -> Dict[str, Dict[str, int]]:
+    orders = CollectionWriter(directory, "orders")
+    transactions = CollectionWriter(directory, "payment_transactions")
+
+    async def flush(batch):
+        await orders.write_many(batch)
+        order_ids = [o["order_id"] for o in batch]
+        await transactions.write_many(await db.payment_transactions.find({"order_id": {"$in": order_ids}}).to_list(None))
+
+    try:
+        batch = []
+        async for order in db.orders.find(scope).sort("_id", 1).batch_size(ARCHIVE_BATCH_SIZE):
+            batch.append(order)
+            if len(batch) >= ARCHIVE_BATCH_SIZE:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+    except BaseException:
+        orders.abort()
+        transactions.abort()
+        raise
+    return {"orders": orders.close(), "payment_transactions": transactions.close()}
+
+async def _count_order_transactions(db, scope: dict) -> int:
+    count, order_ids = 0, []
+    async for order in db.orders.find(scope, {"_id": 0, "order_id": 1}).batch_size(ARCHIVE_BATCH_SIZE):
+        order_ids.append(order["order_id"])
+        if len(order_ids) >= ARCHIVE_BATCH_SIZE:
+            count += await db.payment_transactions.count_documents({"order_id": {"$in": order_ids}})
+            order_ids = []
+    if order_ids:
+        count += await db.payment_transactions.count_documents({"order_id": {"$in": order_ids}})
+    return count
+
+async def _running_event_writers(db, tenant_id: str, event_id: str) -> int:
+    """Contact syncs and email campaigns for the event that a live worker is running.
+    They check the event once when they start and then write for minutes."""
+    campaign_ids = await db.email_campaigns.distinct("campaign_id", {"tenant_id": tenant_id, "event_id": event_id})
+    return await db.jobs.count_documents({
+        "tenant_id": tenant_id,
+        "status": "running",
+        "lease_expires_at": {"$gte": datetime.now(timezone.utc).isoformat()},
+        "$or": [
+            {"type": "contacts_sync", "payload.event_id": event_id},
+            {"type": "email_campaign", "payload.campaign_id": {"$in": campaign_ids}}
+        ]
+    })
+
+async def _wait_for_event_writers(db, tenant_id: str, event_id: str, progress: Optional[JobProgress]):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + ARCHIVE_JOB_WAIT
+    while await _running_event_writers(db, tenant_id, event_id):
+        if loop.time() > deadline:
+            raise ArchiveError(f"A contact sync or email campaign was still running after {ARCHIVE_JOB_WAIT}s")
+        if progress:
+            await progress(0, message="Waiting for contact syncs and email campaigns to finish")
+        await asyncio.sleep(ARCHIVE_JOB_POLL)
+
+async def _export_event(db, event: dict, scope: dict, progress: Optional[JobProgress]) -> dict:
+    directory = event_archive_dir(event["tenant_id"], event["event_id"])
+    files = {}
+    for name in ARCHIVED_EVENT_COLLECTIONS:
+        if progress:
+            await progress(sum(f["count"] for f in files.values()), message=f"Archiving {name}")
+        cursor = db[name].find(scope).sort("_id", 1).batch_size(ARCHIVE_BATCH_SIZE)
+        files[name] = await _export_collection(cursor, CollectionWriter(directory, name))
+    if progress:
+        await progress(sum(f["count"] for f in files.values()), message="Archiving orders")
+    files.update(await _export_orders(db, scope, directory))
+
+    # Nothing is deleted unless every document made it to disk
+    in_mongo = {name: await db[name].count_documents(scope) for name in ARCHIVED_EVENT_COLLECTIONS + ["orders"]}
+    in_mongo["payment_transactions"] = await _count_order_transactions(db, scope)
+    for name, count in in_mongo.items():
+        if count != files[name]["count"]:
+            raise ArchiveError(f"{name}: wrote {files[name]['count']} documents but Mongo holds {count}")
+    return write_manifest(directory, event["tenant_id"], event, files)
+
+async def archive_event(db, event: dict, progress: Optional[JobProgress] = None) -> dict:
+    """Write an event's documents to cold storage, then delete them from Mongo.
+
+    Writes to the event are refused from the moment it is marked archiving, the export
+    waits for contact syncs and campaigns already running against it, and only
+    documents up to the last exported _id of each collection are deleted, so nothing
+    that reached Mongo after its export is lost.
+
+    Safe to re-run: an interrupted export is redone from scratch, and once the
+    manifest is written a re-run only finishes the deletes.
+    """
+    tenant_id, event_id = event["tenant_id"], event["event_id"]
+    scope = {"tenant_id": tenant_id, "event_id": event_id}
+
+    if event.get("archive_status") != "archived":
+        await db.events.update_one(scope, {"$set": {"archive_status": "archiving"}})
+        try:
+            await asyncio.sleep(ARCHIVE_WRITE_GRACE)
+            await _wait_for_event_writers(db, tenant_id, event_id, progress)
+            manifest = await _export_event(db, event, scope, progress)
+        except BaseException:
+            # The event stays in Mongo and writable; a retry starts over
+            await db.events.update_one(scope, {"$unset": {"archive_status": ""}})
+            raise
+        await db.events.update_one(scope, {"$set": {
+            "archive_status": "archived",
+            "archived_at": manifest["archived_at"],
+            "archive_counts": {name: f["count"] for name, f in manifest["files"].items()}
+        }})
+
+    files = read_manifest(tenant_id, event_id)["files"]
+    if progress:
+        await progress(0, message="Removing archived documents from the database")
+    for name in ARCHIVED_EVENT_COLLECTIONS:
+        await purge_collection_batched(db[name], {**scope, **archived_id_range(files[name])})
+    await purge_orders_batched(
+        {**scope, **archived_id_range(files["orders"])},
+        transaction_query=archived_id_range(files["payment_transactions"])
+    )
+
+    logger.info(f"Archived event {event_id} of tenant {tenant_id}")
+    return {"event_id": event_id, "archived": files}
+
+async def _insert_ignoring_duplicates(collection, docs) -> int:
+    """Bulk insert that tolerates documents already restored by an earlier attempt"""
+    try:
+        result = await collection.insert_many(docs, ordered=False)
+        return len(result.inserted_ids)
+    except BulkWriteError as e:
+        if any(err["code"] != DUPLICATE_KEY for err in e.details["writeErrors"]):
+            raise
+        return e.details["nInserted"]
+
+async def restore_event(db, event: dict, progress: Optional[JobProgress] = None) -> dict:
+    """Bulk-load an archived event back into Mongo. The archive files are kept."""
+    tenant_id, event_id = event["tenant_id"], event["event_id"]
+    scope = {"tenant_id": tenant_id, "event_id": event_id}
+    manifest = read_manifest(tenant_id, event_id)
+    total = sum(f["count"] for f in manifest["files"].values())
+    await db.events.update_one(scope, {"$set": {"archive_status": "restoring"}})
+
+    restored, done = {}, 0
+    for name in manifest["files"]:
+        restored[name] = 0
+        batch = []
+        # Keep _id so a restored event is identical to the one that was archived
+        async for doc in iter_archive(tenant_id, event_id, name, projection_exclude=()):
+            batch.append(doc)
+            if len(batch) >= ARCHIVE_BATCH_SIZE:
+                restored[name] += await _insert_ignoring_duplicates(db[name], batch)
+                done += len(batch)
+                batch = []
+                if progress:
+                    await progress(done, total=total, message=f"Restoring {name}")
+        if batch:
+            restored[name] += await _insert_ignoring_duplicates(db[name], batch)
+            done += len(batch)
+
+    await db.events.update_one(scope, {
+        "$unset": {"archive_status": "", "archived_at": "", "archive_counts": ""},
+        "$set": {"restored_at": datetime.now(timezone.utc).isoformat()}
+    })
+    logger.info(f"Restored event {event_id} of tenant {tenant_id}")
+    return {"event_id": event_id, "restored": restored}
+
+def require_event_admin(current_user: dict):
+    if current_user["role"] not in ["super_admin", "organiser_admin"]:
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+
+@router.post("/events/{event_id}/archive", dependencies=[Depends(admit("bulk"))])
+async def enqueue_event_archive(event_id: str, force: bool = False, current_user: dict = Depends(get_current_user)):
+    """Move a finished event's contacts, leads, messages and orders to cold storage; poll /api/jobs/{job_id}"""
+    require_event_admin(current_user)
+    event = await db.events.find_one({"event_id": event_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    if event.get("archive_status") in ARCHIVE_READ_STATUSES:
+        raise HTTPException(status_code=409, detail="Event is already archived")
+    if not force and not event_is_finished(event):
+        raise HTTPException(status_code=409, detail="Only events that have ended can be archived")
+
+    job_id = await enqueue_job(
+        db, "event_archive", current_user["tenant_id"], {"event_id": event_id},
+        user_id=current_user["user_id"], priority=PRIORITY_LOW
+    )
+    return {"job_id": job_id}
+
+@router.post("/events/{event_id}/restore", dependencies=[Depends(admit("bulk"))])
+async def enqueue_event_restore(event_id: str, current_user: dict = Depends(get_current_user)):
+    """Load an archived event back into the database; poll /api/jobs/{job_id}.
+
+    An event left restoring by a worker that died can be restored again: documents
+    already loaded are skipped."""
+    require_event_admin(current_user)
+    event = await db.events.find_one({"event_id": event_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    if event.get("archive_status") not in ARCHIVE_READ_STATUSES:
+        raise HTTPException(status_code=409, detail="Event is not archived")
+
+    job_id = await enqueue_job(
+        db, "event_restore", current_user["tenant_id"], {"event_id": event_id},
+        user_id=current_user["user_id"]
+    )
+    return {"job_id": job_id}
+
+@router.get("/archive/events/{event_id}")
+async def get_event_archive(event_id: str, current_user: dict = Depends(get_current_user)):
+    """Archive manifest: document counts and file sizes per collection"""
+    if not await get_archived_event(current_user["tenant_id"], event_id):
+        raise HTTPException(status_code=404, detail="Event is not archived")
+    manifest = read_manifest(current_user["tenant_id"], event_id)
+    return {"event_id": event_id, "archived_at": manifest["archived_at"], "files": manifest["files"]}
+
+@router.get("/archive/events/{event_id}/{collection}")
+async def stream_event_archive(
+    event_id: str,
+    collection: str,
+    type: Optional[str] = None,
+    status: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Read-only NDJSON stream of an archived collection, for reports over past events"""
+    if collection not in ARCHIVED_COLLECTIONS:
+        raise HTTPException(status_code=404, detail="Unknown archived collection")
+    if not await get_archived_event(current_user["tenant_id"], event_id):
+        raise HTTPException(status_code=404, detail="Event is not archived")
+
+    match = {}
+    if type:
+        match["type"] = type
+    if status:
+        match["status"] = status
+
+    async def ndjson():
+        async for doc in iter_archive(current_user["tenant_id"], event_id, collection, match, ("_id", "qr_code")):
+            yield json_util.dumps(doc) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@job_handler("event_archive")
+async def run_event_archive(db, job: dict, progress: JobProgress):
+    event = await db.events.find_one({"event_id": job["payload"]["event_id"], "tenant_id": job["tenant_id"]}, {"_id": 0})
+    if not event:
+        raise PermanentJobError("Event not found")
+    try:
+        return await archive_event(db, event, progress)
+    except ArchiveError as e:
+        raise PermanentJobError(str(e))
+
+@job_handler("event_restore")
+async def run_event_restore(db, job: dict, progress: JobProgress):
+    event = await db.events.find_one({"event_id": job["payload"]["event_id"], "tenant_id": job["tenant_id"]}, {"_id": 0})
+    if not event:
+        raise PermanentJobError("Event not found")
+    try:
+        return await restore_event(db, event, progress)
+    except ArchiveNotFound as e:
+        raise PermanentJobError(str(e))
+    except Exception:
+        if job["attempts"] >= job["max_attempts"]:
+            # Out of retries: the archive still holds everything, so serve the event from it again
+            await db.events.update_one(
+                {"event_id": event["event_id"], "tenant_id": event["tenant_id"], "archive_status": "restoring"},
+                {"$set": {"archive_status": "archived"}}
+            )
+        raise
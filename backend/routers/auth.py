@@ -0,0 +1,100 @@
+from fastapi import APIRouter, HTTPException, Depends, status
+from datetime import datetime, timezone
+import uuid
+
+from auth import get_current_user, verify_password, get_password_hash, create_access_token
+from database import db
+from models import TenantSettings, UserCreate, UserLogin, UserResponse, Token
+
+router = APIRouter()
+
+# ===== AUTH ROUTES =====
+
+@router.post("/auth/register", response_model=UserResponse)
+async def register(user_data: UserCreate):
+    # Check if email exists
+    existing_user = await db.users.find_one({"email": user_data.email}, {"_id": 0})
+    if existing_user:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    
+    # Create tenant if no tenant_id provided (new organization registration)
+    tenant_id = user_data.tenant_id
+    if not tenant_id:
+        tenant_id = str(uuid.uuid4())
+        tenant_doc = {
+            "tenant_id": tenant_id,
+            "name": f"{user_data.name}'s Organization",
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }
+        await db.tenants.insert_one(tenant_doc)
+    
+    user_id = str(uuid.uuid4())
+    hashed_password = get_password_hash(user_data.password)
+    
+    user_doc = {
+        "user_id": user_id,
+        "email": user_data.email,
+        "name": user_data.name,
+        "password_hash": hashed_password,
+        "role": user_data.role,
+        "tenant_id": tenant_id,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+    
+    await db.users.insert_one(user_doc)
+    
+    return UserResponse(
+        user_id=user_id,
+        email=user_data.email,
+        name=user_data.name,
+        role=user_data.role,
+        tenant_id=tenant_id
+    )
+
+@router.post("/auth/login", response_model=Token)
+async def login(user_data: UserLogin):
+    user = await db.users.find_one({"email": user_data.email}, {"_id": 0})
+    if not user or not verify_password(user_data.password, user["password_hash"]):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password"
+        )
+    
+    access_token = create_access_token(
+        data={"sub": user["user_id"], "tenant_id": user["tenant_id"], "role": user["role"]}
+    )
+    
+    return Token(
+        access_token=access_token,
+        token_type="bearer",
+        user=UserResponse(**user)
+    )
+
+@router.get("/auth/me", response_model=UserResponse)
+async def get_me(current_user: dict = Depends(get_current_user)):
+    return UserResponse(**current_user)
+
+# ===== TENANT SETTINGS =====
+
+@router.get("/settings", response_model=TenantSettings)
+async def get_settings(current_user: dict = Depends(get_current_user)):
+    settings = await db.settings.find_one({"tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    if not settings:
+        return TenantSettings(tenant_id=current_user["tenant_id"])
+    return TenantSettings(**settings)
+
+@router.put("/settings")
+async def update_settings(settings: TenantSettings, current_user: dict = Depends(get_current_user)):
+    if current_user["role"] not in ["super_admin", "organiser_admin"]:
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    
+    settings.tenant_id = current_user["tenant_id"]
+    settings.updated_at = datetime.now(timezone.utc)
+    
+    await db.settings.update_one(
+        {"tenant_id": current_user["tenant_id"]},
+        {"$set": settings.model_dump()},
+        upsert=True
+    )
+    
+    return {"message": "Settings updated successfully"}
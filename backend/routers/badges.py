@@ -0,0 +1,477 @@
+from fastapi import APIRouter, HTTPException, Depends, File, Query, Request, UploadFile
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pymongo.errors import DuplicateKeyError
+from typing import List, Optional
+from datetime import datetime, timezone
+from io import BytesIO
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+import uuid
+
+from admission import admit
+from badge_assets import (
+    BADGE_ASSET_MAX_BYTES, InvalidAsset, asset_id_from_content, ensure_badge_asset_indexes, load_badge_images,
+    read_badge_asset, store_badge_asset
+)
+from auth import get_current_user
+from database import db
+from jobs import job_handler, enqueue_job, store_job_file, JobProgress, PermanentJobError, PRIORITY_HIGH
+from models import BadgeAssetResponse, BadgeTemplateCreate, BadgeTemplateResponse
+from routers.contacts import contact_qr_url
+from spooler import BADGE_PRINTERS, PrinterUnavailable, get_spooler
+from zpl import DEFAULT_DPI, render_badge_zpl
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+BADGE_PREVIEW_TTL_SECONDS = int(os.getenv('BADGE_PREVIEW_TTL_SECONDS', str(7 * 24 * 3600)))
+PRINT_JOB_TYPE = "badge_print"  # run only by the spooler process, see worker.py --spooler
+
+async def ensure_badge_indexes(db):
+    await db.badge_previews.create_index("cache_key", unique=True)
+    await db.badge_previews.create_index("template_id")
+    await db.badge_previews.create_index("created_at", expireAfterSeconds=BADGE_PREVIEW_TTL_SECONDS)
+    await ensure_badge_asset_indexes(db)
+
+# ===== BADGE TEMPLATES =====
+
+@router.post("/badge-templates", response_model=BadgeTemplateResponse)
+async def create_badge_template(template: BadgeTemplateCreate, current_user: dict = Depends(get_current_user)):
+    template_id = str(uuid.uuid4())
+    template_doc = {
+        "template_id": template_id,
+        "tenant_id": current_user["tenant_id"],
+        "event_id": template.event_id,
+        "name": template.name,
+        "width": template.width,
+        "height": template.height,
+        "elements": [e.model_dump() for e in template.elements],
+        "is_default": template.is_default,
+        "version": 1,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+    
+    await db.badge_templates.insert_one(template_doc)
+    template_doc["created_at"] = datetime.fromisoformat(template_doc["created_at"])
+    return BadgeTemplateResponse(**template_doc)
+
+@router.get("/badge-templates", response_model=List[BadgeTemplateResponse])
+async def get_badge_templates(event_id: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    query = {"tenant_id": current_user["tenant_id"]}
+    if event_id:
+        query["event_id"] = event_id
+    
+    templates = await db.badge_templates.find(query, {"_id": 0}).to_list(1000)
+    for template in templates:
+        template["created_at"] = datetime.fromisoformat(template["created_at"])
+    return [BadgeTemplateResponse(**t) for t in templates]
+
+@router.get("/badge-templates/{template_id}", response_model=BadgeTemplateResponse)
+async def get_badge_template(template_id: str, current_user: dict = Depends(get_current_user)):
+    template = await db.badge_templates.find_one({"template_id": template_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    if not template:
+        raise HTTPException(status_code=404, detail="Template not found")
+    template["created_at"] = datetime.fromisoformat(template["created_at"])
+    return BadgeTemplateResponse(**template)
+
+@router.put("/badge-templates/{template_id}", response_model=BadgeTemplateResponse)
+async def update_badge_template(template_id: str, template: BadgeTemplateCreate, current_user: dict = Depends(get_current_user)):
+    existing = await db.badge_templates.find_one({"template_id": template_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    if not existing:
+        raise HTTPException(status_code=404, detail="Template not found")
+    
+    update_doc = {
+        "name": template.name,
+        "width": template.width,
+        "height": template.height,
+        "elements": [e.model_dump() for e in template.elements],
+        "is_default": template.is_default
+    }
+    
+    # version keys cached badge previews
+    await db.badge_templates.update_one(
+        {"template_id": template_id, "tenant_id": current_user["tenant_id"]},
+        {"$set": update_doc, "$inc": {"version": 1}}
+    )
+    
+    updated = await db.badge_templates.find_one({"template_id": template_id}, {"_id": 0})
+    updated["created_at"] = datetime.fromisoformat(updated["created_at"])
+    return BadgeTemplateResponse(**updated)
+
+@router.delete("/badge-templates/{template_id}")
+async def delete_badge_template(template_id: str, current_user: dict = Depends(get_current_user)):
+    result = await db.badge_templates.delete_one({"template_id": template_id, "tenant_id": current_user["tenant_id"]})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Template not found")
+    await db.badge_previews.delete_many({"template_id": template_id})
+    return {"message": "Badge template deleted successfully"}
+
+@router.get("/badge-templates/{template_id}/preview.png", dependencies=[Depends(admit("print"))])
+async def preview_badge_template(
+    template_id: str,
+    request: Request,
+    contact_id: Optional[str] = None,
+    dpi: int = Query(150, ge=72, le=600),
+    current_user: dict = Depends(get_current_user)
+):
+    """Render one badge to PNG with the same code that prints it; defaults to the event's first contact"""
+    template = await db.badge_templates.find_one({"template_id": template_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    if not template:
+        raise HTTPException(status_code=404, detail="Template not found")
+    
+    if contact_id:
+        contact = await db.contacts.find_one({"contact_id": contact_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    else:
+        contact = await db.contacts.find_one(
+            {"event_id": template["event_id"], "tenant_id": current_user["tenant_id"]}, {"_id": 0}, sort=[("name", 1)]
+        )
+    if not contact:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    
+    # Both documents bump `version` on every edit, so a key never has to be invalidated
+    cache_key = f"{template_id}:{template.get('version', 0)}:{contact['contact_id']}:{contact.get('version', 0)}:{dpi}"
+    etag = f'"{hashlib.sha1(cache_key.encode()).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    cached = await db.badge_previews.find_one({"cache_key": cache_key}, {"_id": 0, "png": 1})
+    if cached:
+        return Response(content=cached["png"], media_type="image/png", headers=headers)
+    
+    images = await load_badge_images(db, current_user["tenant_id"], template)
+    png = await asyncio.to_thread(render_badge_png, template, contact, dpi, images)
+    try:
+        await db.badge_previews.update_one(
+            {"cache_key": cache_key},
+            {"$setOnInsert": {
+                "tenant_id": current_user["tenant_id"],
+                "template_id": template_id,
+                "png": png,
+                "created_at": datetime.now(timezone.utc)  # BSON date for the TTL index
+            }},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        pass  # another request rendered the same preview first
+    return Response(content=png, media_type="image/png", headers=headers)
+
+# ===== BADGE ASSETS =====
+
+@router.post("/badge-assets", response_model=BadgeAssetResponse)
+async def upload_badge_asset(file: UploadFile = File(...), current_user: dict = Depends(get_current_user)):
+    """Store a logo or image for badge templates; uploading the same file again returns the existing asset"""
+    data = await file.read(BADGE_ASSET_MAX_BYTES + 1)
+    if len(data) > BADGE_ASSET_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Image is too large")
+    try:
+        asset = await store_badge_asset(db, current_user["tenant_id"], file.filename or "image", data)
+    except InvalidAsset as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    asset["created_at"] = datetime.fromisoformat(asset["created_at"])
+    return BadgeAssetResponse(**asset)
+
+@router.get("/badge-assets", response_model=List[BadgeAssetResponse])
+async def get_badge_assets(current_user: dict = Depends(get_current_user)):
+    assets = await db.badge_assets.find(
+        {"tenant_id": current_user["tenant_id"]}, {"_id": 0, "file_id": 0}
+    ).sort("created_at", -1).to_list(1000)
+    for asset in assets:
+        asset["created_at"] = datetime.fromisoformat(asset["created_at"])
+    return [BadgeAssetResponse(**a) for a in assets]
+
+@router.get("/badge-assets/{asset_id}")
+async def get_badge_asset(asset_id: str, current_user: dict = Depends(get_current_user)):
+    asset = await db.badge_assets.find_one({"tenant_id": current_user["tenant_id"], "asset_id": asset_id}, {"_id": 0})
+    if not asset:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    # Content-addressed, so the bytes behind an id never change
+    return Response(
+        content=await read_badge_asset(db, asset),
+        media_type=asset["content_type"],
+        headers={"ETag": f'"{asset_id}"', "Cache-Control": "private, max-age=31536000, immutable"}
+    )
+
+# ===== BADGE PDF GENERATION =====
+
+@router.get("/badges/print/{contact_id}", dependencies=[Depends(admit("print"))])
+async def generate_badge_pdf(contact_id: str, template_id: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    """Generate a 4x12 inch PDF for Zebra printer with badge duplicated and flipped"""
+    contact = await db.contacts.find_one({"contact_id": contact_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    if not contact:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    
+    # Get template
+    if template_id:
+        template = await db.badge_templates.find_one({"template_id": template_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    else:
+        template = await db.badge_templates.find_one({"event_id": contact["event_id"], "is_default": True, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    
+    if not template:
+        raise HTTPException(status_code=404, detail="No template found")
+    
+    images = await load_badge_images(db, current_user["tenant_id"], template)
+    buffer = BytesIO(render_badges_pdf(template, [contact], images))
+    return StreamingResponse(buffer, media_type="application/pdf", headers={"Content-Disposition": f"attachment; filename=badge_{contact_id}.pdf"})
+
+async def find_badge_template(tenant_id: str, event_id: str, template_id: Optional[str] = None):
+    if template_id:
+        return await db.badge_templates.find_one({"template_id": template_id, "tenant_id": tenant_id}, {"_id": 0})
+    return await db.badge_templates.find_one({"event_id": event_id, "is_default": True, "tenant_id": tenant_id}, {"_id": 0})
+
+async def render_contact_zpl(contact_id: str, template_id: Optional[str], dpi: int, current_user: dict) -> str:
+    contact = await db.contacts.find_one({"contact_id": contact_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0, "qr_code": 0})
+    if not contact:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    template = await find_badge_template(current_user["tenant_id"], contact["event_id"], template_id)
+    if not template:
+        raise HTTPException(status_code=404, detail="No template found")
+    # The printer draws the QR itself from the same URL the stored PNG encodes
+    return render_badge_zpl(template, contact, contact_qr_url(contact_id), dpi)
+
+@router.get("/badges/print/{contact_id}/zpl", response_class=PlainTextResponse, dependencies=[Depends(admit("print"))])
+async def generate_badge_zpl(
+    contact_id: str,
+    template_id: Optional[str] = None,
+    dpi: int = Query(DEFAULT_DPI, ge=150, le=600),
+    current_user: dict = Depends(get_current_user)
+):
+    """ZPL II label for a Zebra printer; a fraction of the size of the PDF"""
+    zpl = await render_contact_zpl(contact_id, template_id, dpi, current_user)
+    return PlainTextResponse(zpl, headers={"Content-Disposition": f"attachment; filename=badge_{contact_id}.zpl"})
+
+@router.post("/badges/print/{contact_id}/spool", dependencies=[Depends(admit("print"))])
+async def spool_badge(
+    contact_id: str,
+    printer: str,
+    template_id: Optional[str] = None,
+    dpi: int = Query(DEFAULT_DPI, ge=150, le=600),
+    current_user: dict = Depends(get_current_user)
+):
+    """Queue a badge for a configured network printer; poll /api/jobs/{job_id}.
+
+    The label is rendered here and delivered by the spooler process in the order it
+    was queued. It is never retried as a new job, so a lost label is reprinted by
+    hand rather than printed twice."""
+    if printer not in BADGE_PRINTERS:
+        raise HTTPException(status_code=404, detail="Printer not found")
+    zpl = await render_contact_zpl(contact_id, template_id, dpi, current_user)
+    job_id = await enqueue_job(
+        db, PRINT_JOB_TYPE, current_user["tenant_id"],
+        {"printer": printer, "contact_id": contact_id, "zpl": zpl},
+        user_id=current_user["user_id"], priority=PRIORITY_HIGH, max_attempts=1
+    )
+    return {"job_id": job_id, "printer": printer, "bytes": len(zpl.encode())}
+
+@job_handler(PRINT_JOB_TYPE)
+async def run_badge_print(db, job, progress: JobProgress):
+    payload = job["payload"]
+    spooler = get_spooler()
+    if payload["printer"] not in spooler.printers:
+        raise PermanentJobError(f"Printer {payload['printer']} is not configured on the spooler")
+    data = payload["zpl"].encode()
+    try:
+        await spooler.submit(payload["printer"], data)
+    except PrinterUnavailable as e:
+        raise PermanentJobError(str(e))
+    return {"printer": payload["printer"], "bytes": len(data)}
+
+@router.get("/badges/printers")
+async def get_printers(current_user: dict = Depends(get_current_user)):
+    """Configured printers with the status last published by the spooler and the labels waiting for each"""
+    statuses = {doc["printer"]: doc async for doc in db.printer_status.find({}, {"_id": 0})}
+    waiting = {
+        doc["_id"]: doc["queued"]
+        async for doc in db.jobs.aggregate([
+            {"$match": {"status": "queued", "type": PRINT_JOB_TYPE}},
+            {"$group": {"_id": "$payload.printer", "queued": {"$sum": 1}}}
+        ])
+    }
+    printers = {}
+    for name, (host, port) in BADGE_PRINTERS.items():
+        status = statuses.get(name) or {"connected": False, "updated_at": None}
+        printers[name] = {**status, "host": host, "port": port, "queued": waiting.get(name, 0)}
+    return printers
+
+@router.post("/badges/print-batch", dependencies=[Depends(admit("bulk"))])
+async def enqueue_badge_batch(
+    event_id: str,
+    template_id: Optional[str] = None,
+    type: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Queue a multi-page badge PDF for every contact of an event; poll /api/jobs/{job_id}"""
+    event = await db.events.find_one({"event_id": event_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    
+    job_id = await enqueue_job(
+        db, "badge_batch", current_user["tenant_id"],
+        {"event_id": event_id, "template_id": template_id, "type": type},
+        user_id=current_user["user_id"], priority=PRIORITY_HIGH
+    )
+    return {"job_id": job_id}
+
+def render_badges_pdf(template, contacts, images=None) -> bytes:
+    """Render one 4x12 inch page per contact with the badge duplicated and flipped"""
+    # ReportLab is only loaded by processes that actually print badges
+    from reportlab.lib.units import inch
+    from reportlab.pdfgen import canvas as pdf_canvas
+    
+    buffer = BytesIO()
+    
+    # 4x12 inch page
+    page_width = 4 * inch
+    page_height = 12 * inch
+    c = pdf_canvas.Canvas(buffer, pagesize=(page_width, page_height))
+    
+    # Badge dimensions
+    badge_width = 4 * inch
+    badge_height = 6 * inch
+    
+    for contact in contacts:
+        # Draw first badge (bottom half)
+        y_offset_1 = 0
+        draw_badge_on_canvas(c, template, contact, 0, y_offset_1, badge_width, badge_height, images)
+        
+        # Draw second badge (top half, flipped 180 degrees)
+        y_offset_2 = 6 * inch
+        c.saveState()
+        c.translate(badge_width, y_offset_2 + badge_height)
+        c.rotate(180)
+        draw_badge_on_canvas(c, template, contact, 0, 0, badge_width, badge_height, images)
+        c.restoreState()
+        
+        c.showPage()
+    
+    c.save()
+    return buffer.getvalue()
+
+class DrawingCanvas:
+    """Records the ReportLab canvas calls draw_badge_on_canvas makes into a Drawing,
+    so renderPM can rasterize a badge with the same fonts and layout as the PDF"""
+    
+    def __init__(self, width, height):
+        from reportlab.graphics.shapes import Drawing
+        from reportlab.lib import colors
+        
+        self.drawing = Drawing(width, height)
+        # ReportLab canvas defaults
+        self._font_name = "Helvetica"
+        self._font_size = 12
+        self._fill_color = colors.black
+    
+    def setFont(self, font_name, font_size, leading=None):
+        self._font_name = font_name
+        self._font_size = font_size
+    
+    def setFillColor(self, color, alpha=None):
+        from reportlab.lib.colors import toColor
+        self._fill_color = toColor(color)
+    
+    def drawString(self, x, y, text, **kwargs):
+        from reportlab.graphics.shapes import String
+        self.drawing.add(String(x, y, text, fontName=self._font_name, fontSize=self._font_size, fillColor=self._fill_color))
+    
+    def drawImage(self, image, x, y, width=None, height=None, mask=None, **kwargs):
+        from reportlab.graphics.shapes import Image as ImageShape
+        from PIL import Image
+        
+        if hasattr(image, "getRGBData"):  # ImageReader
+            source = getattr(image, "_image", None)  # the PIL image it wraps, alpha intact
+            if mask == "auto" and source is not None and source.mode in ("RGBA", "LA", "PA"):
+                # renderPM ignores alpha; flatten onto the white badge the way the PDF shows it
+                rgba = source.convert("RGBA")
+                image = Image.new("RGB", rgba.size, "white")
+                image.paste(rgba, mask=rgba.getchannel("A"))
+            else:
+                image = Image.frombytes("RGB", image.getSize(), image.getRGBData())
+        self.drawing.add(ImageShape(x, y, width, height, image))
+
+def render_badge_png(template, contact, dpi: int, images=None) -> bytes:
+    """Rasterize a single badge, at the size render_badges_pdf prints it"""
+    from reportlab.graphics import renderPM
+    from reportlab.lib.units import inch
+    
+    badge_width = 4 * inch
+    badge_height = 6 * inch
+    c = DrawingCanvas(badge_width, badge_height)
+    draw_badge_on_canvas(c, template, contact, 0, 0, badge_width, badge_height, images)
+    return renderPM.drawToString(c.drawing, fmt="PNG", dpi=dpi)
+
+@job_handler("badge_batch")
+async def run_badge_batch(db, job: dict, progress: JobProgress):
+    payload = job["payload"]
+    tenant_id = job["tenant_id"]
+    if payload.get("template_id"):
+        template = await db.badge_templates.find_one({"template_id": payload["template_id"], "tenant_id": tenant_id}, {"_id": 0})
+    else:
+        template = await db.badge_templates.find_one({"event_id": payload["event_id"], "is_default": True, "tenant_id": tenant_id}, {"_id": 0})
+    if not template:
+        raise PermanentJobError("No template found")
+    
+    query = {"tenant_id": tenant_id, "event_id": payload["event_id"]}
+    if payload.get("type"):
+        query["type"] = payload["type"]
+    contacts = await db.contacts.find(query, {"_id": 0}).sort("name", 1).to_list(None)
+    await progress(0, total=len(contacts), message="Rendering badges")
+    
+    # Each image is fetched and decoded once for the whole batch, not once per badge
+    images = await load_badge_images(db, tenant_id, template)
+    # ReportLab is CPU bound; render off the event loop so the job lease keeps renewing
+    pdf_bytes = await asyncio.to_thread(render_badges_pdf, template, contacts, images)
+    await progress(len(contacts), total=len(contacts), message="Done")
+    return await store_job_file(db, job, f"badges_{payload['event_id']}.pdf", pdf_bytes, "application/pdf")
+
+def draw_badge_on_canvas(c, template, contact, x_offset, y_offset, width, height, images=None):
+    """Helper to draw badge elements on canvas; `images` maps asset ids to ImageReaders from load_badge_images"""
+    from reportlab.lib.units import inch
+    from reportlab.lib.utils import ImageReader
+    from PIL import Image
+    
+    for element in template["elements"]:
+        elem_x = x_offset + (element["x"] / template["width"]) * width
+        elem_y = y_offset + height - (element["y"] / template["height"]) * height
+        
+        if element["type"] == "text":
+            c.setFont(element.get("fontFamily", "Helvetica"), element.get("fontSize", 16))
+            c.setFillColor(element.get("color", "#000000"))
+            c.drawString(elem_x, elem_y, element["content"])
+        
+        elif element["type"] == "field":
+            field_value = contact.get(element["content"], "")
+            c.setFont(element.get("fontFamily", "Helvetica"), element.get("fontSize", 16))
+            c.drawString(elem_x, elem_y, str(field_value))
+        
+        elif element["type"] == "qrcode":
+            if contact.get("qr_code"):
+                try:
+                    qr_data = contact["qr_code"].split(",")[1]
+                    qr_bytes = base64.b64decode(qr_data)
+                    qr_img = Image.open(BytesIO(qr_bytes))
+                    img_reader = ImageReader(qr_img)
+                    qr_size = element.get("width", 1) * inch
+                    c.drawImage(img_reader, elem_x, elem_y - qr_size, width=qr_size, height=qr_size)
+                except Exception as e:
+                    logger.error(f"Error drawing QR code: {e}")
+        
+        elif element["type"] == "image":
+            img_reader = (images or {}).get(asset_id_from_content(element.get("content")))
+            if img_reader is None:
+                continue  # unknown asset; load_badge_images logged it
+            box_width = (element.get("width") or 100) / template["width"] * width
+            box_height = (element.get("height") or 100) / template["height"] * height
+            # Fit inside the element's box, centred, keeping the image's aspect ratio
+            pixel_width, pixel_height = img_reader.getSize()
+            scale = min(box_width / pixel_width, box_height / pixel_height)
+            img_width, img_height = pixel_width * scale, pixel_height * scale
+            c.drawImage(
+                img_reader,
+                elem_x + (box_width - img_width) / 2,
+                elem_y - box_height + (box_height - img_height) / 2,
+                width=img_width, height=img_height, mask="auto"
+            )
@@ -0,0 +1,78 @@
+from fastapi import APIRouter, HTTPException, Depends
+from typing import List, Optional
+from datetime import datetime, timezone
+import uuid
+
+from admission import admit
+from auth import get_current_user
+from database import db
+from jobs import job_handler, enqueue_job, JobProgress
+from models import EmailCampaignCreate, EmailCampaignResponse
+from routers.archive import ensure_event_writable
+
+router = APIRouter()
+
+# ===== COMMUNICATIONS =====
+
+async def ensure_email_indexes(db):
+    # Delivery state is upserted per recipient, and a retried campaign skips everyone already in it
+    await db.email_messages.create_index([("campaign_id", 1), ("contact_id", 1)], unique=True)
+
+@router.post("/communications/campaigns", response_model=EmailCampaignResponse, dependencies=[Depends(admit("bulk"))])
+async def create_email_campaign(campaign: EmailCampaignCreate, current_user: dict = Depends(get_current_user)):
+    """Create a campaign and start sending it in the background"""
+    if current_user["role"] not in ["super_admin", "organiser_admin"]:
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+    
+    event = await db.events.find_one({"event_id": campaign.event_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    await ensure_event_writable(current_user["tenant_id"], campaign.event_id)
+    
+    campaign_doc = {
+        "campaign_id": str(uuid.uuid4()),
+        "tenant_id": current_user["tenant_id"],
+        "user_id": current_user["user_id"],
+        "event_id": campaign.event_id,
+        "subject": campaign.subject,
+        "content": campaign.content,
+        "recipient_type": campaign.recipient_type,
+        "status": "queued",
+        "total": 0,
+        "sent": 0,
+        "failed": 0,
+        "error": None,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "completed_at": None
+    }
+    
+    await db.email_campaigns.insert_one(campaign_doc)
+    await enqueue_job(
+        db, "email_campaign", current_user["tenant_id"], {"campaign_id": campaign_doc["campaign_id"]},
+        user_id=current_user["user_id"]
+    )
+    campaign_doc["created_at"] = datetime.fromisoformat(campaign_doc["created_at"])
+    return EmailCampaignResponse(**campaign_doc)
+
+@router.get("/communications/campaigns", response_model=List[EmailCampaignResponse])
+async def get_email_campaigns(event_id: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    query = {"tenant_id": current_user["tenant_id"]}
+    if event_id:
+        query["event_id"] = event_id
+    
+    campaigns = await db.email_campaigns.find(query, {"_id": 0}).sort("created_at", -1).to_list(1000)
+    return [EmailCampaignResponse(**c) for c in campaigns]
+
+@router.get("/communications/campaigns/{campaign_id}", response_model=EmailCampaignResponse)
+async def get_email_campaign(campaign_id: str, current_user: dict = Depends(get_current_user)):
+    campaign = await db.email_campaigns.find_one({"campaign_id": campaign_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return EmailCampaignResponse(**campaign)
+
+@job_handler("email_campaign")
+async def run_email_campaign(db, job: dict, progress: JobProgress):
+    # aiosmtplib, httpx and jinja2 are only needed by the job worker
+    from mailer import send_campaign
+    
+    await send_campaign(db, job["payload"]["campaign_id"])
@@ -0,0 +1,585 @@
+from fastapi import APIRouter, HTTPException, Depends
+from pymongo import DeleteMany, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from collections import Counter
+from contextlib import aclosing
+from typing import List, Optional
+from datetime import datetime, timezone
+from io import BytesIO
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import re
+import uuid
+
+from admission import admit
+from auth import get_current_user
+from cold_storage import iter_archive, read_manifest
+from database import db, analytics_db
+from jobs import (
+    job_handler, enqueue_job, delete_job_file, open_job_file, store_job_file, store_job_input, JobProgress,
+    PermanentJobError
+)
+from models import (
+    ContactCreate, ContactFilter, ContactQuery, ContactQueryResult, ContactResponse, ContactSummary,
+    ContactSyncRequest, ContactSyncResult, FacetBucket
+)
+from routers.archive import archived_documents, ensure_event_writable, get_archived_event
+
+router = APIRouter()
+
+# ===== UTILITIES =====
+
+def generate_qr_code(data: str) -> str:
+    """Generate QR code and return as base64 string"""
+    import qrcode  # imported on first use, only contact creation needs it
+    
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_H,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+    
+    buffered = BytesIO()
+    img.save(buffered, format="PNG")
+    img_str = base64.b64encode(buffered.getvalue()).decode()
+    return f"data:image/png;base64,{img_str}"
+
+def contact_qr_url(contact_id: str) -> str:
+    """Public contact view URL encoded in the contact's QR code"""
+    base_url = os.getenv('FRONTEND_URL', 'https://eventpass-32.preview.emergentagent.com')
+    return f"{base_url}/contact/{contact_id}"
+
+# Everything a registration feed controls; content_hash covers exactly these fields
+CONTACT_CONTENT_FIELDS = [
+    "type", "name", "email", "company", "title", "phone", "booth_number", "ticket_type", "custom_data", "external_id"
+]
+SYNC_BATCH_SIZE = 1000
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+def contact_content(contact) -> dict:
+    fields = {name: getattr(contact, name) for name in CONTACT_CONTENT_FIELDS}
+    fields["custom_data"] = fields["custom_data"] or {}
+    return fields
+
+def contact_content_hash(fields: dict) -> str:
+    canonical = json.dumps(fields, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def contact_key_fields(fields: dict) -> dict:
+    """Natural key of a contact within its event: the external ID if there is one, else the email.
+
+    email_normalized is only stored for email-keyed contacts, so two registrations
+    with different external IDs may share an address.
+    """
+    if fields.get("external_id"):
+        return {"external_id": fields["external_id"], "email_normalized": None}
+    return {"external_id": None, "email_normalized": normalize_email(fields["email"])}
+
+async def ensure_contact_indexes(db):
+    await db.contacts.create_index([("tenant_id", 1), ("event_id", 1)])
+    await db.contacts.create_index(
+        [("event_id", 1), ("email_normalized", 1)], unique=True,
+        partialFilterExpression={"email_normalized": {"$type": "string"}}
+    )
+    await db.contacts.create_index(
+        [("event_id", 1), ("external_id", 1)], unique=True,
+        partialFilterExpression={"external_id": {"$type": "string"}}
+    )
+    # Directory filters on arbitrary custom_data keys
+    await db.contacts.create_index([("custom_data.$**", 1)])
+    for field in CONTACT_SORT_INDEX_FIELDS:
+        await db.contacts.create_index([("tenant_id", 1), ("event_id", 1), (field, 1), ("contact_id", 1)])
+
+def new_contact_doc(tenant_id: str, event_id: str, fields: dict, content_hash: str) -> dict:
+    contact_id = str(uuid.uuid4())
+    return {
+        "contact_id": contact_id,
+        "tenant_id": tenant_id,
+        "event_id": event_id,
+        **fields,
+        **contact_key_fields(fields),
+        # For QR code, we'll use the public contact view URL
+        "qr_code": generate_qr_code(contact_qr_url(contact_id)),
+        "content_hash": content_hash,
+        "version": 1,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+
+async def find_legacy_contact(tenant_id: str, event_id: str, email_normalized: str) -> Optional[dict]:
+    """Contacts stored before email_normalized existed only have `email`; match it ignoring case.
+
+    Updating the match sets its email_normalized, so each legacy contact is looked up this way once."""
+    return await db.contacts.find_one({
+        "tenant_id": tenant_id,
+        "event_id": event_id,
+        "email_normalized": {"$exists": False},
+        "external_id": None,
+        "email": {"$regex": f"^\\s*{re.escape(email_normalized)}\\s*$", "$options": "i"}
+    }, {"_id": 0})
+
+# ===== CONTACTS =====
+
+@router.post("/contacts", response_model=ContactResponse)
+async def create_contact(contact: ContactCreate, current_user: dict = Depends(get_current_user)):
+    # Verify event belongs to tenant
+    event = await db.events.find_one({"event_id": contact.event_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    if event.get("archive_status"):
+        raise HTTPException(status_code=409, detail="Event is archived")
+    
+    # Creating a contact that already exists (same email, or same external ID) updates it instead
+    fields = contact_content(contact)
+    content_hash = contact_content_hash(fields)
+    key = {k: v for k, v in contact_key_fields(fields).items() if v is not None}
+    key_query = {"tenant_id": current_user["tenant_id"], "event_id": contact.event_id, **key}
+    existing = await db.contacts.find_one(key_query, {"_id": 0})
+    if existing is None and "email_normalized" in key:
+        existing = await find_legacy_contact(current_user["tenant_id"], contact.event_id, key["email_normalized"])
+    
+    if existing is None:
+        contact_doc = new_contact_doc(current_user["tenant_id"], contact.event_id, fields, content_hash)
+        try:
+            await db.contacts.insert_one(contact_doc)
+            contact_doc["created_at"] = datetime.fromisoformat(contact_doc["created_at"])
+            return ContactResponse(**contact_doc)
+        except DuplicateKeyError:
+            existing = await db.contacts.find_one(key_query, {"_id": 0})  # created concurrently
+    
+    if existing.get("content_hash") != content_hash:
+        await db.contacts.update_one(
+            {"contact_id": existing["contact_id"]},
+            {"$set": {**fields, **contact_key_fields(fields), "content_hash": content_hash}, "$inc": {"version": 1}}
+        )
+        existing = await db.contacts.find_one({"contact_id": existing["contact_id"]}, {"_id": 0})
+    existing["created_at"] = datetime.fromisoformat(existing["created_at"])
+    return ContactResponse(**existing)
+
+@router.get("/contacts", response_model=List[ContactResponse])
+async def get_contacts(
+    event_id: Optional[str] = None,
+    type: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    query = {"tenant_id": current_user["tenant_id"]}
+    if event_id:
+        query["event_id"] = event_id
+    if type:
+        query["type"] = type
+    
+    if event_id and await get_archived_event(current_user["tenant_id"], event_id):
+        contacts = await archived_documents(current_user["tenant_id"], event_id, "contacts", query, 1000)
+    else:
+        contacts = await db.contacts.find(query, {"_id": 0}).to_list(1000)
+    for contact in contacts:
+        contact["created_at"] = datetime.fromisoformat(contact["created_at"])
+    return [ContactResponse(**c) for c in contacts]
+
+# ===== CONTACT DIRECTORY QUERIES =====
+
+CONTACT_QUERY_FIELDS = [
+    "type", "name", "email", "company", "title", "phone", "booth_number", "ticket_type", "external_id",
+    "checked_in_at", "created_at"
+]
+CONTACT_FACET_FIELDS = ["type", "company", "title", "booth_number", "ticket_type"]
+# Sort keys the directory offers; each gets a (tenant_id, event_id, key, contact_id) index
+CONTACT_SORT_INDEX_FIELDS = ["name", "email", "company", "type", "created_at", "checked_in_at"]
+CONTACT_SUMMARY_PROJECTION = {"_id": 0, **dict.fromkeys(ContactSummary.model_fields, 1)}
+FACET_BUCKET_LIMIT = 50
+
+# Keys become field paths, so no dots or operators
+_CUSTOM_DATA_FIELD = re.compile(r"custom_data\.[A-Za-z0-9_ -]+")
+
+def query_field(field: str, allowed: List[str]) -> str:
+    if field in allowed or _CUSTOM_DATA_FIELD.fullmatch(field):
+        return field
+    raise HTTPException(status_code=400, detail=f"Cannot query on field {field!r}")
+
+def typed_value(value, value_type: str):
+    """Coerce a filter value to the declared type so it matches what is stored"""
+    if value is None:
+        return None
+    if value_type == "number":
+        if isinstance(value, bool):
+            raise ValueError(f"{value!r} is not a number")
+        return value if isinstance(value, (int, float)) else float(value)
+    if value_type == "boolean":
+        if isinstance(value, bool):
+            return value
+        if str(value).lower() in ("true", "1", "yes"):
+            return True
+        if str(value).lower() in ("false", "0", "no"):
+            return False
+        raise ValueError(f"{value!r} is not a boolean")
+    return str(value)
+
+def filter_condition(f: ContactFilter) -> dict:
+    try:
+        if f.op == "exists":
+            condition = {"$exists": True if f.value is None else typed_value(f.value, "boolean")}
+        elif f.op in ("in", "nin"):
+            if not isinstance(f.value, list):
+                raise ValueError(f"'{f.op}' expects a list")
+            condition = {f"${f.op}": [typed_value(v, f.value_type) for v in f.value]}
+        elif f.op == "prefix":
+            condition = {"$regex": "^" + re.escape(str(f.value))}
+        elif f.op == "eq":
+            condition = typed_value(f.value, f.value_type)
+        else:
+            condition = {f"${f.op}": typed_value(f.value, f.value_type)}
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid filter on {f.field}: {e}")
+    return {query_field(f.field, CONTACT_QUERY_FIELDS): condition}
+
+# Mongo's order between kinds of value, for sorting archived contacts like the database does
+def _sort_rank(value):
+    if value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (3, value)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    return (4, str(value))
+
+def _field_value(doc: dict, field: str):
+    value = doc
+    for part in field.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+async def archived_contact_query(tenant_id: str, match: dict, sort: dict, facet_fields: List[str], query: ContactQuery):
+    """query_contacts over the archive: one streaming pass for the total and facets, then an in-memory sort"""
+    matched, facet_counts = [], {field: Counter() for field in facet_fields}
+    async with aclosing(iter_archive(tenant_id, query.event_id, "contacts", match, ("_id", "qr_code"))) as contacts:
+        async for contact in contacts:
+            for field, counts in facet_counts.items():
+                counts[_field_value(contact, field)] += 1
+            matched.append({
+                **{k: contact.get(k) for k in ContactSummary.model_fields},
+                **{f: _field_value(contact, f) for f in sort}
+            })
+    # Stable sorts applied from the last key to the first
+    for field, direction in reversed(list(sort.items())):
+        matched.sort(key=lambda c: _sort_rank(c[field]), reverse=direction == -1)
+    skip = (query.page - 1) * query.page_size
+    facets = {
+        field: [{"_id": value, "count": count} for value, count in counts.most_common(FACET_BUCKET_LIMIT)]
+        for field, counts in facet_counts.items()
+    }
+    return matched[skip:skip + query.page_size], len(matched), facets
+
+@router.post("/contacts/query", response_model=ContactQueryResult)
+async def query_contacts(query: ContactQuery, current_user: dict = Depends(get_current_user)):
+    """Filtered, sorted page of an event's contacts plus value counts for the requested facets.
+
+    Reads the primary: the directory and badge designer must see a contact as soon as
+    it is registered. The page is its own sorted, limited query so the
+    (tenant_id, event_id, <sort key>) indexes serve it without a blocking sort; total
+    and facets come from one $facet pipeline. Archived events are answered from cold
+    storage with the same filters.
+    """
+    tenant_id = current_user["tenant_id"]
+    match = {"tenant_id": tenant_id, "event_id": query.event_id}
+    if query.filters:
+        match["$and"] = [filter_condition(f) for f in query.filters]
+    sort = {query_field(s.field, CONTACT_QUERY_FIELDS): 1 if s.direction == "asc" else -1 for s in query.sort}
+    sort = sort or {"name": 1}
+    # Stable pages when sort values tie; same direction as the last key so one index serves both
+    sort.setdefault("contact_id", list(sort.values())[-1])
+    facet_fields = list(dict.fromkeys(query_field(f, CONTACT_FACET_FIELDS) for f in query.facets))
+
+    if await get_archived_event(tenant_id, query.event_id):
+        items, total, facet_results = await archived_contact_query(tenant_id, match, sort, facet_fields, query)
+    else:
+        # Facet output names cannot contain dots
+        facets = {"total": [{"$count": "count"}]}
+        for i, field in enumerate(facet_fields):
+            facets[f"facet_{i}"] = [{"$sortByCount": f"${field}"}, {"$limit": FACET_BUCKET_LIMIT}]
+        page = db.contacts.find(match, CONTACT_SUMMARY_PROJECTION).sort(list(sort.items()))
+        page = page.skip((query.page - 1) * query.page_size).limit(query.page_size)
+        items, counts = await asyncio.gather(
+            page.to_list(query.page_size),
+            db.contacts.aggregate([{"$match": match}, {"$facet": facets}], allowDiskUse=True).to_list(1)
+        )
+        counts = counts[0]
+        total = counts["total"][0]["count"] if counts["total"] else 0
+        facet_results = {field: counts[f"facet_{i}"] for i, field in enumerate(facet_fields)}
+
+    return ContactQueryResult(
+        items=[ContactSummary(**c) for c in items],
+        total=total,
+        page=query.page,
+        page_size=query.page_size,
+        facets={
+            field: [FacetBucket(value=b["_id"], count=b["count"]) for b in buckets]
+            for field, buckets in facet_results.items()
+        }
+    )
+
+@router.get("/contacts/{contact_id}", response_model=ContactResponse)
+async def get_contact(contact_id: str, current_user: dict = Depends(get_current_user)):
+    contact = await db.contacts.find_one({"contact_id": contact_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    if not contact:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    contact["created_at"] = datetime.fromisoformat(contact["created_at"])
+    return ContactResponse(**contact)
+
+@router.put("/contacts/{contact_id}", response_model=ContactResponse)
+async def update_contact(contact_id: str, contact: ContactCreate, current_user: dict = Depends(get_current_user)):
+    existing = await db.contacts.find_one({"contact_id": contact_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    if not existing:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    for event_id in {existing["event_id"], contact.event_id}:
+        await ensure_event_writable(current_user["tenant_id"], event_id)
+    
+    fields = contact_content(contact)
+    update_doc = {
+        "event_id": contact.event_id,
+        **fields,
+        **contact_key_fields(fields),
+        "content_hash": contact_content_hash(fields)
+    }
+    
+    # version keys cached badge previews
+    try:
+        await db.contacts.update_one(
+            {"contact_id": contact_id, "tenant_id": current_user["tenant_id"]},
+            {"$set": update_doc, "$inc": {"version": 1}}
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Another contact of this event has the same email or external ID")
+    
+    updated = await db.contacts.find_one({"contact_id": contact_id}, {"_id": 0})
+    updated["created_at"] = datetime.fromisoformat(updated["created_at"])
+    return ContactResponse(**updated)
+
+@router.post("/contacts/{contact_id}/check-in", response_model=ContactResponse)
+async def check_in_contact(contact_id: str, current_user: dict = Depends(get_current_user)):
+    existing = await db.contacts.find_one(
+        {"contact_id": contact_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0, "event_id": 1}
+    )
+    if not existing:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    await ensure_event_writable(current_user["tenant_id"], existing["event_id"])
+    # Only the first check-in is recorded, so repeat scans at the door are harmless
+    await db.contacts.update_one(
+        {"contact_id": contact_id, "tenant_id": current_user["tenant_id"], "checked_in_at": None},
+        {"$set": {"checked_in_at": datetime.now(timezone.utc).isoformat(), "checked_in_by": current_user["user_id"]}}
+    )
+    contact = await db.contacts.find_one({"contact_id": contact_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    if not contact:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    contact["created_at"] = datetime.fromisoformat(contact["created_at"])
+    return ContactResponse(**contact)
+
+@router.delete("/contacts/{contact_id}")
+async def delete_contact(contact_id: str, current_user: dict = Depends(get_current_user)):
+    existing = await db.contacts.find_one(
+        {"contact_id": contact_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0, "event_id": 1}
+    )
+    if not existing:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    await ensure_event_writable(current_user["tenant_id"], existing["event_id"])
+    result = await db.contacts.delete_one({"contact_id": contact_id, "tenant_id": current_user["tenant_id"]})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    return {"message": "Contact deleted successfully"}
+
+@router.post("/contacts/sync", dependencies=[Depends(admit("bulk"))])
+async def sync_contacts(feed: ContactSyncRequest, current_user: dict = Depends(get_current_user)):
+    """Queue a full registration feed for an event; poll /api/jobs/{job_id} for its ContactSyncResult"""
+    tenant_id = current_user["tenant_id"]
+    event = await db.events.find_one({"event_id": feed.event_id, "tenant_id": tenant_id}, {"_id": 0})
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    if event.get("archive_status"):
+        raise HTTPException(status_code=409, detail="Event is archived")
+    if feed.delete_missing and not feed.contacts:
+        raise HTTPException(status_code=400, detail="Refusing to delete every contact: the feed is empty")
+    
+    # A feed can outgrow a job document, so it travels through GridFS
+    feed_file_id = await store_job_input(
+        db, tenant_id, f"contact_feed_{feed.event_id}.json", feed.model_dump_json().encode("utf-8"), "application/json"
+    )
+    job_id = await enqueue_job(
+        db, "contacts_sync", tenant_id, {"event_id": feed.event_id, "feed_file_id": feed_file_id},
+        user_id=current_user["user_id"]
+    )
+    return {"job_id": job_id}
+
+async def apply_contact_feed(db, tenant_id: str, feed: ContactSyncRequest, progress=None) -> ContactSyncResult:
+    """Diff a feed against the event's contacts by content hash and write only the differences"""
+    by_external, by_email, existing_ids = {}, {}, set()
+    cursor = db.contacts.find(
+        {"tenant_id": tenant_id, "event_id": feed.event_id},
+        {"_id": 0, "contact_id": 1, "email": 1, "external_id": 1, "content_hash": 1}
+    ).batch_size(5000)
+    async for doc in cursor:
+        existing_ids.add(doc["contact_id"])
+        if doc.get("external_id"):
+            by_external[doc["external_id"]] = doc
+        else:
+            by_email[normalize_email(doc["email"])] = doc
+    
+    ops, new_rows = [], []
+    seen_keys, matched_ids = set(), set()
+    unchanged = duplicates = 0
+    for item in feed.contacts:
+        fields = contact_content(item)
+        email = normalize_email(item.email)
+        feed_key = ("external_id", item.external_id) if item.external_id else ("email", email)
+        if feed_key in seen_keys:
+            duplicates += 1
+            continue
+        seen_keys.add(feed_key)
+        
+        # An email-keyed contact is adopted when the feed starts sending its external ID
+        existing = (by_external.get(item.external_id) if item.external_id else None) or by_email.get(email)
+        if existing is not None and existing["contact_id"] in matched_ids:
+            existing = None
+        content_hash = contact_content_hash(fields)
+        if existing is None:
+            new_rows.append((fields, content_hash))
+            continue
+        matched_ids.add(existing["contact_id"])
+        if existing.get("content_hash") == content_hash:
+            unchanged += 1
+            continue
+        ops.append(UpdateOne(
+            {"contact_id": existing["contact_id"]},
+            {"$set": {**fields, **contact_key_fields(fields), "content_hash": content_hash}, "$inc": {"version": 1}}
+        ))
+    
+    def build_inserts(rows):
+        # QR rendering is CPU bound, so new contacts are built off the event loop
+        return [InsertOne(new_contact_doc(tenant_id, feed.event_id, fields, h)) for fields, h in rows]
+    for i in range(0, len(new_rows), SYNC_BATCH_SIZE):
+        ops.extend(await asyncio.to_thread(build_inserts, new_rows[i:i + SYNC_BATCH_SIZE]))
+    
+    if feed.delete_missing:
+        missing = list(existing_ids - matched_ids)
+        for i in range(0, len(missing), SYNC_BATCH_SIZE):
+            ops.append(DeleteMany({"tenant_id": tenant_id, "contact_id": {"$in": missing[i:i + SYNC_BATCH_SIZE]}}))
+    
+    if progress:
+        await progress(0, total=len(ops), message="Writing contacts")
+    result = ContactSyncResult(inserted=0, updated=0, unchanged=unchanged, deleted=0, duplicates=duplicates)
+    for i in range(0, len(ops), SYNC_BATCH_SIZE):
+        try:
+            bulk = (await db.contacts.bulk_write(ops[i:i + SYNC_BATCH_SIZE], ordered=False)).bulk_api_result
+        except BulkWriteError as e:
+            # Typically a contact created concurrently through the API with the same key
+            bulk = e.details
+            result.errors += len(bulk["writeErrors"])
+        result.inserted += bulk["nInserted"]
+        result.updated += bulk["nModified"]
+        result.deleted += bulk["nRemoved"]
+        if progress:
+            await progress(min(i + SYNC_BATCH_SIZE, len(ops)))
+    return result
+
+
+@job_handler("contacts_sync")
+async def run_contacts_sync(db, job: dict, progress: JobProgress):
+    payload = job["payload"]
+    try:
+        event = await db.events.find_one({"event_id": payload["event_id"], "tenant_id": job["tenant_id"]}, {"_id": 0})
+        if not event:
+            raise PermanentJobError("Event not found")
+        if event.get("archive_status"):
+            raise PermanentJobError("Event is archived")
+        grid_out = await open_job_file(db, payload["feed_file_id"])
+        feed = ContactSyncRequest.model_validate_json(await grid_out.read())
+        result = await apply_contact_feed(db, job["tenant_id"], feed, progress)
+    except Exception as e:
+        # Keep the feed for the next attempt, if there is one
+        if isinstance(e, PermanentJobError) or job["attempts"] >= job["max_attempts"]:
+            await delete_job_file(db, payload["feed_file_id"])
+        raise
+    await delete_job_file(db, payload["feed_file_id"])
+    return result.model_dump()
+
+@router.post("/contacts/export", dependencies=[Depends(admit("bulk"))])
+async def enqueue_contacts_export(event_id: str, type: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+    """Queue a CSV export of an event's contacts; poll /api/jobs/{job_id}"""
+    event = await db.events.find_one({"event_id": event_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    
+    job_id = await enqueue_job(
+        db, "contacts_export", current_user["tenant_id"],
+        {"event_id": event_id, "type": type},
+        user_id=current_user["user_id"]
+    )
+    return {"job_id": job_id}
+
+@job_handler("contacts_export")
+async def run_contacts_export(db, job: dict, progress: JobProgress):
+    import csv
+    from io import StringIO
+    
+    payload = job["payload"]
+    query = {"tenant_id": job["tenant_id"], "event_id": payload["event_id"]}
+    if payload.get("type"):
+        query["type"] = payload["type"]
+    if await get_archived_event(job["tenant_id"], payload["event_id"]):
+        manifest = read_manifest(job["tenant_id"], payload["event_id"])
+        total = None if payload.get("type") else manifest["files"]["contacts"]["count"]
+        contacts = iter_archive(job["tenant_id"], payload["event_id"], "contacts", query, ("_id", "qr_code"))
+    else:
+        total = await analytics_db.contacts.count_documents(query)
+        contacts = analytics_db.contacts.find(query, {"_id": 0, "qr_code": 0}).batch_size(1000)
+    await progress(0, total=total, message="Exporting contacts")
+    
+    output = StringIO()
+    writer = csv.writer(output)
+    writer.writerow([
+        "Name", "Email", "Type", "Company", "Title", "Phone",
+        "Booth Number", "Ticket Type", "Custom Data", "Created At", "Contact ID"
+    ])
+    
+    written = 0
+    async for contact in contacts:
+        writer.writerow([
+            contact.get("name", ""),
+            contact.get("email", ""),
+            contact.get("type", ""),
+            contact.get("company", ""),
+            contact.get("title", ""),
+            contact.get("phone", ""),
+            contact.get("booth_number", ""),
+            contact.get("ticket_type", ""),
+            json.dumps(contact.get("custom_data") or {}),
+            contact.get("created_at", ""),
+            contact.get("contact_id", "")
+        ])
+        written += 1
+        if written % 5000 == 0:
+            await progress(written)
+    
+    await progress(written, message="Done")
+    return await store_job_file(
+        db, job, f"contacts_{payload['event_id']}.csv", output.getvalue().encode("utf-8"), "text/csv"
+    )
+
+# ===== PUBLIC CONTACT VIEW (No Auth Required) =====
+
+@router.get("/public/contact/{contact_id}", response_model=ContactResponse)
+async def get_public_contact(contact_id: str):
+    """Public endpoint for viewing contact details via QR code"""
+    contact = await db.contacts.find_one({"contact_id": contact_id}, {"_id": 0})
+    if not contact:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    contact["created_at"] = datetime.fromisoformat(contact["created_at"])
+    return ContactResponse(**contact)
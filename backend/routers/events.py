@@ -0,0 +1,239 @@
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Optional
+from datetime import datetime, timezone
+import asyncio
+import logging
+import os
+import shutil
+import uuid
+
+from admission import admit
+from auth import get_current_user, get_current_user_from_query
+from cold_storage import event_archive_dir
+from database import db
+from jobs import job_handler, enqueue_job, JobProgress, PermanentJobError, PRIORITY_LOW
+from live import LiveHub, format_sse
+from models import EventCreate, EventResponse
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+# One change stream per watched event, shared by every subscriber in this process
+live_hub = LiveHub(db)
+LIVE_KEEPALIVE_SECONDS = 15
+
+# ===== EVENTS =====
+
+@router.post("/events", response_model=EventResponse)
+async def create_event(event: EventCreate, current_user: dict = Depends(get_current_user)):
+    event_id = str(uuid.uuid4())
+    event_doc = {
+        "event_id": event_id,
+        "tenant_id": current_user["tenant_id"],
+        "user_id": current_user["user_id"],
+        "name": event.name,
+        "dates": event.dates,
+        "venue": event.venue,
+        "description": event.description,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+    
+    await db.events.insert_one(event_doc)
+    event_doc["created_at"] = datetime.fromisoformat(event_doc["created_at"])
+    return EventResponse(**event_doc)
+
+@router.get("/events", response_model=List[EventResponse])
+async def get_events(current_user: dict = Depends(get_current_user)):
+    events = await db.events.find({"tenant_id": current_user["tenant_id"]}, {"_id": 0}).to_list(1000)
+    for event in events:
+        event["created_at"] = datetime.fromisoformat(event["created_at"])
+    return [EventResponse(**e) for e in events]
+
+@router.get("/events/{event_id}", response_model=EventResponse)
+async def get_event(event_id: str, current_user: dict = Depends(get_current_user)):
+    event = await db.events.find_one({"event_id": event_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    event["created_at"] = datetime.fromisoformat(event["created_at"])
+    return EventResponse(**event)
+
+@router.put("/events/{event_id}", response_model=EventResponse)
+async def update_event(event_id: str, event: EventCreate, current_user: dict = Depends(get_current_user)):
+    existing = await db.events.find_one({"event_id": event_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    if not existing:
+        raise HTTPException(status_code=404, detail="Event not found")
+    
+    update_doc = {
+        "name": event.name,
+        "dates": event.dates,
+        "venue": event.venue,
+        "description": event.description
+    }
+    
+    await db.events.update_one(
+        {"event_id": event_id, "tenant_id": current_user["tenant_id"]},
+        {"$set": update_doc}
+    )
+    
+    updated = await db.events.find_one({"event_id": event_id}, {"_id": 0})
+    updated["created_at"] = datetime.fromisoformat(updated["created_at"])
+    return EventResponse(**updated)
+
+@router.delete("/events/{event_id}", dependencies=[Depends(admit("bulk"))])
+async def delete_event(event_id: str, current_user: dict = Depends(get_current_user)):
+    result = await db.events.delete_one({"event_id": event_id, "tenant_id": current_user["tenant_id"]})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Event not found")
+    
+    # Dependent documents are removed in the background so the request returns immediately
+    purge_id = await enqueue_event_purge(current_user["tenant_id"], event_id)
+    return {"message": "Event deleted successfully", "purge_id": purge_id}
+
+@router.get("/events/{event_id}/purge")
+async def get_event_purge(event_id: str, current_user: dict = Depends(get_current_user)):
+    """Progress of the background purge started when the event was deleted"""
+    purge = await db.event_purges.find_one(
+        {"event_id": event_id, "tenant_id": current_user["tenant_id"]},
+        {"_id": 0},
+        sort=[("created_at", -1)]
+    )
+    if not purge:
+        raise HTTPException(status_code=404, detail="No purge found for this event")
+    return purge
+
+# ===== EVENT PURGE (BACKGROUND CASCADING DELETE) =====
+
+PURGE_BATCH_SIZE = int(os.getenv('PURGE_BATCH_SIZE', '500'))
+PURGE_BATCH_PAUSE = float(os.getenv('PURGE_BATCH_PAUSE', '0.05'))  # seconds between batches
+
+# Collections holding documents keyed by event_id. Orders are handled separately
+# because their payment transactions only reference the order_id.
+EVENT_DEPENDENT_COLLECTIONS = [
+    "contacts", "tickets", "badge_templates", "leads", "email_campaigns", "email_messages"
+]
+
+
+async def purge_collection_batched(collection, query: dict, on_batch=None) -> int:
+    """Delete documents matching query in chunks of PURGE_BATCH_SIZE, pausing between chunks"""
+    deleted = 0
+    while True:
+        batch = await collection.find(query, {"_id": 1}).limit(PURGE_BATCH_SIZE).to_list(PURGE_BATCH_SIZE)
+        if not batch:
+            break
+        result = await collection.delete_many({"_id": {"$in": [d["_id"] for d in batch]}})
+        deleted += result.deleted_count
+        if on_batch:
+            await on_batch(result.deleted_count)
+        await asyncio.sleep(PURGE_BATCH_PAUSE)
+    return deleted
+
+async def purge_orders_batched(query: dict, on_batch=None, transaction_query: Optional[dict] = None) -> int:
+    """Delete orders matching query in chunks, removing their payment transactions
+    (those also matching `transaction_query`, if given) first"""
+    deleted = 0
+    while True:
+        batch = await db.orders.find(query, {"_id": 1, "order_id": 1}).limit(PURGE_BATCH_SIZE).to_list(PURGE_BATCH_SIZE)
+        if not batch:
+            break
+        order_ids = [o["order_id"] for o in batch]
+        tx_result = await db.payment_transactions.delete_many({"order_id": {"$in": order_ids}, **(transaction_query or {})})
+        result = await db.orders.delete_many({"_id": {"$in": [o["_id"] for o in batch]}})
+        deleted += result.deleted_count
+        if on_batch:
+            await on_batch(result.deleted_count, tx_result.deleted_count)
+        await asyncio.sleep(PURGE_BATCH_PAUSE)
+    return deleted
+
+async def enqueue_event_purge(tenant_id: str, event_id: str) -> str:
+    purge_id = str(uuid.uuid4())
+    now = datetime.now(timezone.utc).isoformat()
+    purge_doc = {
+        "purge_id": purge_id,
+        "tenant_id": tenant_id,
+        "event_id": event_id,
+        "status": "pending",
+        "deleted": {name: 0 for name in EVENT_DEPENDENT_COLLECTIONS + ["orders", "payment_transactions"]},
+        "job_id": None,
+        "error": None,
+        "created_at": now,
+        "completed_at": None
+    }
+    await db.event_purges.insert_one(purge_doc)
+    job_id = await enqueue_job(db, "event_purge", tenant_id, {"purge_id": purge_id}, priority=PRIORITY_LOW)
+    await db.event_purges.update_one({"purge_id": purge_id}, {"$set": {"job_id": job_id}})
+    return purge_id
+
+@job_handler("event_purge")
+async def run_event_purge(db, job: dict, progress: JobProgress):
+    """Remove every document belonging to a deleted event. Safe to re-run after a crash."""
+    purge_id = job["payload"]["purge_id"]
+    purge = await db.event_purges.find_one({"purge_id": purge_id}, {"_id": 0})
+    if not purge:
+        raise PermanentJobError(f"Purge {purge_id} not found")
+    scope = {"tenant_id": purge["tenant_id"], "event_id": purge["event_id"]}
+    total_deleted = 0
+    await db.event_purges.update_one({"purge_id": purge_id}, {"$set": {"status": "running"}})
+    
+    async def record(counts: Dict[str, int]):
+        nonlocal total_deleted
+        total_deleted += sum(counts.values())
+        await db.event_purges.update_one(
+            {"purge_id": purge_id},
+            {"$inc": {f"deleted.{name}": n for name, n in counts.items()}}
+        )
+        await progress(total_deleted)
+    
+    try:
+        for name in EVENT_DEPENDENT_COLLECTIONS:
+            async def on_batch(n, name=name):
+                await record({name: n})
+            await progress(total_deleted, message=f"Deleting {name}")
+            await purge_collection_batched(db[name], scope, on_batch)
+    
+        async def on_orders_batch(orders_deleted, transactions_deleted):
+            await record({"orders": orders_deleted, "payment_transactions": transactions_deleted})
+        await progress(total_deleted, message="Deleting orders")
+        await purge_orders_batched(scope, on_orders_batch)
+        # A deleted event that had been archived leaves nothing behind on disk either
+        await asyncio.to_thread(shutil.rmtree, event_archive_dir(purge["tenant_id"], purge["event_id"]), True)
+    except Exception as e:
+        # Retries resume where this attempt stopped; only the last one records the failure
+        if isinstance(e, PermanentJobError) or job["attempts"] >= job["max_attempts"]:
+            await db.event_purges.update_one(
+                {"purge_id": purge_id},
+                {"$set": {"status": "failed", "error": str(e), "completed_at": datetime.now(timezone.utc).isoformat()}}
+            )
+        raise
+    
+    await db.event_purges.update_one(
+        {"purge_id": purge_id},
+        {"$set": {"status": "completed", "completed_at": datetime.now(timezone.utc).isoformat()}}
+    )
+    logger.info(f"Event purge {purge_id} completed for event {purge['event_id']}")
+    return {"purge_id": purge_id, "deleted": total_deleted}
+
+@router.get("/events/{event_id}/live")
+async def stream_event_activity(event_id: str, request: Request, current_user: dict = Depends(get_current_user_from_query)):
+    """Server-sent events for registrations, check-ins, paid orders and leads of one event"""
+    event = await db.events.find_one({"event_id": event_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    
+    subscription = live_hub.subscribe(current_user["tenant_id"], event_id, request.headers.get("Last-Event-ID"))
+    
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                message = await subscription.get(timeout=LIVE_KEEPALIVE_SECONDS)
+                yield format_sse(message) if message else ": keepalive\n\n"
+        finally:
+            subscription.feed.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
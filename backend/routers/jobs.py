@@ -0,0 +1,42 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+
+from auth import get_current_user
+from database import db
+from jobs import open_job_file
+from models import JobResponse
+
+router = APIRouter()
+
+# ===== JOBS =====
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    job = await db.jobs.find_one({"job_id": job_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0, "payload": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse(**job)
+
+@router.get("/jobs/{job_id}/result")
+async def download_job_result(job_id: str, current_user: dict = Depends(get_current_user)):
+    job = await db.jobs.find_one({"job_id": job_id, "tenant_id": current_user["tenant_id"]}, {"_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] != "completed" or not (job.get("result") or {}).get("file_id"):
+        raise HTTPException(status_code=409, detail="Job has no file result yet")
+    
+    result = job["result"]
+    grid_out = await open_job_file(db, result["file_id"])
+    
+    async def stream():
+        while True:
+            chunk = await grid_out.readchunk()
+            if not chunk:
+                break
+            yield chunk
+    
+    return StreamingResponse(
+        stream(),
+        media_type=result["content_type"],
+        headers={"Content-Disposition": f"attachment; filename={result['filename']}"}
+    )
@@ -0,0 +1,67 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import Response
+from typing import Optional
+from datetime import datetime, timezone
+import logging
+import os
+
+from auth import get_current_user, require_super_admin
+from database import db
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+PROFILE_TTL_SECONDS = int(os.getenv('PROFILE_TTL_SECONDS', str(7 * 24 * 3600)))
+
+# ===== REQUEST PROFILES =====
+
+async def ensure_profile_indexes(db):
+    await db.request_profiles.create_index("started_at")
+    await db.request_profiles.create_index("created_at", expireAfterSeconds=PROFILE_TTL_SECONDS)
+
+@router.get("/profiles")
+async def get_request_profiles(
+    route: Optional[str] = None,
+    min_duration_ms: Optional[float] = None,
+    limit: int = Query(50, ge=1, le=500),
+    current_user: dict = Depends(get_current_user)
+):
+    """Recent slow-request profiles, newest first, without their stacks"""
+    require_super_admin(current_user)
+    query = {}
+    if route:
+        query["route"] = route
+    if min_duration_ms is not None:
+        query["duration_ms"] = {"$gte": min_duration_ms}
+    
+    profiles = await db.request_profiles.find(query, {"_id": 0, "folded": 0}).sort("started_at", -1).limit(limit).to_list(limit)
+    return profiles
+
+@router.get("/profiles/{profile_id}")
+async def get_request_profile(profile_id: str, current_user: dict = Depends(get_current_user)):
+    require_super_admin(current_user)
+    profile = await db.request_profiles.find_one({"profile_id": profile_id}, {"_id": 0})
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+@router.get("/profiles/{profile_id}/folded")
+async def download_request_profile(profile_id: str, current_user: dict = Depends(get_current_user)):
+    """Collapsed stacks for flamegraph.pl / speedscope"""
+    require_super_admin(current_user)
+    profile = await db.request_profiles.find_one({"profile_id": profile_id}, {"_id": 0, "folded": 1})
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return Response(
+        content=profile["folded"],
+        media_type="text/plain",
+        headers={"Content-Disposition": f"attachment; filename=profile_{profile_id}.folded"}
+    )
+
+async def store_request_profile(profile: dict):
+    profile["created_at"] = datetime.now(timezone.utc)  # BSON date for the TTL index
+    try:
+        await db.request_profiles.insert_one(profile)
+    except Exception as e:
+        logger.error(f"Failed to store request profile: {e}")
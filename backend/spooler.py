@@ -0,0 +1,219 @@
+"""Print spooler for network label printers speaking raw TCP (port 9100).
+
+Every printer gets one FIFO queue drained by one task over one long-lived
+connection, so labels for a printer never interleave and a burst at the badge desk
+does not pay a TCP handshake per badge. A connection the printer has closed (idle
+timeout, power cycle) is detected before the next write and reopened; a label is
+retried ``PRINT_SPOOLER_MAX_RETRIES`` times before its submitter gets
+``PrinterUnavailable``.
+
+Printers are configured by name, never by address from a request:
+
+    BADGE_PRINTERS="frontdesk-1=10.0.0.21,frontdesk-2=10.0.0.22:9100"
+
+Exactly one process talks to the printers: ``python worker.py --spooler`` runs the
+``badge_print`` jobs the API enqueues, oldest first and one at a time, through
+``get_spooler()``. API processes never open a printer connection; they read the
+status the spooler publishes to the ``printer_status`` collection.
+
+``fake_printer.py`` is a local stand-in that records the stream it receives.
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, Optional, Tuple
+
+from metrics import PRINT_JOBS_TOTAL, PRINT_QUEUE_DEPTH, PRINT_SEND_DURATION
+
+logger = logging.getLogger(__name__)
+
+RAW_PRINT_PORT = 9100
+PRINT_SPOOLER_MAX_RETRIES = int(os.getenv('PRINT_SPOOLER_MAX_RETRIES', '3'))
+PRINT_CONNECT_TIMEOUT = float(os.getenv('PRINT_CONNECT_TIMEOUT', '5'))
+PRINT_RETRY_DELAY = 0.5  # seconds, doubled per attempt
+THROUGHPUT_WINDOW = 60  # seconds covered by jobs_per_minute
+PRINT_POLL_INTERVAL = float(os.getenv('PRINT_POLL_INTERVAL', '0.2'))  # spooler's wait between empty polls
+PRINTER_STATUS_INTERVAL = 5  # seconds between status documents from the spooler process
+
+
+class PrinterUnavailable(Exception):
+    """The label could not be delivered after all retries"""
+
+
+def parse_printers(spec: str) -> Dict[str, Tuple[str, int]]:
+    """'name=host[:port],...' -> {name: (host, port)}"""
+    printers = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, address = entry.partition("=")
+        if not address:
+            raise ValueError(f"Printer entry {entry!r} must look like name=host[:port]")
+        host, _, port = address.partition(":")
+        printers[name.strip()] = (host.strip(), int(port or RAW_PRINT_PORT))
+    return printers
+
+
+BADGE_PRINTERS = parse_printers(os.getenv('BADGE_PRINTERS', ''))
+
+
+class PrinterQueue:
+    """Queue and persistent connection for a single printer"""
+
+    def __init__(self, name: str, host: str, port: int = RAW_PRINT_PORT):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.sent = 0
+        self.failed = 0
+        self.connections_opened = 0
+        self._completed: Deque[float] = deque()
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight: Optional[asyncio.Future] = None
+
+    async def submit(self, payload: bytes):
+        """Resolves once the printer has accepted every byte of `payload`"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((payload, future))
+        PRINT_QUEUE_DEPTH.labels(self.name).set(self.queue.qsize())
+        return await future
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing() and not self._reader.at_eof()
+
+    def jobs_per_minute(self) -> int:
+        cutoff = time.monotonic() - THROUGHPUT_WINDOW
+        while self._completed and self._completed[0] < cutoff:
+            self._completed.popleft()
+        return len(self._completed)
+
+    def stats(self) -> dict:
+        return {
+            "host": self.host,
+            "port": self.port,
+            "connected": self.connected,
+            "queued": self.queue.qsize(),
+            "sent": self.sent,
+            "failed": self.failed,
+            "connections_opened": self.connections_opened,
+            "jobs_per_minute": self.jobs_per_minute(),
+        }
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), timeout=PRINT_CONNECT_TIMEOUT
+        )
+        sock = self._writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.connections_opened += 1
+        logger.info(f"Connected to printer {self.name} at {self.host}:{self.port}")
+
+    def _disconnect(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def _send(self, payload: bytes):
+        last_error = None
+        for attempt in range(PRINT_SPOOLER_MAX_RETRIES):
+            try:
+                # Printers close idle sockets; at_eof() notices before we write into a dead one
+                if not self.connected:
+                    self._disconnect()
+                    await self._connect()
+                self._writer.write(payload)
+                await self._writer.drain()
+                return
+            except (OSError, asyncio.TimeoutError) as e:
+                last_error = e
+                self._disconnect()
+                logger.warning(f"Printer {self.name} send failed (attempt {attempt + 1}): {e!r}")
+                await asyncio.sleep(PRINT_RETRY_DELAY * 2 ** attempt)
+        raise PrinterUnavailable(f"Printer {self.name} unreachable: {last_error!r}")
+
+    async def _run(self):
+        while True:
+            payload, future = await self.queue.get()
+            PRINT_QUEUE_DEPTH.labels(self.name).set(self.queue.qsize())
+            if future.done():  # submitter went away
+                continue
+            start = time.perf_counter()
+            self._in_flight = future
+            try:
+                await self._send(payload)
+            except PrinterUnavailable as e:
+                self.failed += 1
+                PRINT_JOBS_TOTAL.labels(self.name, "failed").inc()
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            finally:
+                self._in_flight = None
+            PRINT_SEND_DURATION.labels(self.name).observe(time.perf_counter() - start)
+            PRINT_JOBS_TOTAL.labels(self.name, "sent").inc()
+            self.sent += 1
+            self._completed.append(time.monotonic())
+            if not future.done():
+                future.set_result(None)
+
+    async def close(self):
+        pending = [self._in_flight] if self._in_flight is not None else []
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while not self.queue.empty():
+            pending.append(self.queue.get_nowait()[1])
+        for future in pending:
+            if not future.done():
+                future.set_exception(PrinterUnavailable(f"Spooler for {self.name} shut down"))
+        self._disconnect()
+
+
+class PrintSpooler:
+    """Process-wide set of printer queues"""
+
+    def __init__(self, printers: Dict[str, Tuple[str, int]]):
+        self.printers = {name: PrinterQueue(name, host, port) for name, (host, port) in printers.items()}
+
+    async def submit(self, printer: str, payload: bytes):
+        """Raises KeyError for an unknown printer and PrinterUnavailable if delivery fails"""
+        await self.printers[printer].submit(payload)
+
+    def stats(self) -> Dict[str, dict]:
+        return {name: queue.stats() for name, queue in self.printers.items()}
+
+    async def close(self):
+        await asyncio.gather(*[queue.close() for queue in self.printers.values()])
+
+    async def publish_status(self, db):
+        """Write every printer's stats to ``printer_status`` for the API to read"""
+        now = datetime.now(timezone.utc).isoformat()
+        for name, stats in self.stats().items():
+            await db.printer_status.update_one(
+                {"printer": name}, {"$set": {**stats, "printer": name, "updated_at": now}}, upsert=True
+            )
+
+
+_spooler: Optional[PrintSpooler] = None
+
+
+def get_spooler() -> PrintSpooler:
+    """This process's spooler for BADGE_PRINTERS; only the spooler process should call it"""
+    global _spooler
+    if _spooler is None:
+        _spooler = PrintSpooler(BADGE_PRINTERS)
+    return _spooler
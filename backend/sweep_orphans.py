@@ -0,0 +1,63 @@
+"""One-off sweeper for documents left behind by events deleted before cascading purges existed.
+
+Usage (from the backend directory):
+    python sweep_orphans.py            # report and delete orphans
+    python sweep_orphans.py --dry-run  # only report counts
+"""
+import argparse
+import asyncio
+import logging
+
+from database import db, close_clients
+from routers.events import (
+    EVENT_DEPENDENT_COLLECTIONS,
+    purge_collection_batched,
+    purge_orders_batched,
+)
+
+logger = logging.getLogger("sweep_orphans")
+
+
+async def sweep(dry_run: bool = False):
+    live_events = set(await db.events.distinct("event_id"))
+    totals = {}
+
+    for name in EVENT_DEPENDENT_COLLECTIONS + ["orders"]:
+        orphan_events = [e for e in await db[name].distinct("event_id") if e not in live_events]
+        query = {"event_id": {"$in": orphan_events}}
+        if dry_run or not orphan_events:
+            totals[name] = await db[name].count_documents(query) if orphan_events else 0
+            continue
+        if name == "orders":
+            totals[name] = await purge_orders_batched(query)
+        else:
+            totals[name] = await purge_collection_batched(db[name], query)
+
+    # Transactions whose order no longer exists (including ones removed above)
+    live_orders = set(await db.orders.distinct("order_id"))
+    orphan_orders = [o for o in await db.payment_transactions.distinct("order_id") if o not in live_orders]
+    query = {"order_id": {"$in": orphan_orders}}
+    if dry_run or not orphan_orders:
+        totals["payment_transactions"] = await db.payment_transactions.count_documents(query) if orphan_orders else 0
+    else:
+        totals["payment_transactions"] = await purge_collection_batched(db.payment_transactions, query)
+
+    verb = "Would delete" if dry_run else "Deleted"
+    for name, count in totals.items():
+        logger.info(f"{verb} {count} orphaned {name}")
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delete documents belonging to events that no longer exist")
+    parser.add_argument("--dry-run", action="store_true", help="Only count orphaned documents")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    try:
+        asyncio.run(sweep(dry_run=args.dry_run))
+    finally:
+        close_clients()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Background job worker, run as separate processes next to the API server.
+
+Usage (from the backend directory):
+    python worker.py                              # one process, JOB_WORKER_CONCURRENCY jobs at a time
+    python worker.py --processes 4 --concurrency 2
+    python worker.py --spooler                    # the one process that drives the label printers
+
+Each process opens its own MongoDB connection and claims jobs from the ``jobs``
+collection (see ``jobs.py``). SIGTERM/SIGINT stop claiming new jobs and let the
+running ones finish.
+
+Badge print jobs are left to the spooler, which must run exactly once per
+deployment: it holds the only connection to each printer (``spooler.py``) and
+runs print jobs one at a time, oldest first, so labels come out in the order the
+desk queued them.
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+
+logger = logging.getLogger("worker")
+
+
+async def serve(concurrency: int):
+    # Imported here so every spawned process builds its own Mongo client.
+    # Importing routers registers every job handler without building the app.
+    import routers  # noqa: F401
+    from database import db, close_clients
+    from jobs import ensure_job_indexes, registered_job_types, worker_loop
+    from routers.badges import PRINT_JOB_TYPE
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    await ensure_job_indexes(db)
+    base_id = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info(f"Worker {base_id} started with concurrency {concurrency}")
+    job_types = [job_type for job_type in registered_job_types() if job_type != PRINT_JOB_TYPE]
+    try:
+        await asyncio.gather(*[
+            worker_loop(db, f"{base_id}:{i}", stop, job_types) for i in range(concurrency)
+        ])
+    finally:
+        close_clients()
+        logger.info(f"Worker {base_id} stopped")
+
+
+async def serve_spooler():
+    import routers  # noqa: F401
+    from database import db, close_clients
+    from jobs import ensure_job_indexes, worker_loop
+    from routers.badges import PRINT_JOB_TYPE
+    from spooler import PRINT_POLL_INTERVAL, PRINTER_STATUS_INTERVAL, get_spooler
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    async def report_status():
+        while not stop.is_set():
+            try:
+                await spooler.publish_status(db)
+            except Exception:
+                logger.exception("Could not publish printer status")
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=PRINTER_STATUS_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    await ensure_job_indexes(db)
+    spooler = get_spooler()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:spooler"
+    logger.info(f"Spooler {worker_id} started for printers {', '.join(spooler.printers) or '(none)'}")
+    try:
+        # One loop: print jobs are claimed oldest first and sent one at a time.
+        # Tenant caps don't apply, a label must not wait behind a tenant's exports.
+        await asyncio.gather(
+            worker_loop(db, worker_id, stop, [PRINT_JOB_TYPE], poll_interval=PRINT_POLL_INTERVAL, tenant_cap=False),
+            report_status()
+        )
+        await spooler.publish_status(db)
+    finally:
+        await spooler.close()
+        close_clients()
+        logger.info(f"Spooler {worker_id} stopped")
+
+
+def run_process(concurrency: int, spooler: bool = False):
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    asyncio.run(serve_spooler() if spooler else serve(concurrency))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--processes", type=int, default=int(os.getenv('JOB_WORKER_PROCESSES', '1')))
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv('JOB_WORKER_CONCURRENCY', '2')),
+                        help="Jobs run concurrently inside each process")
+    parser.add_argument("--spooler", action="store_true",
+                        help="Run the single print spooler process instead of job workers")
+    args = parser.parse_args()
+
+    if args.spooler:
+        return run_process(1, spooler=True)
+
+    if args.processes == 1:
+        return run_process(args.concurrency)
+
+    ctx = multiprocessing.get_context("spawn")
+    processes = [ctx.Process(target=run_process, args=(args.concurrency,)) for _ in range(args.processes)]
+    for p in processes:
+        p.start()
+    try:
+        for p in processes:
+            p.join()
+    except KeyboardInterrupt:
+        for p in processes:
+            p.terminate()
+            p.join()
+
+
+if __name__ == "__main__":
+    main()
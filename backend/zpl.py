@@ -0,0 +1,76 @@
+"""ZPL II rendering of badge templates for Zebra thermal printers.
+
+Follows the layout rules of ``draw_badge_on_canvas``: element positions are scaled
+from template units onto a 4x6 inch badge and text is placed by its baseline
+(``^FT``). QR elements become native ``^BQ`` barcodes instead of embedded bitmaps,
+so a label is a few hundred bytes and the printer rasterizes it itself.
+
+``^BQ`` cannot be rotated, so the duplicated/flipped fold-over layout of the PDF is
+not reproduced; each badge is one 4x6 label.
+"""
+from typing import Iterable, Optional
+
+BADGE_WIDTH_IN = 4
+BADGE_HEIGHT_IN = 6
+DEFAULT_DPI = 203  # 8 dots/mm, the common Zebra print head
+POINTS_PER_INCH = 72
+QR_QUIET_ZONE = 4  # modules; generate_qr_code renders PNGs with border=4
+MAX_QR_MAGNIFICATION = 10
+
+
+def escape_field_data(value: str) -> str:
+    """Hex-escapes the characters ZPL treats as control prefixes; use after ^FH"""
+    return "".join(f"_{ord(ch):02X}" if ch in "^~_" else ch for ch in value)
+
+
+def qr_module_count(data: str) -> int:
+    """Modules per side of the smallest QR symbol holding `data` at error level H"""
+    import qrcode  # imported on first use, like generate_qr_code
+
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_H, border=0)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr.modules_count
+
+
+def qr_command(x: int, y: int, size: int, data: str) -> str:
+    """^BQ barcode filling a `size` dot square whose top-left corner is (x, y)"""
+    modules = qr_module_count(data) + 2 * QR_QUIET_ZONE
+    magnification = max(1, min(MAX_QR_MAGNIFICATION, size // modules))
+    offset = QR_QUIET_ZONE * magnification
+    return f"^FO{x + offset},{y + offset}^BQN,2,{magnification}^FH^FDHA,{escape_field_data(data)}^FS"
+
+
+def render_badge_zpl(template: dict, contact: dict, qr_data: Optional[str] = None, dpi: int = DEFAULT_DPI) -> str:
+    """One ^XA..^XZ label for `contact`; QR elements are skipped when `qr_data` is None"""
+    width = BADGE_WIDTH_IN * dpi
+    height = BADGE_HEIGHT_IN * dpi
+    commands = ["^XA", "^CI28", f"^PW{width}", f"^LL{height}", "^LH0,0"]
+
+    for element in template["elements"]:
+        x = round((element["x"] / template["width"]) * width)
+        y = round((element["y"] / template["height"]) * height)
+
+        if element["type"] == "text":
+            text = element["content"]
+        elif element["type"] == "field":
+            text = str(contact.get(element["content"], ""))
+        elif element["type"] == "qrcode":
+            if qr_data:
+                size = round((element.get("width") or 1) * dpi)
+                commands.append(qr_command(x, y, size, qr_data))
+            continue
+        else:
+            continue
+
+        # Scalable font 0; sizes are points in the template, dots on the printer
+        font_dots = round((element.get("fontSize") or 16) * dpi / POINTS_PER_INCH)
+        commands.append(f"^FT{x},{y}^A0N,{font_dots},{font_dots}^FH^FD{escape_field_data(text)}^FS")
+
+    commands.append("^XZ")
+    return "\n".join(commands) + "\n"
+
+
+def render_badges_zpl(template: dict, contacts: Iterable[dict], qr_data_for, dpi: int = DEFAULT_DPI) -> str:
+    """Concatenated labels; `qr_data_for(contact)` returns the QR payload or None"""
+    return "".join(render_badge_zpl(template, contact, qr_data_for(contact), dpi) for contact in contacts)
@@ -23,8 +23,13 @@ export const BadgeDesigner = () => {
   const [elements, setElements] = useState([]);
   const [selectedElement, setSelectedElement] = useState(null);
   const [templates, setTemplates] = useState([]);
-  const [contacts, setContacts] = useState([]);
+  const [previewUrl, setPreviewUrl] = useState(null);
+  const [previewTemplateId, setPreviewTemplateId] = useState(null);
+  const [previewContacts, setPreviewContacts] = useState([]);
   const [previewContact, setPreviewContact] = useState(null);
+  const [previewSearch, setPreviewSearch] = useState('');
+  const [assetUrls, setAssetUrls] = useState({});
+  const imageInputRef = useRef(null);
 
   useEffect(() => {
     fetchEvents();
@@ -33,9 +38,9 @@ export const BadgeDesigner = () => {
 
   useEffect(() => {
     if (selectedEvent) {
-      fetchContacts(selectedEvent);
+      fetchPreviewContacts(selectedEvent, previewSearch);
     }
-  }, [selectedEvent]);
+  }, [selectedEvent, previewSearch]);
 
   const fetchEvents = async () => {
     try {
@@ -59,15 +64,90 @@ export const BadgeDesigner = () => {
     }
   };
 
-  const fetchContacts = async (eventId) => {
+  // One page of the event's attendees by name, not the whole contact list
+  const fetchPreviewContacts = async (eventId, search) => {
     try {
-      const response = await axios.get(`${API}/contacts?event_id=${eventId}`);
-      setContacts(response.data);
-      if (response.data.length > 0) {
-        setPreviewContact(response.data[0]);
+      const response = await axios.post(`${API}/contacts/query`, {
+        event_id: eventId,
+        filters: search ? [{ field: 'name', op: 'prefix', value: search }] : [],
+        sort: [{ field: 'name', direction: 'asc' }],
+        page_size: 50
+      });
+      setPreviewContacts(response.data.items);
+      setPreviewContact(prev => prev && response.data.items.some(c => c.contact_id === prev.contact_id)
+        ? prev
+        : response.data.items[0] || null);
+    } catch (error) {
+      console.error('Failed to fetch preview contacts:', error);
+    }
+  };
+
+  // Rendered server-side by the same code that prints the badge
+  const fetchPreview = async (templateId, contactId = previewContact?.contact_id) => {
+    setPreviewTemplateId(templateId);
+    try {
+      const params = { dpi: SCALE };
+      if (contactId) {
+        params.contact_id = contactId;
+      }
+      const response = await axios.get(`${API}/badge-templates/${templateId}/preview.png`, {
+        params,
+        responseType: 'blob'
+      });
+      setPreviewUrl(prev => {
+        if (prev) URL.revokeObjectURL(prev);
+        return URL.createObjectURL(response.data);
+      });
+    } catch (error) {
+      console.error('Failed to fetch preview:', error);
+      setPreviewUrl(null);
+    }
+  };
+
+  // Assets need the auth header, so they are fetched as blobs rather than linked
+  const fetchAssets = async (assetIds) => {
+    const missing = assetIds.filter(id => id && !assetUrls[id]);
+    const loaded = await Promise.all(missing.map(async (id) => {
+      try {
+        const response = await axios.get(`${API}/badge-assets/${id}`, { responseType: 'blob' });
+        return [id, URL.createObjectURL(response.data)];
+      } catch (error) {
+        console.error('Failed to fetch badge image:', error);
+        return null;
       }
+    }));
+    setAssetUrls(prev => ({ ...prev, ...Object.fromEntries(loaded.filter(Boolean)) }));
+  };
+
+  const uploadImage = async (e) => {
+    const file = e.target.files[0];
+    e.target.value = '';
+    if (!file) return;
+
+    const formData = new FormData();
+    formData.append('file', file);
+    try {
+      const response = await axios.post(`${API}/badge-assets`, formData);
+      const asset = response.data;
+      setAssetUrls(prev => ({ ...prev, [asset.asset_id]: URL.createObjectURL(file) }));
+
+      const offset = elements.length * 20;
+      const width = 150;
+      const newElement = {
+        id: `element-${Date.now()}`,
+        type: 'image',
+        content: asset.asset_id,
+        x: 50 + offset,
+        y: 50 + offset,
+        width,
+        height: Math.round(width * asset.height / asset.width)
+      };
+      setElements([...elements, newElement]);
+      setSelectedElement(newElement.id);
+      toast.success('Image element added');
     } catch (error) {
-      console.error('Failed to fetch contacts:', error);
+      console.error('Failed to upload image:', error);
+      toast.error(error.response?.data?.detail || 'Failed to upload image');
     }
   };
 
@@ -166,7 +246,7 @@ export const BadgeDesigner = () => {
     }
 
     try {
-      await axios.post(`${API}/badge-templates`, {
+      const response = await axios.post(`${API}/badge-templates`, {
         event_id: selectedEvent,
         name: templateName,
         width: BADGE_WIDTH,
@@ -190,6 +270,7 @@ export const BadgeDesigner = () => {
       });
       toast.success('Template saved successfully!');
       fetchTemplates();
+      fetchPreview(response.data.template_id);
     } catch (error) {
       console.error('Failed to save template:', error);
       toast.error('Failed to save template');
@@ -203,6 +284,8 @@ export const BadgeDesigner = () => {
       setTemplateName(template.name);
       setSelectedEvent(template.event_id);
       setElements(template.elements);
+      fetchAssets(template.elements.filter(el => el.type === 'image').map(el => el.content));
+      fetchPreview(templateId);
       toast.success('Template loaded');
     } catch (error) {
       console.error('Failed to load template:', error);
@@ -217,24 +300,23 @@ export const BadgeDesigner = () => {
       if (!previewContact) {
         return `{${element.content}}`;
       }
-      
-      // Handle special field mappings
+      const [firstName, ...lastNames] = (previewContact.name || '').split(' ');
       if (element.content === 'first_name') {
-        const fullName = previewContact.name || '';
-        return fullName.split(' ')[0] || '{first_name}';
+        return firstName || '{first_name}';
       } else if (element.content === 'last_name') {
-        const fullName = previewContact.name || '';
-        const parts = fullName.split(' ');
-        return parts.length > 1 ? parts.slice(1).join(' ') : '{last_name}';
+        return lastNames.join(' ') || '{last_name}';
       }
-      
       return previewContact[element.content] || `{${element.content}}`;
     } else if (element.type === 'qrcode') {
-      return previewContact?.qr_code ? (
-        <img src={previewContact.qr_code} alt="QR Code" className="w-full h-full object-contain" />
-      ) : (
+      return (
         <div className="w-full h-full bg-slate-200 flex items-center justify-center text-xs text-slate-500">QR</div>
       );
+    } else if (element.type === 'image') {
+      return assetUrls[element.content] ? (
+        <img src={assetUrls[element.content]} alt="" className="w-full h-full object-contain pointer-events-none" />
+      ) : (
+        <div className="w-full h-full bg-slate-200 flex items-center justify-center text-xs text-slate-500">Image</div>
+      );
     }
     return element.content;
   };
@@ -321,6 +403,22 @@ export const BadgeDesigner = () => {
                 <QrCode size={16} className="mr-2" />
                 QR Code
               </Button>
+              <Button
+                onClick={() => imageInputRef.current?.click()}
+                data-testid="add-image-button"
+                variant="secondary"
+                className="w-full justify-start text-sm"
+              >
+                <ImageIcon size={16} className="mr-2" />
+                Image / Logo
+              </Button>
+              <input
+                ref={imageInputRef}
+                type="file"
+                accept="image/png,image/jpeg,image/gif"
+                onChange={uploadImage}
+                className="hidden"
+              />
             </div>
           </div>
 
@@ -416,21 +514,47 @@ export const BadgeDesigner = () => {
             </div>
           )}
 
-          {contacts.length > 0 && (
+          <div>
+            <h3 className="font-semibold text-slate-900 mb-4">Preview Contact</h3>
+            <Input
+              value={previewSearch}
+              onChange={(e) => setPreviewSearch(e.target.value)}
+              placeholder="Search by name"
+              data-testid="preview-contact-search"
+              className="mb-2"
+            />
+            <Select
+              value={previewContact?.contact_id || ''}
+              onValueChange={(id) => {
+                const contact = previewContacts.find(c => c.contact_id === id);
+                setPreviewContact(contact);
+                if (previewTemplateId) {
+                  fetchPreview(previewTemplateId, id);
+                }
+              }}
+            >
+              <SelectTrigger data-testid="preview-contact-select">
+                <SelectValue placeholder="Choose contact" />
+              </SelectTrigger>
+              <SelectContent>
+                {previewContacts.map(contact => (
+                  <SelectItem key={contact.contact_id} value={contact.contact_id}>
+                    {contact.name}
+                  </SelectItem>
+                ))}
+              </SelectContent>
+            </Select>
+          </div>
+
+          {previewUrl && (
             <div>
-              <h3 className="font-semibold text-slate-900 mb-4">Preview Contact</h3>
-              <Select value={previewContact?.contact_id} onValueChange={(id) => setPreviewContact(contacts.find(c => c.contact_id === id))}>
-                <SelectTrigger data-testid="preview-contact-select">
-                  <SelectValue placeholder="Choose contact" />
-                </SelectTrigger>
-                <SelectContent>
-                  {contacts.map(contact => (
-                    <SelectItem key={contact.contact_id} value={contact.contact_id}>
-                      {contact.name}
-                    </SelectItem>
-                  ))}
-                </SelectContent>
-              </Select>
+              <h3 className="font-semibold text-slate-900 mb-4">Print Preview</h3>
+              <img
+                src={previewUrl}
+                alt="Badge print preview"
+                data-testid="badge-print-preview"
+                className="w-full border border-slate-200 rounded-lg"
+              />
             </div>
           )}
         </div>
@@ -473,7 +597,7 @@ export const BadgeDesigner = () => {
                   height: `${element.height}px`
                 }}
               >
-                {element.type === 'qrcode' ? (
+                {element.type === 'qrcode' || element.type === 'image' ? (
                   renderElementContent(element)
                 ) : (
                   <div className="w-full h-full flex items-center px-2">
@@ -552,7 +676,7 @@ export const BadgeDesigner = () => {
                   </div>
                 )}
 
-                {selected.type !== 'qrcode' && (
+                {selected.type !== 'qrcode' && selected.type !== 'image' && (
                   <>
                     <div>
                       <Label className="text-xs">Font Size</Label>
@@ -28,6 +28,35 @@ export const CheckIn = () => {
     }
   }, [selectedEvent]);
 
+  // Live updates from other check-in desks and new registrations
+  useEffect(() => {
+    if (!selectedEvent) return;
+    const token = localStorage.getItem('token');
+    const source = new EventSource(`${API}/events/${selectedEvent}/live?access_token=${token}`);
+
+    source.addEventListener('check_in', (e) => {
+      const { contact_id } = JSON.parse(e.data);
+      setCheckedInContacts(prev => {
+        if (prev.has(contact_id)) return prev;
+        const next = new Set(prev);
+        next.add(contact_id);
+        setStats(s => ({ ...s, checkedIn: next.size }));
+        return next;
+      });
+    });
+    source.addEventListener('registration', (e) => {
+      const data = JSON.parse(e.data);
+      setContacts(prev => {
+        if (prev.some(c => c.contact_id === data.contact_id)) return prev;
+        setStats(s => ({ ...s, total: prev.length + 1 }));
+        return [...prev, { ...data, type: data.contact_type }];
+      });
+    });
+    source.addEventListener('resync', () => fetchContacts());
+
+    return () => source.close();
+  }, [selectedEvent]);
+
   const fetchEvents = async () => {
     try {
       const response = await axios.get(`${API}/events`);
@@ -44,10 +73,12 @@ export const CheckIn = () => {
   const fetchContacts = async () => {
     try {
       const response = await axios.get(`${API}/contacts?event_id=${selectedEvent}`);
+      const checkedIn = new Set(response.data.filter(c => c.checked_in_at).map(c => c.contact_id));
       setContacts(response.data);
+      setCheckedInContacts(checkedIn);
       setStats({
         total: response.data.length,
-        checkedIn: checkedInContacts.size
+        checkedIn: checkedIn.size
       });
     } catch (error) {
       console.error('Failed to fetch contacts:', error);
@@ -55,12 +86,20 @@ export const CheckIn = () => {
     }
   };
 
-  const handleCheckIn = (contactId) => {
-    const newCheckedIn = new Set(checkedInContacts);
-    newCheckedIn.add(contactId);
-    setCheckedInContacts(newCheckedIn);
-    setStats(prev => ({ ...prev, checkedIn: prev.checkedIn + 1 }));
-    toast.success('Contact checked in successfully!');
+  const handleCheckIn = async (contactId) => {
+    try {
+      await axios.post(`${API}/contacts/${contactId}/check-in`);
+      setCheckedInContacts(prev => {
+        const next = new Set(prev);
+        next.add(contactId);
+        setStats(s => ({ ...s, checkedIn: next.size }));
+        return next;
+      });
+      toast.success('Contact checked in successfully!');
+    } catch (error) {
+      console.error('Failed to check in contact:', error);
+      toast.error('Failed to check in contact');
+    }
   };
 
   const filteredContacts = contacts.filter(contact =>
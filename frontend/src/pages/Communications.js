@@ -41,14 +41,25 @@ export const Communications = () => {
 
   const handleSend = async (e) => {
     e.preventDefault();
+    if (!selectedEvent) {
+      toast.error('Please select an event');
+      return;
+    }
     setSending(true);
     
-    // Simulate email sending (in real implementation, this would call the backend)
-    setTimeout(() => {
-      toast.success('Email sent successfully!');
+    try {
+      await axios.post(`${API}/communications/campaigns`, {
+        event_id: selectedEvent,
+        ...emailData
+      });
+      toast.success('Email campaign queued for sending!');
       setEmailData({ subject: '', content: '', recipient_type: 'all' });
+    } catch (error) {
+      console.error('Failed to send email:', error);
+      toast.error(error.response?.data?.detail || 'Failed to send email');
+    } finally {
       setSending(false);
-    }, 1500);
+    }
   };
 
   return (
@@ -1,4 +1,4 @@
-import { useEffect, useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
 import { Layout } from '../components/Layout';
@@ -7,6 +7,8 @@ import { Calendar, Users, CreditCard, IdCard, TrendingUp } from 'lucide-react';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
+// Feeds restarting together (e.g. after a failover) should cost one refetch, not one each
+const RESYNC_DEBOUNCE_MS = 1000;
 
 export const Dashboard = () => {
   const navigate = useNavigate();
@@ -18,10 +20,35 @@ export const Dashboard = () => {
   });
   const [loading, setLoading] = useState(true);
 
+  const [runningEvents, setRunningEvents] = useState([]);
+  const resyncTimer = useRef(null);
+
   useEffect(() => {
     fetchStats();
   }, []);
 
+  // Live registrations for the events taking place today
+  useEffect(() => {
+    if (runningEvents.length === 0) return;
+    const token = localStorage.getItem('token');
+    const scheduleResync = () => {
+      clearTimeout(resyncTimer.current);
+      resyncTimer.current = setTimeout(fetchStats, RESYNC_DEBOUNCE_MS);
+    };
+    const sources = runningEvents.map((eventId) => {
+      const source = new EventSource(`${API}/events/${eventId}/live?access_token=${token}`);
+      source.addEventListener('registration', () => {
+        setStats(s => ({ ...s, contacts: s.contacts + 1 }));
+      });
+      source.addEventListener('resync', scheduleResync);
+      return source;
+    });
+    return () => {
+      clearTimeout(resyncTimer.current);
+      sources.forEach(source => source.close());
+    };
+  }, [runningEvents.join(',')]);
+
   const fetchStats = async () => {
     try {
       const [eventsRes, contactsRes, ordersRes, badgesRes] = await Promise.all([
@@ -31,6 +58,10 @@ export const Dashboard = () => {
         axios.get(`${API}/badge-templates`)
       ]);
 
+      const today = new Date().toISOString().slice(0, 10);
+      setRunningEvents(eventsRes.data
+        .filter(event => event.dates?.start <= today && today <= event.dates?.end)
+        .map(event => event.event_id));
       setStats({
         events: eventsRes.data.length,
         contacts: contactsRes.data.length,
@@ -2,25 +2,35 @@ import { useState, useEffect } from 'react';
 import { Layout } from '../components/Layout';
 import { Button } from '../components/ui/button';
 import { Badge } from '../components/ui/badge';
+import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '../components/ui/select';
 import { toast } from 'sonner';
 import axios from 'axios';
 import { CreditCard, DollarSign, CheckCircle, XCircle, Clock } from 'lucide-react';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
+const PAGE_SIZE = 50;
 
 export const Orders = () => {
   const [orders, setOrders] = useState([]);
+  const [total, setTotal] = useState(0);
+  const [page, setPage] = useState(1);
+  const [statusFilter, setStatusFilter] = useState('all');
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     fetchOrders();
-  }, []);
+  }, [page, statusFilter]);
 
   const fetchOrders = async () => {
     try {
-      const response = await axios.get(`${API}/orders`);
-      setOrders(response.data);
+      const params = { page, page_size: PAGE_SIZE };
+      if (statusFilter !== 'all') {
+        params.status = statusFilter;
+      }
+      const response = await axios.get(`${API}/orders/listing`, { params });
+      setOrders(response.data.items);
+      setTotal(response.data.total);
     } catch (error) {
       console.error('Failed to fetch orders:', error);
       toast.error('Failed to load orders');
@@ -55,12 +65,36 @@ export const Orders = () => {
     return colors[status] || 'bg-gray-100 text-gray-700';
   };
 
+  const handleStatusChange = (value) => {
+    setStatusFilter(value);
+    setPage(1);
+  };
+
+  const pageCount = Math.max(1, Math.ceil(total / PAGE_SIZE));
+
   return (
     <Layout>
       <div data-testid="orders-container" className="space-y-6">
-        <div>
-          <h2 className="text-3xl font-bold text-slate-900">Orders</h2>
-          <p className="text-slate-600 mt-1">Manage payments and transactions</p>
+        <div className="flex items-center justify-between">
+          <div>
+            <h2 className="text-3xl font-bold text-slate-900">Orders</h2>
+            <p className="text-slate-600 mt-1">Manage payments and transactions</p>
+          </div>
+          <div className="w-48">
+            <Select value={statusFilter} onValueChange={handleStatusChange}>
+              <SelectTrigger data-testid="order-status-select">
+                <SelectValue placeholder="All statuses" />
+              </SelectTrigger>
+              <SelectContent>
+                <SelectItem value="all">All statuses</SelectItem>
+                <SelectItem value="draft">Draft</SelectItem>
+                <SelectItem value="pending">Pending</SelectItem>
+                <SelectItem value="paid">Paid</SelectItem>
+                <SelectItem value="refunded">Refunded</SelectItem>
+                <SelectItem value="cancelled">Cancelled</SelectItem>
+              </SelectContent>
+            </Select>
+          </div>
         </div>
 
         {loading ? (
@@ -82,6 +116,9 @@ export const Orders = () => {
                     <th className="px-6 py-4 text-left text-xs font-medium text-slate-700 uppercase tracking-wider">
                       Order ID
                     </th>
+                    <th className="px-6 py-4 text-left text-xs font-medium text-slate-700 uppercase tracking-wider">
+                      Contact
+                    </th>
                     <th className="px-6 py-4 text-left text-xs font-medium text-slate-700 uppercase tracking-wider">
                       Status
                     </th>
@@ -111,6 +148,18 @@ export const Orders = () => {
                           </span>
                         </div>
                       </td>
+                      <td className="px-6 py-4">
+                        {order.contact ? (
+                          <div>
+                            <div className="text-sm font-medium text-slate-900">{order.contact.name}</div>
+                            <div className="text-xs text-slate-500">
+                              {order.contact.company || order.contact.email}
+                            </div>
+                          </div>
+                        ) : (
+                          <span className="text-sm text-slate-400">Deleted contact</span>
+                        )}
+                      </td>
                       <td className="px-6 py-4 whitespace-nowrap">
                         <span className={`px-2 py-1 rounded-full text-xs font-medium ${getStatusColor(order.status)}`}>
                           {order.status}
@@ -124,7 +173,9 @@ export const Orders = () => {
                       </td>
                       <td className="px-6 py-4">
                         <div className="text-sm text-slate-600">
-                          {order.items.length} item{order.items.length !== 1 ? 's' : ''}
+                          {order.ticket_names.length > 0
+                            ? order.ticket_names.join(', ')
+                            : `${order.items.length} item${order.items.length !== 1 ? 's' : ''}`}
                         </div>
                       </td>
                       <td className="px-6 py-4 whitespace-nowrap text-sm text-slate-600">
@@ -135,6 +186,31 @@ export const Orders = () => {
                 </tbody>
               </table>
             </div>
+            <div className="flex items-center justify-between px-6 py-4 border-t border-slate-200">
+              <span className="text-sm text-slate-600">
+                {total} order{total !== 1 ? 's' : ''} · page {page} of {pageCount}
+              </span>
+              <div className="flex space-x-2">
+                <Button
+                  variant="outline"
+                  size="sm"
+                  disabled={page <= 1}
+                  onClick={() => setPage(page - 1)}
+                  data-testid="orders-prev-page"
+                >
+                  Previous
+                </Button>
+                <Button
+                  variant="outline"
+                  size="sm"
+                  disabled={page >= pageCount}
+                  onClick={() => setPage(page + 1)}
+                  data-testid="orders-next-page"
+                >
+                  Next
+                </Button>
+              </div>
+            </div>
           </div>
         )}
       </div>
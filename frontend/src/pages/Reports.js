@@ -29,6 +29,29 @@ export const Reports = () => {
     }
   }, [selectedEvent]);
 
+  // Keep the numbers current while the event is running
+  useEffect(() => {
+    if (!selectedEvent) return;
+    const token = localStorage.getItem('token');
+    const source = new EventSource(`${API}/events/${selectedEvent}/live?access_token=${token}`);
+
+    source.addEventListener('registration', (e) => {
+      const { contact_type } = JSON.parse(e.data);
+      setStats(s => ({
+        ...s,
+        totalContacts: s.totalContacts + 1,
+        byType: { ...s.byType, [contact_type]: (s.byType[contact_type] || 0) + 1 }
+      }));
+    });
+    source.addEventListener('order_paid', (e) => {
+      const { total_amount } = JSON.parse(e.data);
+      setStats(s => ({ ...s, totalRevenue: s.totalRevenue + (total_amount || 0) }));
+    });
+    source.addEventListener('resync', () => fetchStats());
+
+    return () => source.close();
+  }, [selectedEvent]);
+
   const fetchEvents = async () => {
     try {
       const response = await axios.get(`${API}/events`);
@@ -45,15 +68,14 @@ export const Reports = () => {
   const fetchStats = async () => {
     try {
       const [contactsRes, ordersRes] = await Promise.all([
-        axios.get(`${API}/contacts?event_id=${selectedEvent}`),
+        axios.post(`${API}/contacts/query`, { event_id: selectedEvent, facets: ['type'], page_size: 1 }),
         axios.get(`${API}/orders?event_id=${selectedEvent}`)
       ]);
 
-      const contacts = contactsRes.data;
       const orders = ordersRes.data;
 
-      const byType = contacts.reduce((acc, contact) => {
-        acc[contact.type] = (acc[contact.type] || 0) + 1;
+      const byType = contactsRes.data.facets.type.reduce((acc, bucket) => {
+        acc[bucket.value] = bucket.count;
         return acc;
       }, {});
 
@@ -62,7 +84,7 @@ export const Reports = () => {
         .reduce((sum, o) => sum + o.total_amount, 0);
 
       setStats({
-        totalContacts: contacts.length,
+        totalContacts: contactsRes.data.total,
         totalOrders: orders.length,
         totalRevenue,
         byType
@@ -0,0 +1,10 @@
+import os
+import sys
+from pathlib import Path
+
+# The backend runs from its own directory with flat imports (`import jobs`)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+# Motor connects lazily, so modules importing `database` load without a server
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "unit_tests")
@@ -0,0 +1,78 @@
+"""Cold-import budget for the API app.
+
+Imports ``server`` in fresh interpreters with ``python -X importtime`` and fails when
+the best cumulative import time exceeds the budget, or when any dependency that is
+meant to load lazily (ReportLab, PIL, qrcode, passlib/bcrypt, jose, Stripe, mail
+transports) is imported at startup.
+
+Usage:
+    python -m tests.perf.import_budget                # default budget
+    python -m tests.perf.import_budget --budget-ms 900 --runs 5
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+DEFAULT_BUDGET_MS = 1500
+LAZY_MODULES = {
+    "reportlab", "PIL", "qrcode", "passlib", "bcrypt", "jose",
+    "emergentintegrations", "stripe", "aiosmtplib", "jinja2",
+}
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure() -> tuple:
+    """Returns (cumulative microseconds for `server`, set of top-level modules imported)"""
+    env = dict(os.environ)
+    # Motor connects lazily, so no database is needed to import the app
+    env.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    env.setdefault("DB_NAME", "import_budget")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"Importing server failed:\n{proc.stderr[-4000:]}")
+
+    total_us = None
+    modules = set()
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        modules.add(match.group(4).split(".")[0])
+        if match.group(4) == "server":
+            total_us = int(match.group(2))
+    return total_us, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if cold import of the API regresses")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS)))
+    parser.add_argument("--runs", type=int, default=3, help="Best of N runs is compared to the budget")
+    args = parser.parse_args()
+
+    best_us, eager = None, set()
+    for _ in range(args.runs):
+        total_us, modules = measure()
+        best_us = total_us if best_us is None else min(best_us, total_us)
+        eager |= modules & LAZY_MODULES
+
+    best_ms = best_us / 1000
+    print(f"Cold import of server: {best_ms:.1f}ms (budget {args.budget_ms:.0f}ms, best of {args.runs})")
+    failed = False
+    if eager:
+        print(f"FAIL: imported at startup but should load lazily: {', '.join(sorted(eager))}")
+        failed = True
+    if best_ms > args.budget_ms:
+        print(f"FAIL: cold import exceeds budget by {best_ms - args.budget_ms:.1f}ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""Scripted load harness for the API, driven by the manifest written by ``seed_data.py``.
+
+Runs each scenario against a live server, reports p50/p95/p99 latency and throughput
+and writes them to a JSON results file. Passing ``--baseline`` compares against an
+earlier run and exits non-zero when any scenario's p95 regressed past the tolerance.
+
+Usage:
+    python -m tests.perf.loadtest --base-url http://localhost:8001 --out tests/perf/results.json
+    python -m tests.perf.loadtest --scenarios scanner_burst,dashboard --baseline tests/perf/baseline.json
+
+The seeded tenants are few and busy, so per-tenant admission control
+(``backend/admission.py``) throttles scanner_burst, csv_export and badge_printing long
+before the server is saturated. To measure capacity, start the server under test with
+``ADMISSION_ENABLED=0``, or raise the limits with ``ADMISSION_RATE_SCAN``,
+``ADMISSION_RATE_PRINT``, ``ADMISSION_RATE_BULK`` and ``ADMISSION_HEAVY_CONCURRENCY``.
+Scenarios that were answered with 429s are flagged in the report.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+import httpx
+
+DEFAULT_TOLERANCE = 0.20  # allowed p95 growth vs baseline
+
+
+class ScenarioResult:
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.status_counts: Dict[int, int] = {}
+        self.elapsed = 0.0
+
+    def record(self, latency: float, status_code: int):
+        self.latencies.append(latency)
+        self.status_counts[status_code] = self.status_counts.get(status_code, 0) + 1
+        if status_code >= 400:
+            self.errors += 1
+
+    def summary(self) -> dict:
+        ordered = sorted(self.latencies)
+
+        def pct(p):
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000, 2)
+
+        return {
+            "requests": len(ordered),
+            "errors": self.errors,
+            "status_counts": {str(k): v for k, v in sorted(self.status_counts.items())},
+            "throughput_rps": round(len(ordered) / self.elapsed, 2) if self.elapsed else 0,
+            "mean_ms": round(statistics.fmean(ordered) * 1000, 2) if ordered else None,
+            "p50_ms": pct(50),
+            "p95_ms": pct(95),
+            "p99_ms": pct(99),
+            "max_ms": round(ordered[-1] * 1000, 2) if ordered else None,
+        }
+
+
+class Harness:
+    def __init__(self, base_url: str, manifest: dict, concurrency: int, requests_per_scenario: int):
+        self.base_url = base_url.rstrip("/")
+        self.manifest = manifest
+        self.concurrency = concurrency
+        self.requests = requests_per_scenario
+        self.tokens: Dict[str, str] = {}
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=120,
+            limits=httpx.Limits(max_connections=concurrency * 2)
+        )
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def login_all(self):
+        for tenant in self.manifest["tenants"]:
+            response = await self.client.post(
+                "/api/auth/login", json={"email": tenant["email"], "password": tenant["password"]}
+            )
+            response.raise_for_status()
+            self.tokens[tenant["tenant_id"]] = response.json()["access_token"]
+
+    def _auth(self, tenant: dict) -> dict:
+        return {"Authorization": f"Bearer {self.tokens[tenant['tenant_id']]}"}
+
+    async def _timed(self, result: ScenarioResult, method: str, url: str, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            await response.aread()
+            result.record(time.perf_counter() - start, response.status_code)
+        except httpx.HTTPError:
+            result.record(time.perf_counter() - start, 599)
+
+    async def run(self, name: str, step: Callable[[ScenarioResult], object], requests: int = None) -> ScenarioResult:
+        """Run step() `requests` times with at most `concurrency` in flight"""
+        result = ScenarioResult(name)
+        remaining = requests or self.requests
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                await step(result)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(self.concurrency)])
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    # ===== SCENARIOS =====
+
+    async def login_storm(self):
+        async def step(result):
+            tenant = random.choice(self.manifest["tenants"])
+            await self._timed(result, "POST", "/api/auth/login",
+                              json={"email": tenant["email"], "password": tenant["password"]})
+        return await self.run("login_storm", step)
+
+    async def scanner_burst(self):
+        """Exhibitors scanning badges: public contact lookup followed by a lead save"""
+        async def step(result):
+            tenant = random.choice(self.manifest["tenants"])
+            contact_id = random.choice(tenant["sample_contact_ids"])
+            await self._timed(result, "GET", f"/api/public/contact/{contact_id}")
+            await self._timed(result, "POST", "/api/leads", headers=self._auth(tenant),
+                              json={"contact_id": contact_id, "event_id": tenant["event_ids"][0]})
+        return await self.run("scanner_burst", step)
+
+    async def dashboard(self):
+        """The four requests Dashboard.js issues on load"""
+        async def step(result):
+            tenant = random.choice(self.manifest["tenants"])
+            headers = self._auth(tenant)
+            await asyncio.gather(*[
+                self._timed(result, "GET", path, headers=headers)
+                for path in ("/api/events", "/api/contacts", "/api/orders", "/api/badge-templates")
+            ])
+        return await self.run("dashboard", step)
+
+    async def csv_export(self):
+        async def step(result):
+            tenant = random.choice(self.manifest["tenants"])
+            await self._timed(result, "GET", "/api/leads/export", headers=self._auth(tenant),
+                              params={"event_id": random.choice(tenant["event_ids"])})
+        return await self.run("csv_export", step, requests=max(1, self.requests // 10))
+
+    async def badge_printing(self):
+        async def step(result):
+            tenant = random.choice(self.manifest["tenants"])
+            contact_id = random.choice(tenant["sample_contact_ids"])
+            await self._timed(result, "GET", f"/api/badges/print/{contact_id}", headers=self._auth(tenant))
+        return await self.run("badge_printing", step)
+
+
+SCENARIOS = ["login_storm", "scanner_burst", "dashboard", "csv_export", "badge_printing"]
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    regressions = []
+    for name, summary in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous or not previous.get("p95_ms") or not summary.get("p95_ms"):
+            continue
+        limit = previous["p95_ms"] * (1 + tolerance)
+        if summary["p95_ms"] > limit:
+            regressions.append(f"{name}: p95 {summary['p95_ms']}ms > {limit:.2f}ms (baseline {previous['p95_ms']}ms)")
+    return regressions
+
+
+async def main_async(args) -> int:
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+    harness = Harness(args.base_url, manifest, args.concurrency, args.requests)
+    try:
+        await harness.login_all()
+        scenarios = {}
+        for name in args.scenarios.split(","):
+            result = await getattr(harness, name)()
+            scenarios[name] = result.summary()
+            s = scenarios[name]
+            print(f"{name:16s} {s['requests']:6d} req  {s['throughput_rps']:8.1f} rps  "
+                  f"p50 {s['p50_ms']}ms  p95 {s['p95_ms']}ms  p99 {s['p99_ms']}ms  errors {s['errors']}")
+            if s["status_counts"].get("429"):
+                print(f"{'':16s} {s['status_counts']['429']} requests throttled by admission control; "
+                      f"see ADMISSION_ENABLED in the module docstring", file=sys.stderr)
+    finally:
+        await harness.close()
+
+    results = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "base_url": args.base_url,
+        "concurrency": args.concurrency,
+        "scenarios": scenarios,
+    }
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote results to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run load scenarios against the API")
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--manifest", default="tests/perf/manifest.json")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per scenario")
+    parser.add_argument("--out", default="tests/perf/results.json")
+    parser.add_argument("--baseline", help="Previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+    unknown = set(args.scenarios.split(",")) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""Synthetic data generator for load testing against a local mongod.
+
+Creates tenants with production-like volumes (by default 100k contacts, 20k orders
+and 50k leads per tenant) using the same document shapes as the API routers in
+``backend/routers/``, and writes a manifest with login credentials and sample ids for ``loadtest.py``.
+
+Usage:
+    python -m tests.perf.seed_data --mongo-url mongodb://localhost:27017 --db-name eventpass_perf
+    python -m tests.perf.seed_data --tenants 3 --contacts 20000 --drop
+"""
+import argparse
+import base64
+import json
+import random
+import string
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from io import BytesIO
+
+import qrcode
+from passlib.context import CryptContext
+from pymongo import MongoClient
+
+BATCH_SIZE = 5000
+DEFAULT_PASSWORD = "loadtest-password"
+QR_POOL_SIZE = 64  # distinct QR images reused across contacts; keeps document sizes realistic
+
+CONTACT_TYPES = ["attendee"] * 70 + ["speaker"] * 5 + ["exhibitor"] * 12 + ["sponsor"] * 4 + ["vip"] * 6 + ["media"] * 3
+COMPANIES = [f"{a} {b}" for a in ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka", "Soylent", "Tyrell"]
+             for b in ["Corp", "Labs", "Group", "Systems", "Media", "Partners"]]
+TITLES = ["Engineer", "Director", "VP Marketing", "CTO", "Founder", "Product Manager", "Analyst", "Designer", "Sales Lead"]
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn", "Robin", "Drew"]
+LAST_NAMES = ["Smith", "Garcia", "Chen", "Patel", "Okafor", "Müller", "Rossi", "Kim", "Novak", "Silva", "Nguyen", "Haddad"]
+TICKETS = [("General Admission", 199.0), ("VIP Pass", 599.0), ("Student", 49.0), ("Workshop Day", 149.0), ("Exhibitor Pass", 0.0)]
+DIETARY = ["none", "vegetarian", "vegan", "gluten-free", "halal", "kosher", "nut allergy"]
+TRACKS = ["AI", "Cloud", "Security", "Data", "Product", "Leadership"]
+SPONSOR_TIERS = ["platinum", "gold", "silver", "bronze"]
+
+
+def _iso(dt: datetime) -> str:
+    return dt.isoformat()
+
+
+def _qr_pool():
+    pool = []
+    for i in range(QR_POOL_SIZE):
+        qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_H, box_size=10, border=4)
+        qr.add_data(f"https://perf.eventpass.app/contact/{uuid.uuid4()}")
+        qr.make(fit=True)
+        buffered = BytesIO()
+        qr.make_image(fill_color="black", back_color="white").save(buffered, format="PNG")
+        pool.append(f"data:image/png;base64,{base64.b64encode(buffered.getvalue()).decode()}")
+    return pool
+
+
+def _custom_data(rng: random.Random, contact_type: str) -> dict:
+    """Sparse, varied custom_data like real registration forms produce"""
+    data = {}
+    if rng.random() < 0.8:
+        data["dietary"] = rng.choice(DIETARY)
+    if rng.random() < 0.6:
+        data["track"] = rng.choice(TRACKS)
+    if contact_type == "sponsor":
+        data["sponsor_tier"] = rng.choice(SPONSOR_TIERS)
+    if rng.random() < 0.3:
+        data["tshirt_size"] = rng.choice(["XS", "S", "M", "L", "XL", "XXL"])
+    if rng.random() < 0.2:
+        data["linkedin"] = f"https://linkedin.com/in/{''.join(rng.choices(string.ascii_lowercase, k=10))}"
+    if rng.random() < 0.1:
+        data["sessions"] = rng.sample(range(1, 60), k=rng.randint(1, 6))
+    if rng.random() < 0.05:
+        data["notes"] = " ".join(rng.choices(LAST_NAMES + TITLES, k=rng.randint(5, 40)))
+    return data
+
+
+def _insert_batched(collection, docs_iter):
+    batch, total = [], 0
+    for doc in docs_iter:
+        batch.append(doc)
+        if len(batch) >= BATCH_SIZE:
+            collection.insert_many(batch, ordered=False)
+            total += len(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+        total += len(batch)
+    return total
+
+
+def seed_tenant(db, rng: random.Random, qr_pool, password_hash: str, index: int, args) -> dict:
+    now = datetime.now(timezone.utc)
+    tenant_id = str(uuid.uuid4())
+    user_id = str(uuid.uuid4())
+    email = f"organiser{index}@perf.eventpass.app"
+    db.tenants.insert_one({"tenant_id": tenant_id, "name": f"Load Test Org {index}", "created_at": _iso(now)})
+    db.users.insert_one({
+        "user_id": user_id, "email": email, "name": f"Organiser {index}", "password_hash": password_hash,
+        "role": "organiser_admin", "tenant_id": tenant_id, "created_at": _iso(now)
+    })
+
+    event_ids = [str(uuid.uuid4()) for _ in range(args.events)]
+    db.events.insert_many([{
+        "event_id": event_id, "tenant_id": tenant_id, "user_id": user_id,
+        "name": f"Conference {index}-{n}", "dates": {"start": "2026-06-01", "end": "2026-06-03"},
+        "venue": "Convention Centre", "description": "Synthetic load test event", "created_at": _iso(now)
+    } for n, event_id in enumerate(event_ids)])
+
+    ticket_docs = []
+    for event_id in event_ids:
+        for name, price in TICKETS:
+            ticket_docs.append({
+                "ticket_id": str(uuid.uuid4()), "tenant_id": tenant_id, "event_id": event_id, "name": name,
+                "description": None, "price": price, "currency": "usd", "quantity": None, "sold": 0,
+                "available": None, "start_sale": None, "end_sale": None, "created_at": _iso(now)
+            })
+    db.tickets.insert_many(ticket_docs)
+
+    template_ids = []
+    for event_id in event_ids:
+        template_id = str(uuid.uuid4())
+        template_ids.append(template_id)
+        db.badge_templates.insert_one({
+            "template_id": template_id, "tenant_id": tenant_id, "event_id": event_id, "name": "Default",
+            "width": 4.0, "height": 6.0, "is_default": True, "created_at": _iso(now),
+            "elements": [
+                {"id": "1", "type": "field", "content": "name", "x": 0.3, "y": 1.0, "fontSize": 28},
+                {"id": "2", "type": "field", "content": "company", "x": 0.3, "y": 1.6, "fontSize": 18},
+                {"id": "3", "type": "field", "content": "title", "x": 0.3, "y": 2.0, "fontSize": 14},
+                {"id": "4", "type": "qrcode", "content": "qr", "x": 1.25, "y": 3.0, "width": 1.5, "height": 1.5},
+                {"id": "5", "type": "text", "content": "ATTENDEE", "x": 0.3, "y": 5.5, "fontSize": 20},
+            ]
+        })
+
+    contacts = []  # (contact_id, event_id, name, email, company, title, phone, type)
+
+    def contact_docs():
+        for n in range(args.contacts):
+            contact_id = str(uuid.uuid4())
+            event_id = event_ids[n % len(event_ids)]
+            contact_type = rng.choice(CONTACT_TYPES)
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            contact_email = f"contact{index}.{n}@perf.eventpass.app"
+            company = rng.choice(COMPANIES)
+            title = rng.choice(TITLES)
+            phone = f"+1555{rng.randint(1000000, 9999999)}"
+            contacts.append((contact_id, event_id, name, contact_email, company, title, phone, contact_type))
+            yield {
+                "contact_id": contact_id, "tenant_id": tenant_id, "event_id": event_id, "type": contact_type,
+                "name": name, "email": contact_email, "email_normalized": contact_email, "company": company, "title": title, "phone": phone,
+                "booth_number": f"B{rng.randint(1, 400)}" if contact_type in ("exhibitor", "sponsor") else None,
+                "ticket_type": rng.choice(TICKETS)[0], "qr_code": rng.choice(qr_pool),
+                "custom_data": _custom_data(rng, contact_type),
+                "created_at": _iso(now - timedelta(minutes=rng.randint(0, 60 * 24 * 120)))
+            }
+    _insert_batched(db.contacts, contact_docs())
+
+    order_ids = []
+
+    def order_docs():
+        for n in range(args.orders):
+            contact = rng.choice(contacts)
+            ticket_name, price = rng.choice(TICKETS)
+            quantity = rng.choice([1, 1, 1, 2, 3])
+            order_id = str(uuid.uuid4())
+            order_status = rng.choices(["paid", "pending", "draft", "refunded", "cancelled"], [70, 10, 10, 5, 5])[0]
+            order_ids.append((order_id, order_status, price * quantity))
+            yield {
+                "order_id": order_id, "tenant_id": tenant_id, "event_id": contact[1], "contact_id": contact[0],
+                "items": [{"name": ticket_name, "price": price, "quantity": quantity}],
+                "total_amount": price * quantity, "currency": "usd", "status": order_status,
+                "stripe_session_id": f"cs_test_{uuid.uuid4().hex}" if order_status != "draft" else None,
+                "created_at": _iso(now - timedelta(minutes=rng.randint(0, 60 * 24 * 120)))
+            }
+    _insert_batched(db.orders, order_docs())
+
+    def transaction_docs():
+        for order_id, order_status, amount in order_ids:
+            if order_status == "draft":
+                continue
+            yield {
+                "transaction_id": str(uuid.uuid4()), "tenant_id": tenant_id, "order_id": order_id,
+                "session_id": f"cs_test_{uuid.uuid4().hex}", "amount": amount, "currency": "usd",
+                "status": "completed" if order_status == "paid" else "initiated",
+                "payment_status": "paid" if order_status == "paid" else "pending",
+                "created_at": _iso(now)
+            }
+    _insert_batched(db.payment_transactions, transaction_docs())
+
+    def lead_docs():
+        # Spread leads over a handful of exhibitor users plus the organiser
+        scanners = [user_id] + [str(uuid.uuid4()) for _ in range(args.scanners - 1)]
+        for n in range(args.leads):
+            contact = rng.choice(contacts)
+            yield {
+                "lead_id": str(uuid.uuid4()), "tenant_id": tenant_id, "user_id": scanners[n % len(scanners)],
+                "event_id": contact[1], "contact_id": contact[0], "contact_name": contact[2],
+                "contact_email": contact[3], "contact_company": contact[4], "contact_title": contact[5],
+                "contact_phone": contact[6], "contact_type": contact[7],
+                "notes": rng.choice([None, "Interested in demo", "Follow up next week", "Hot lead"]),
+                "scanned_at": _iso(now - timedelta(minutes=rng.randint(0, 60 * 24 * 3)))
+            }
+    _insert_batched(db.leads, lead_docs())
+
+    return {
+        "tenant_id": tenant_id,
+        "email": email,
+        "password": DEFAULT_PASSWORD,
+        "event_ids": event_ids,
+        "template_ids": template_ids,
+        "sample_contact_ids": [c[0] for c in rng.sample(contacts, min(len(contacts), 2000))],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a local MongoDB with production-scale synthetic data")
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017")
+    parser.add_argument("--db-name", default="eventpass_perf")
+    parser.add_argument("--tenants", type=int, default=1)
+    parser.add_argument("--events", type=int, default=2, help="Events per tenant")
+    parser.add_argument("--contacts", type=int, default=100_000, help="Contacts per tenant")
+    parser.add_argument("--orders", type=int, default=20_000, help="Orders per tenant")
+    parser.add_argument("--leads", type=int, default=50_000, help="Leads per tenant")
+    parser.add_argument("--scanners", type=int, default=10, help="Users the leads are spread over")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--drop", action="store_true", help="Drop the database first")
+    parser.add_argument("--manifest", default="tests/perf/manifest.json")
+    args = parser.parse_args()
+
+    client = MongoClient(args.mongo_url)
+    if args.drop:
+        client.drop_database(args.db_name)
+    db = client[args.db_name]
+    rng = random.Random(args.seed)
+    qr_pool = _qr_pool()
+    password_hash = CryptContext(schemes=["bcrypt"], deprecated="auto").hash(DEFAULT_PASSWORD)
+
+    start = time.perf_counter()
+    tenants = []
+    for i in range(args.tenants):
+        tenants.append(seed_tenant(db, rng, qr_pool, password_hash, i, args))
+        print(f"Seeded tenant {i + 1}/{args.tenants} ({time.perf_counter() - start:.1f}s)")
+
+    with open(args.manifest, "w") as f:
+        json.dump({"db_name": args.db_name, "tenants": tenants}, f, indent=2)
+    print(f"Wrote manifest to {args.manifest}")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
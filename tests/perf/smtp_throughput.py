@@ -0,0 +1,108 @@
+"""SMTP pool throughput check for campaign delivery.
+
+Sends messages through ``EMAIL_SMTP_POOL_SIZE`` pooled connections to a local aiosmtpd
+stand-in and fails when the rate falls below the target (10k messages/min by default)
+or when the pool opens more connections than it has slots.
+
+Usage:
+    python -m tests.perf.smtp_throughput
+    python -m tests.perf.smtp_throughput --messages 5000 --target-per-min 12000
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+DEFAULT_MESSAGES = 2000
+DEFAULT_TARGET_PER_MIN = 10000
+
+
+class CountingHandler:
+    def __init__(self):
+        self.delivered = 0
+        self.peers = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.peers.add(session.peer)
+        self.delivered += 1
+        return "250 Message accepted"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def deliver(config: dict, count: int) -> tuple:
+    """Returns (seconds taken, number of failed deliveries)"""
+    from admission import TokenBucket
+    from mailer import EMAIL_SMTP_POOL_SIZE, SMTPSender, _smtp_worker, compile_templates
+
+    class Results:
+        failed = 0
+
+        async def record(self, contact, attempts, error):
+            if error:
+                self.failed += 1
+
+    templates = compile_templates("Welcome {{ first_name }}", "See you there, {{ name }}")
+    queue: asyncio.Queue = asyncio.Queue()
+    for n in range(count):
+        queue.put_nowait({"name": f"Guest {n}", "email": f"guest{n}@example.com"})
+    for _ in range(EMAIL_SMTP_POOL_SIZE):
+        queue.put_nowait(None)
+    results = Results()
+    # The bucket holds every token up front: this measures the pool, not the rate limit
+    bucket = TokenBucket(count * 60, capacity=count)
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        _smtp_worker(queue, SMTPSender(config), bucket, templates, "events@example.com", results)
+        for _ in range(EMAIL_SMTP_POOL_SIZE)
+    ])
+    return time.perf_counter() - start, results.failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if the SMTP pool delivers below the target rate")
+    parser.add_argument("--messages", type=int, default=DEFAULT_MESSAGES)
+    parser.add_argument("--target-per-min", type=float, default=DEFAULT_TARGET_PER_MIN)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    # Motor connects lazily, so no database is needed to import the mailer
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", "smtp_throughput")
+    from aiosmtpd.controller import Controller
+    from mailer import EMAIL_SMTP_POOL_SIZE
+
+    handler = CountingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    try:
+        config = {"smtp_host": "127.0.0.1", "smtp_port": str(controller.port)}
+        elapsed, failed = asyncio.run(deliver(config, args.messages))
+    finally:
+        controller.stop()
+
+    rate = args.messages / elapsed * 60
+    print(f"Delivered {handler.delivered}/{args.messages} messages in {elapsed:.2f}s: {rate:.0f}/min "
+          f"(target {args.target_per_min:.0f}/min) over {len(handler.peers)} connections")
+    failures = []
+    if failed or handler.delivered != args.messages:
+        failures.append(f"{args.messages - handler.delivered} messages were not delivered")
+    if len(handler.peers) > EMAIL_SMTP_POOL_SIZE:
+        failures.append(f"opened {len(handler.peers)} connections for a pool of {EMAIL_SMTP_POOL_SIZE}")
+    if rate < args.target_per_min:
+        failures.append(f"throughput is {args.target_per_min - rate:.0f} messages/min below target")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+import admission
+from admission import TokenBucket
+
+
+class FakeClock:
+    """Stands in for time.monotonic and asyncio.sleep: sleeping only advances the clock"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+        await _real_sleep(0)
+
+
+_real_sleep = asyncio.sleep
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(admission, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(admission.asyncio, "sleep", clock.sleep)
+    return clock
+
+
+def test_burst_up_to_capacity_is_immediate(clock):
+    async def scenario():
+        bucket = TokenBucket(60, capacity=5)
+        for _ in range(5):
+            await bucket.acquire()
+
+    asyncio.run(scenario())
+    assert clock.sleeps == []
+
+
+def test_waits_for_refill_once_empty(clock):
+    async def scenario():
+        bucket = TokenBucket(600, capacity=2)  # 10 tokens/s
+        await bucket.acquire(2)
+        await bucket.acquire()
+
+    asyncio.run(scenario())
+    assert clock.sleeps == [pytest.approx(0.1)]
+
+
+def test_acquiring_several_tokens_waits_for_all_of_them(clock):
+    async def scenario():
+        bucket = TokenBucket(1200, capacity=4)  # 20 tokens/s
+        await bucket.acquire(4)
+        await bucket.acquire(4)
+
+    asyncio.run(scenario())
+    assert sum(clock.sleeps) == pytest.approx(0.2)
+
+
+def test_never_exceeds_capacity_after_idling(clock):
+    async def scenario():
+        bucket = TokenBucket(6000, capacity=3)
+        clock.now += 10  # would refill 1000 tokens without the cap
+        await bucket.acquire()
+        return bucket.tokens
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_waiters_are_served_in_arrival_order(clock):
+    async def scenario():
+        bucket = TokenBucket(960, capacity=1)  # 16 tokens/s, so waits are exact in binary
+        await bucket.acquire()
+        served = []
+
+        async def waiter(n):
+            await bucket.acquire()
+            served.append((n, clock.now))
+
+        start = clock.now
+        await asyncio.gather(*[waiter(n) for n in range(5)])
+        return [(n, at - start) for n, at in served]
+
+    assert asyncio.run(scenario()) == [(0, 0.0625), (1, 0.125), (2, 0.1875), (3, 0.25), (4, 0.3125)]
+
+
+def test_default_capacity_is_one_second_of_rate():
+    assert TokenBucket(120).capacity == 2
+    assert TokenBucket(30).capacity == 1
@@ -0,0 +1,105 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("bson")
+pytest.importorskip("zstandard")
+
+from bson import ObjectId
+
+import cold_storage
+from cold_storage import (
+    ArchiveNotFound, CollectionWriter, archived_id_range, event_archive_dir, iter_archive, read_manifest,
+    write_manifest
+)
+
+
+@pytest.fixture(autouse=True)
+def archive_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cold_storage, "ARCHIVE_DIR", tmp_path)
+    return tmp_path
+
+
+def make_contacts(count):
+    return [
+        {
+            "_id": ObjectId(),
+            "contact_id": f"c-{n}",
+            "name": f"Guest {n}",
+            "type": "vip" if n % 10 == 0 else "attendee",
+            "custom_data": {"table": n % 5, "diet": None},
+            # Naive UTC, as Motor returns dates and as the archive reads them back
+            "registered_at": datetime(2026, 3, 1, 9, n % 60),
+        }
+        for n in range(count)
+    ]
+
+
+def archive(docs, tenant_id="t1", event_id="e1"):
+    async def scenario():
+        writer = CollectionWriter(event_archive_dir(tenant_id, event_id), "contacts")
+        for i in range(0, len(docs), 1000):
+            await writer.write_many(docs[i:i + 1000])
+        files = {"contacts": writer.close()}
+        return write_manifest(event_archive_dir(tenant_id, event_id), tenant_id, {"event_id": event_id}, files)
+    return asyncio.run(scenario())
+
+
+def read_back(match=None, projection_exclude=()):
+    async def scenario():
+        return [doc async for doc in iter_archive("t1", "e1", "contacts", match, projection_exclude)]
+    return asyncio.run(scenario())
+
+
+def test_round_trip_keeps_ids_dates_and_order():
+    docs = make_contacts(2500)
+    manifest = archive(docs)
+    assert manifest["files"]["contacts"]["count"] == 2500
+    assert read_manifest("t1", "e1")["files"] == manifest["files"]
+
+    restored = read_back()
+    assert restored == docs
+    assert isinstance(restored[0]["_id"], ObjectId)
+    assert isinstance(restored[0]["registered_at"], datetime)
+
+
+def test_reads_drop_excluded_fields_by_default():
+    archive(make_contacts(3))
+
+    async def scenario():
+        return [doc async for doc in iter_archive("t1", "e1", "contacts")]
+    assert all("_id" not in doc for doc in asyncio.run(scenario()))
+
+
+def test_match_filters_while_streaming():
+    archive(make_contacts(100))
+    assert len(read_back({"type": "vip"})) == 10
+    assert len(read_back({"custom_data.table": {"$in": [0, 1]}})) == 40
+    assert len(read_back({"$and": [{"name": {"$regex": "^Guest 1"}}, {"custom_data.table": {"$gte": 3}}]})) == 4
+    assert len(read_back({"custom_data.diet": {"$exists": True}, "company": {"$exists": False}})) == 100
+    assert read_back({"custom_data.table": {"$gt": "2"}}) == []  # numbers and strings never compare
+
+
+def test_last_id_bounds_what_may_be_deleted():
+    docs = make_contacts(5)
+    manifest = archive(docs)
+    assert archived_id_range(manifest["files"]["contacts"]) == {"_id": {"$lte": max(d["_id"] for d in docs)}}
+    assert archived_id_range({"count": 0, "last_id": None}) == {"_id": {"$exists": False}}
+
+
+def test_aborted_writer_publishes_nothing(archive_dir):
+    async def scenario():
+        writer = CollectionWriter(event_archive_dir("t1", "e1"), "contacts")
+        await writer.write_many(make_contacts(3))
+        writer.abort()
+    asyncio.run(scenario())
+    assert list((archive_dir / "t1" / "e1").iterdir()) == []
+    with pytest.raises(ArchiveNotFound):
+        read_manifest("t1", "e1")
+
+
+def test_archive_ids_cannot_escape_the_archive_dir():
+    for bad in ("../other", "a/b", ""):
+        with pytest.raises(ValueError):
+            event_archive_dir("t1", bad)
@@ -0,0 +1,86 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+
+from fastapi import HTTPException
+
+from models import ContactCreate, ContactFilter
+from routers.contacts import contact_content, contact_content_hash, contact_key_fields, filter_condition
+
+
+def contact(**overrides):
+    fields = {"event_id": "e1", "type": "attendee", "name": "Ada Lovelace", "email": "Ada@Example.com "}
+    fields.update(overrides)
+    return ContactCreate.model_validate(fields)
+
+
+# ===== CONTENT HASH =====
+
+def test_content_hash_ignores_key_order():
+    fields = contact_content(contact(custom_data={"diet": "veg", "table": 7}))
+    reordered = dict(reversed(list(fields.items())))
+    reordered["custom_data"] = {"table": 7, "diet": "veg"}
+    assert contact_content_hash(fields) == contact_content_hash(reordered)
+
+
+def test_content_hash_changes_with_any_feed_field():
+    base = contact_content_hash(contact_content(contact()))
+    assert contact_content_hash(contact_content(contact(company="AE"))) != base
+    assert contact_content_hash(contact_content(contact(custom_data={"table": 7}))) != base
+    assert contact_content_hash(contact_content(contact(external_id="reg-1"))) != base
+
+
+def test_missing_custom_data_hashes_like_empty():
+    assert contact_content_hash(contact_content(contact(custom_data=None))) == \
+        contact_content_hash(contact_content(contact(custom_data={})))
+
+
+def test_key_is_external_id_or_normalized_email():
+    assert contact_key_fields(contact_content(contact())) == {
+        "external_id": None, "email_normalized": "ada@example.com"
+    }
+    assert contact_key_fields(contact_content(contact(external_id="reg-1"))) == {
+        "external_id": "reg-1", "email_normalized": None
+    }
+
+
+# ===== FILTERS =====
+
+def test_eq_coerces_to_the_declared_type():
+    assert filter_condition(ContactFilter(field="custom_data.table", value="7", value_type="number")) == \
+        {"custom_data.table": 7.0}
+    assert filter_condition(ContactFilter(field="type", value="vip")) == {"type": "vip"}
+
+
+def test_comparison_and_membership_operators():
+    assert filter_condition(ContactFilter(field="checked_in_at", op="gte", value="2026-03-01")) == \
+        {"checked_in_at": {"$gte": "2026-03-01"}}
+    assert filter_condition(ContactFilter(field="type", op="nin", value=["vip", "media"])) == \
+        {"type": {"$nin": ["vip", "media"]}}
+    assert filter_condition(ContactFilter(field="custom_data.vegan", op="in", value=["yes", True],
+                                          value_type="boolean")) == {"custom_data.vegan": {"$in": [True, True]}}
+
+
+def test_exists_defaults_to_true():
+    assert filter_condition(ContactFilter(field="checked_in_at", op="exists")) == {"checked_in_at": {"$exists": True}}
+    assert filter_condition(ContactFilter(field="checked_in_at", op="exists", value="false")) == \
+        {"checked_in_at": {"$exists": False}}
+
+
+def test_prefix_is_escaped():
+    assert filter_condition(ContactFilter(field="name", op="prefix", value="A.* (")) == \
+        {"name": {"$regex": r"^A\.\*\ \("}}
+
+
+@pytest.mark.parametrize("bad", [
+    ContactFilter(field="qr_code", value="x"),                              # not a queryable field
+    ContactFilter(field="custom_data.$where", value="x"),                   # operator smuggled into a key
+    ContactFilter(field="type", op="in", value="vip"),                      # membership without a list
+    ContactFilter(field="custom_data.table", value="seven", value_type="number"),
+    ContactFilter(field="custom_data.table", value=True, value_type="number"),
+])
+def test_invalid_filters_are_400s(bad):
+    with pytest.raises(HTTPException) as e:
+        filter_condition(bad)
+    assert e.value.status_code == 400
@@ -0,0 +1,192 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("motor")
+
+from pymongo.errors import AutoReconnect
+
+import jobs
+from jobs import claim_job, enqueue_job, fail_job, worker_loop
+
+OPERATORS = {
+    "$in": lambda value, arg: value in arg,
+    "$nin": lambda value, arg: value not in arg,
+    "$lt": lambda value, arg: value is not None and value < arg,
+    "$lte": lambda value, arg: value is not None and value <= arg,
+    "$gte": lambda value, arg: value is not None and value >= arg,
+}
+
+
+def matches(doc, query):
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, branch) for branch in condition):
+                return False
+        elif isinstance(condition, dict):
+            if not all(OPERATORS[op](doc.get(key), arg) for op, arg in condition.items()):
+                return False
+        elif doc.get(key) != condition:
+            return False
+    return True
+
+
+class FakeJobs:
+    """The jobs collection calls the queue makes, over a list of dicts"""
+
+    def __init__(self):
+        self.docs = []
+
+    async def insert_one(self, doc):
+        self.docs.append(dict(doc))
+
+    async def find_one_and_update(self, query, update, sort, projection=None, return_document=None):
+        found = [doc for doc in self.docs if matches(doc, query)]
+        for key, direction in reversed(sort):
+            found.sort(key=lambda doc: doc[key], reverse=direction < 0)
+        if not found:
+            return None
+        doc = found[0]
+        doc.update(update["$set"])
+        for key, by in update.get("$inc", {}).items():
+            doc[key] += by
+        return dict(doc)
+
+    async def update_one(self, query, update):
+        for doc in self.docs:
+            if matches(doc, query):
+                doc.update(update["$set"])
+                return
+
+
+class FakeDb:
+    def __init__(self):
+        self.jobs = FakeJobs()
+
+    def get_collection(self, name, write_concern=None):
+        return getattr(self, name)
+
+
+def ago(seconds):
+    return (datetime.now(timezone.utc) - timedelta(seconds=seconds)).isoformat()
+
+
+def job_doc(db, job_id):
+    return next(doc for doc in db.jobs.docs if doc["job_id"] == job_id)
+
+
+# ===== CLAIMING =====
+
+def test_claims_by_priority_then_oldest_run_at():
+    db = FakeDb()
+
+    async def scenario():
+        low = await enqueue_job(db, "export", "t1", {}, priority=jobs.PRIORITY_LOW)
+        older = await enqueue_job(db, "export", "t1", {})
+        newer = await enqueue_job(db, "export", "t1", {})
+        high = await enqueue_job(db, "export", "t1", {}, priority=jobs.PRIORITY_HIGH)
+        job_doc(db, older)["run_at"] = ago(60)
+        order = []
+        while (job := await claim_job(db, "w1", ["export"], tenant_cap=False)) is not None:
+            order.append(job["job_id"])
+        return order, [high, older, newer, low]
+
+    claimed, expected = asyncio.run(scenario())
+    assert claimed == expected
+
+
+def test_skips_other_types_and_jobs_not_yet_due():
+    db = FakeDb()
+
+    async def scenario():
+        await enqueue_job(db, "badge_print", "t1", {})
+        later = await enqueue_job(db, "export", "t1", {})
+        job_doc(db, later)["run_at"] = (datetime.now(timezone.utc) + timedelta(minutes=1)).isoformat()
+        return await claim_job(db, "w1", ["export"], tenant_cap=False)
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_reclaims_running_jobs_whose_lease_expired():
+    db = FakeDb()
+
+    async def scenario():
+        crashed = await enqueue_job(db, "export", "t1", {})
+        alive = await enqueue_job(db, "export", "t1", {})
+        for job_id, lease in [(crashed, ago(5)), (alive, ago(-30))]:
+            job_doc(db, job_id).update(status="running", worker_id="w0", attempts=1, lease_expires_at=lease)
+        job = await claim_job(db, "w1", ["export"], tenant_cap=False)
+        again = await claim_job(db, "w2", ["export"], tenant_cap=False)
+        return crashed, job, again
+
+    crashed, job, again = asyncio.run(scenario())
+    assert (job["job_id"], job["worker_id"], job["attempts"], job["status"]) == (crashed, "w1", 2, "running")
+    assert job["lease_expires_at"] > datetime.now(timezone.utc).isoformat()
+    # The other job's worker is still heartbeating
+    assert again is None
+
+
+# ===== FAILURES =====
+
+def test_failed_attempt_is_requeued_with_exponential_backoff():
+    db = FakeDb()
+
+    async def scenario():
+        job_id = await enqueue_job(db, "export", "t1", {})
+        job = await claim_job(db, "w1", ["export"], tenant_cap=False)
+        job_doc(db, job_id)["attempts"] = job["attempts"] = 2
+        before = datetime.now(timezone.utc)
+        await fail_job(db, job, "SMTP timeout")
+        return job_doc(db, job_id), before
+
+    doc, before = asyncio.run(scenario())
+    assert (doc["status"], doc["error"], doc["lease_expires_at"]) == ("queued", "SMTP timeout", None)
+    delay = datetime.fromisoformat(doc["run_at"]) - before
+    assert timedelta(seconds=jobs.JOB_RETRY_BASE_DELAY * 2) <= delay < timedelta(seconds=jobs.JOB_RETRY_BASE_DELAY * 2 + 5)
+
+
+@pytest.mark.parametrize("attempts, permanent", [(1, True), (3, False)])
+def test_permanent_errors_and_the_last_attempt_fail_the_job(attempts, permanent):
+    db = FakeDb()
+
+    async def scenario():
+        job_id = await enqueue_job(db, "export", "t1", {}, max_attempts=3)
+        job = await claim_job(db, "w1", ["export"], tenant_cap=False)
+        job_doc(db, job_id)["attempts"] = job["attempts"] = attempts
+        await fail_job(db, job, "Event not found", permanent=permanent)
+        return job_doc(db, job_id)
+
+    doc = asyncio.run(scenario())
+    assert (doc["status"], doc["error"]) == ("failed", "Event not found")
+    assert doc["completed_at"] is not None
+
+
+# ===== WORKER LOOP =====
+
+def test_worker_loop_backs_off_on_database_errors(monkeypatch):
+    stop = asyncio.Event()
+    claims, delays = [], []
+
+    async def flaky_claim(db, worker_id, job_types, tenant_cap):
+        claims.append(worker_id)
+        if len(claims) <= 3:
+            raise AutoReconnect("primary stepped down")
+        return {"job_id": "j1", "type": "export"}
+
+    async def run_and_stop(db, job):
+        stop.set()
+
+    real_wait_for = asyncio.wait_for
+
+    async def recording_wait_for(awaitable, timeout):
+        delays.append(timeout)
+        return await real_wait_for(awaitable, 0)
+
+    monkeypatch.setattr(jobs, "claim_job", flaky_claim)
+    monkeypatch.setattr(jobs, "run_job", run_and_stop)
+    monkeypatch.setattr(jobs.asyncio, "wait_for", recording_wait_for)
+
+    asyncio.run(worker_loop(FakeDb(), "w1", stop, ["export"], poll_interval=1))
+    assert len(claims) == 4
+    assert delays == [1, 2, 4]
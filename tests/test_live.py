@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+pytest.importorskip("pymongo")
+
+from pymongo.errors import OperationFailure
+
+import live
+from live import EventFeed, history_lost
+
+
+class FakeStream:
+    def __init__(self, error):
+        self.error = error
+        self.resume_token = None
+
+    async def __aenter__(self):
+        raise self.error
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeDb:
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.resume_tokens = []
+
+    def watch(self, pipeline, full_document=None, resume_after=None):
+        self.resume_tokens.append(resume_after)
+        return FakeStream(self.errors.pop(0))
+
+
+class FakeHub:
+    def __init__(self, db):
+        self.db = db
+
+
+def run_watch(monkeypatch, errors, resume_token=None):
+    """Run the feed's watch loop through `errors`, returning (feed, db, sleeps)."""
+    db = FakeDb(errors)
+    feed = EventFeed(FakeHub(db), "t1", "e1")
+    feed.resume_token = resume_token
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+        if not db.errors:
+            raise asyncio.CancelledError
+
+    monkeypatch.setattr(live.asyncio, "sleep", fake_sleep)
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(feed._watch())
+    return feed, db, sleeps
+
+
+def test_history_lost_codes():
+    assert history_lost(OperationFailure("gone", code=286), resuming=False)
+    assert history_lost(OperationFailure("token not found", code=280), resuming=True)
+    assert not history_lost(OperationFailure("fatal", code=280), resuming=False)
+    assert not history_lost(OperationFailure("unauthorized", code=13), resuming=True)
+
+
+def test_other_failures_back_off_without_resync(monkeypatch):
+    errors = [OperationFailure("unauthorized", code=13) for _ in range(7)]
+    feed, db, sleeps = run_watch(monkeypatch, errors, resume_token={"_data": "abc"})
+    assert sleeps == [2, 4, 8, 16, 32, 60, 60]
+    assert feed.seq == 0 and not feed.replay
+    # The token is kept, so the stream resumes where it was once the failure clears
+    assert db.resume_tokens == [{"_data": "abc"}] * 7
+
+
+def test_lost_history_resyncs_and_starts_fresh(monkeypatch):
+    errors = [OperationFailure("history lost", code=286), OperationFailure("unauthorized", code=13)]
+    feed, db, sleeps = run_watch(monkeypatch, errors, resume_token={"_data": "abc"})
+    assert [message["type"] for message in feed.replay] == ["resync"]
+    assert db.resume_tokens == [{"_data": "abc"}, None]
+    assert sleeps == [2, 4]
@@ -0,0 +1,232 @@
+import asyncio
+import socket
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("aiosmtplib")
+controller_module = pytest.importorskip("aiosmtpd.controller")
+
+import mailer
+from admission import TokenBucket
+from mailer import (
+    EMAIL_SMTP_POOL_SIZE, PermanentEmailError, SMTPSender, TransientEmailError, _smtp_worker, compile_templates,
+    render_message, send_campaign, send_with_retry
+)
+
+REJECTED = "bounce@example.com"
+
+
+class RecordingHandler:
+    """aiosmtpd handler keeping every envelope and the connections it arrived on"""
+
+    def __init__(self):
+        self.messages = []
+        self.peers = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address == REJECTED:
+            return "550 5.1.1 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.peers.add(session.peer)
+        self.messages.append((envelope.rcpt_tos[0], envelope.content.decode("utf-8", "replace")))
+        return "250 Message accepted"
+
+
+class RecordingState:
+    def __init__(self):
+        self.records = []
+
+    async def record(self, contact, attempts, error):
+        self.records.append((contact["email"], attempts, error))
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def batch_size(self, size):
+        return self
+
+    async def __aiter__(self):
+        for doc in self.docs:
+            yield doc
+
+
+class FakeCollection:
+    """The handful of Motor calls send_campaign makes, over a list of dicts"""
+
+    def __init__(self, docs=()):
+        self.docs = [dict(doc) for doc in docs]
+
+    def _matching(self, query):
+        return [doc for doc in self.docs if all(doc.get(k) == v for k, v in query.items())]
+
+    async def find_one(self, query, projection=None):
+        found = self._matching(query)
+        return dict(found[0]) if found else None
+
+    def find(self, query, projection=None):
+        return FakeCursor(self._matching(query))
+
+    async def count_documents(self, query):
+        return len(self._matching(query))
+
+    async def distinct(self, field, query):
+        return list({doc[field] for doc in self._matching(query)})
+
+    def aggregate(self, pipeline):
+        match, group = pipeline[0]["$match"], pipeline[1]["$group"]
+        field = group["_id"].lstrip("$")
+        counts = {}
+        for doc in self._matching(match):
+            counts[doc[field]] = counts.get(doc[field], 0) + 1
+        return FakeCursor([{"_id": key, "count": count} for key, count in counts.items()])
+
+    async def update_one(self, query, update, upsert=False):
+        found = self._matching(query)
+        if not found and upsert:
+            found = [dict(query)]
+            self.docs.append(found[0])
+        for doc in found[:1]:
+            doc.update(update.get("$set", {}))
+            for key, by in update.get("$inc", {}).items():
+                doc[key] = doc.get(key, 0) + by
+
+    async def bulk_write(self, ops, ordered=True):
+        for op in ops:
+            await self.update_one(op._filter, op._doc, upsert=op._upsert)
+
+
+class FakeDb:
+    def __init__(self, **collections):
+        self.collections = {name: FakeCollection(docs) for name, docs in collections.items()}
+
+    def __getattr__(self, name):
+        return self.collections.setdefault(name, FakeCollection())
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = controller_module.Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    try:
+        yield handler, {"smtp_host": "127.0.0.1", "smtp_port": str(controller.port)}
+    finally:
+        controller.stop()
+
+
+def test_render_message_merges_custom_data_and_first_name():
+    templates = compile_templates("Hi {{ first_name }}", "Table {{ table }} for {{ name }} at {{ company }}")
+    contact = {"name": "Ada Lovelace", "email": "ada@example.com", "company": "AE", "custom_data": {"table": 7}}
+    msg = render_message(templates, contact, "events@example.com")
+    assert msg["To"] == "ada@example.com"
+    assert msg["Subject"] == "Hi Ada"
+    assert msg.get_content().strip() == "Table 7 for Ada Lovelace at AE"
+
+
+def test_templates_are_sandboxed():
+    templates = compile_templates("x", "{{ name.__class__.__mro__ }}")
+    with pytest.raises(Exception):
+        render_message(templates, {"name": "Ada", "email": "ada@example.com"}, "events@example.com")
+
+
+def test_send_with_retry_backs_off_on_transient_errors(monkeypatch):
+    monkeypatch.setattr(mailer, "EMAIL_RETRY_BASE_DELAY", 0)
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise TransientEmailError("421 try later")
+
+    assert asyncio.run(send_with_retry(flaky)) == (3, None)
+
+
+def test_send_with_retry_stops_on_permanent_errors(monkeypatch):
+    monkeypatch.setattr(mailer, "EMAIL_RETRY_BASE_DELAY", 0)
+
+    async def rejected():
+        raise PermanentEmailError("550 no such user")
+
+    assert asyncio.run(send_with_retry(rejected)) == (1, "550 no such user")
+
+
+def test_rejected_recipient_is_permanent_and_keeps_the_connection(smtp_server):
+    handler, config = smtp_server
+    templates = compile_templates("Hello", "Body")
+
+    async def scenario():
+        sender = SMTPSender(config)
+        try:
+            with pytest.raises(PermanentEmailError):
+                await sender.send(render_message(templates, {"name": "X", "email": REJECTED}, "events@example.com"))
+            await sender.send(render_message(templates, {"name": "Y", "email": "y@example.com"}, "events@example.com"))
+        finally:
+            await sender.close()
+
+    asyncio.run(scenario())
+    assert [rcpt for rcpt, _ in handler.messages] == ["y@example.com"]
+    assert len(handler.peers) == 1
+
+
+def test_smtp_pool_keeps_one_connection_per_slot(smtp_server):
+    # Throughput is measured by tests/perf/smtp_throughput.py, not here
+    handler, config = smtp_server
+    count = 200
+    contacts = [{"name": f"Guest {n}", "email": f"guest{n}@example.com"} for n in range(count)]
+    templates = compile_templates("Welcome {{ first_name }}", "See you there, {{ name }}")
+    state = RecordingState()
+
+    async def scenario():
+        queue = asyncio.Queue()
+        for contact in contacts:
+            queue.put_nowait(contact)
+        for _ in range(EMAIL_SMTP_POOL_SIZE):
+            queue.put_nowait(None)
+        bucket = TokenBucket(60000, capacity=count)
+        await asyncio.gather(*[
+            _smtp_worker(queue, SMTPSender(config), bucket, templates, "events@example.com", state)
+            for _ in range(EMAIL_SMTP_POOL_SIZE)
+        ])
+
+    asyncio.run(scenario())
+    assert sorted(rcpt for rcpt, _ in handler.messages) == sorted(c["email"] for c in contacts)
+    assert all(error is None and attempts == 1 for _, attempts, error in state.records)
+    # One persistent connection per pool slot, not one per message
+    assert len(handler.peers) == EMAIL_SMTP_POOL_SIZE
+
+
+def test_retried_campaign_only_emails_contacts_no_attempt_reached(smtp_server):
+    handler, config = smtp_server
+    campaign = {"campaign_id": "c1", "tenant_id": "t1", "event_id": "e1", "recipient_type": "all",
+                "subject": "Hello", "content": "See you, {{ name }}"}
+    contacts = [{"tenant_id": "t1", "event_id": "e1", "contact_id": f"p{n}", "name": f"Guest {n}",
+                 "email": f"guest{n}@example.com"} for n in range(5)]
+    earlier = [
+        {"campaign_id": "c1", "contact_id": "p0", "status": "sent"},
+        {"campaign_id": "c1", "contact_id": "p1", "status": "failed"},
+        {"campaign_id": "c1", "contact_id": "p2", "status": "sending"},  # claimed when the worker died
+    ]
+    db = FakeDb(
+        email_campaigns=[campaign], contacts=contacts, email_messages=earlier,
+        settings=[{"tenant_id": "t1", "email_config": config}]
+    )
+
+    asyncio.run(send_campaign(db, "c1"))
+
+    assert sorted(rcpt for rcpt, _ in handler.messages) == ["guest3@example.com", "guest4@example.com"]
+    messages = {doc["contact_id"]: doc["status"] for doc in db.email_messages.docs}
+    assert messages == {"p0": "sent", "p1": "failed", "p2": "sending", "p3": "sent", "p4": "sent"}
+    stored = db.email_campaigns.docs[0]
+    assert (stored["status"], stored["sent"], stored["failed"]) == ("completed", 3, 1)
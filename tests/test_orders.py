@@ -0,0 +1,130 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("motor")
+
+from routers import orders
+from routers.orders import ORDER_STATUSES, created_at_range, order_listing_pipeline, order_listing_query
+
+USER = {"tenant_id": "t1", "user_id": "u1", "role": "organiser_admin"}
+
+
+def order(n, status="paid", contact_id="c1", day=1):
+    return {
+        "order_id": f"o{n}", "tenant_id": "t1", "event_id": "e1", "contact_id": contact_id,
+        "items": [{"ticket_id": "k1", "name": "Old name", "price": 10}], "total_amount": 10, "currency": "usd",
+        "status": status, "stripe_session_id": None, "created_at": f"2026-03-{day:02d}T09:00:{n:02d}+00:00"
+    }
+
+
+class FakeAggregate:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs
+
+
+class FakeOrders:
+    def __init__(self, page, total):
+        self.page, self.total = page, total
+        self.pipeline = self.counted = None
+
+    def aggregate(self, pipeline):
+        self.pipeline = pipeline
+        return FakeAggregate(self.page)
+
+    async def count_documents(self, query):
+        self.counted = query
+        return self.total
+
+
+class FakeDb:
+    def __init__(self, **collections):
+        self.__dict__.update(collections)
+
+
+def list_orders(**params):
+    defaults = {"event_id": None, "status": None, "date_from": None, "date_to": None, "page": 1, "page_size": 50}
+    return asyncio.run(orders.list_orders(**{**defaults, **params}, current_user=USER))
+
+
+# ===== LIVE LISTING =====
+
+def test_query_filters_on_statuses_event_and_created_day_range():
+    created = created_at_range(date(2026, 3, 1), date(2026, 3, 2))
+    assert order_listing_query("t1", "e1", ["paid"], created) == {
+        "tenant_id": "t1", "status": {"$in": ["paid"]}, "event_id": "e1",
+        "created_at": {"$gte": "2026-03-01T00:00:00+00:00", "$lt": "2026-03-03T00:00:00+00:00"}
+    }
+    assert order_listing_query("t1", None, ORDER_STATUSES, {}) == {"tenant_id": "t1", "status": {"$in": ORDER_STATUSES}}
+
+
+def test_pipeline_pages_before_joining():
+    pipeline = order_listing_pipeline("t1", {"tenant_id": "t1"}, skip=40, limit=20)
+    stages = [next(iter(stage)) for stage in pipeline]
+    assert stages == ["$match", "$sort", "$skip", "$limit", "$project", "$lookup", "$lookup"]
+    assert pipeline[1:4] == [{"$sort": {"created_at": -1}}, {"$skip": 40}, {"$limit": 20}]
+    contacts, tickets = pipeline[5]["$lookup"], pipeline[6]["$lookup"]
+    assert (contacts["from"], contacts["localField"], contacts["as"]) == ("contacts", "contact_id", "contacts")
+    assert (tickets["from"], tickets["localField"], tickets["as"]) == ("tickets", "items.ticket_id", "tickets")
+    # Joins never reach another tenant's documents
+    assert contacts["pipeline"][0] == tickets["pipeline"][0] == {"$match": {"tenant_id": "t1"}}
+
+
+def test_listing_reports_the_total_of_the_whole_query(monkeypatch):
+    joined = {**order(1), "contacts": [{"contact_id": "c1", "name": "Ada"}], "tickets": [{"ticket_id": "k1", "name": "VIP"}]}
+    fake = FakeOrders(page=[joined], total=31)
+    monkeypatch.setattr(orders, "analytics_db", FakeDb(orders=fake))
+
+    result = list_orders(status=["paid", "pending"], date_from=date(2026, 3, 1), page=4, page_size=10)
+
+    assert (result.total, result.page, result.page_size) == (31, 4, 10)
+    assert fake.pipeline[2:4] == [{"$skip": 30}, {"$limit": 10}]
+    assert fake.counted == fake.pipeline[0]["$match"] == {
+        "tenant_id": "t1", "status": {"$in": ["paid", "pending"]}, "created_at": {"$gte": "2026-03-01T00:00:00+00:00"}
+    }
+    item = result.items[0]
+    assert (item.contact.name, item.ticket_names) == ("Ada", ["VIP"])
+
+
+def test_unknown_status_is_a_400():
+    with pytest.raises(orders.HTTPException) as e:
+        list_orders(status=["shipped"])
+    assert e.value.status_code == 400
+
+
+# ===== ARCHIVED LISTING =====
+
+def test_archived_page_filters_sorts_and_slices(monkeypatch):
+    archived = {
+        "orders": [order(n, day=n, status="refunded" if n == 3 else "paid") for n in range(1, 8)],
+        "contacts": [{"contact_id": "c1", "name": "Ada", "email": "ada@example.com", "qr_code": "x"}],
+    }
+    requested = []
+
+    async def archived_documents(tenant_id, event_id, collection, match, limit):
+        requested.append((collection, match))
+        if collection == "orders":
+            return [o for o in archived["orders"] if o["status"] in match["status"]["$in"]]
+        return [c for c in archived["contacts"] if c["contact_id"] in match["contact_id"]["$in"]]
+
+    class Tickets:
+        def find(self, query, projection):
+            return FakeAggregate([{"ticket_id": "k1", "name": "VIP"}])
+
+    monkeypatch.setattr(orders, "archived_documents", archived_documents)
+    monkeypatch.setattr(orders, "db", FakeDb(tickets=Tickets()))
+
+    # Paid orders from March 2nd to 6th, newest first: o6, o5, o4, o2; the second page of two
+    created = created_at_range(date(2026, 3, 2), date(2026, 3, 6))
+    items, total = asyncio.run(orders.archived_order_page("t1", "e1", ["paid"], created, skip=2, limit=2))
+
+    assert total == 4
+    assert [item.order_id for item in items] == ["o4", "o2"]
+    assert items[0].contact.model_dump() == {"contact_id": "c1", "name": "Ada", "email": "ada@example.com", "company": None}
+    assert items[0].ticket_names == ["VIP"]
+    assert requested[1] == ("contacts", {"contact_id": {"$in": ["c1"]}})
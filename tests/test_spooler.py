@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+import spooler
+from fake_printer import FakePrinter
+from spooler import PrintSpooler, PrinterUnavailable, parse_printers
+
+
+def label(n: int) -> str:
+    return f"^XA^FO50,50^A0N,40,40^FDContact {n}^FS^XZ"
+
+
+def test_parse_printers():
+    assert parse_printers("desk=10.0.0.21, hall = 10.0.0.22:6101,") == {
+        "desk": ("10.0.0.21", 9100),
+        "hall": ("10.0.0.22", 6101),
+    }
+    with pytest.raises(ValueError):
+        parse_printers("desk")
+
+
+def test_labels_arrive_in_submission_order_over_one_connection():
+    async def scenario():
+        async with FakePrinter() as printer:
+            print_spooler = PrintSpooler({"desk": ("127.0.0.1", printer.port)})
+            labels = [label(n) for n in range(50)]
+            await asyncio.gather(*[print_spooler.submit("desk", zpl.encode()) for zpl in labels])
+            await printer.wait_for_labels(len(labels))
+            stats = print_spooler.stats()["desk"]
+            await print_spooler.close()
+            return printer, labels, stats
+
+    printer, labels, stats = asyncio.run(scenario())
+    assert bytes(printer.data) == "".join(labels).encode()
+    assert printer.labels == labels
+    assert printer.connections == 1
+    assert stats["sent"] == 50 and stats["failed"] == 0 and stats["connections_opened"] == 1
+
+
+def test_each_printer_gets_only_its_labels():
+    async def scenario():
+        async with FakePrinter() as desk, FakePrinter() as hall:
+            print_spooler = PrintSpooler({"desk": ("127.0.0.1", desk.port), "hall": ("127.0.0.1", hall.port)})
+            await asyncio.gather(*[
+                print_spooler.submit("desk" if n % 2 else "hall", label(n).encode()) for n in range(10)
+            ])
+            await desk.wait_for_labels(5)
+            await hall.wait_for_labels(5)
+            await print_spooler.close()
+            return desk.labels, hall.labels
+
+    desk_labels, hall_labels = asyncio.run(scenario())
+    assert desk_labels == [label(n) for n in range(1, 10, 2)]
+    assert hall_labels == [label(n) for n in range(0, 10, 2)]
+
+
+def test_reconnects_after_the_printer_drops_the_connection():
+    async def scenario():
+        async with FakePrinter() as printer:
+            print_spooler = PrintSpooler({"desk": ("127.0.0.1", printer.port)})
+            await print_spooler.submit("desk", label(1).encode())
+            await printer.wait_for_labels(1)
+            printer.drop_connections()
+            await asyncio.sleep(0.1)  # let the client see the EOF
+            await print_spooler.submit("desk", label(2).encode())
+            await printer.wait_for_labels(2)
+            await print_spooler.close()
+            return printer
+
+    printer = asyncio.run(scenario())
+    assert printer.labels == [label(1), label(2)]
+    assert printer.connections == 2
+
+
+def test_unreachable_printer_raises_after_retries(monkeypatch):
+    monkeypatch.setattr(spooler, "PRINT_RETRY_DELAY", 0)
+
+    async def scenario():
+        # Bind and release a port so nothing is listening on it
+        printer = await FakePrinter().start()
+        port = printer.port
+        await printer.stop()
+        print_spooler = PrintSpooler({"desk": ("127.0.0.1", port)})
+        try:
+            with pytest.raises(PrinterUnavailable):
+                await print_spooler.submit("desk", label(1).encode())
+            return print_spooler.stats()["desk"]
+        finally:
+            await print_spooler.close()
+
+    stats = asyncio.run(scenario())
+    assert stats["failed"] == 1 and stats["sent"] == 0
+
+
+def test_unknown_printer_is_a_key_error():
+    async def scenario():
+        with pytest.raises(KeyError):
+            await PrintSpooler({}).submit("nowhere", label(1).encode())
+
+    asyncio.run(scenario())
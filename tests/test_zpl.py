@@ -0,0 +1,64 @@
+import pytest
+
+from zpl import DEFAULT_DPI, escape_field_data, qr_command, render_badge_zpl, render_badges_zpl
+
+TEMPLATE = {
+    "width": 400,
+    "height": 600,
+    "elements": [
+        {"id": "1", "type": "text", "content": "GROW UP 2026", "x": 40, "y": 60, "fontSize": 18},
+        {"id": "2", "type": "field", "content": "name", "x": 40, "y": 300, "fontSize": 24},
+        {"id": "3", "type": "qrcode", "content": "", "x": 100, "y": 400, "width": 1},
+        {"id": "4", "type": "image", "content": "0" * 64, "x": 0, "y": 0},
+    ],
+}
+CONTACT = {"contact_id": "c-1", "name": "Ada Lovelace"}
+
+
+def test_escape_field_data_hex_escapes_control_prefixes():
+    assert escape_field_data("R&D ^ ~ _") == "R&D _5E _7E _5F"
+    assert escape_field_data("Zoë") == "Zoë"
+
+
+def test_label_frame_matches_a_4x6_badge():
+    lines = render_badge_zpl(TEMPLATE, CONTACT).splitlines()
+    assert lines[:5] == ["^XA", "^CI28", f"^PW{4 * DEFAULT_DPI}", f"^LL{6 * DEFAULT_DPI}", "^LH0,0"]
+    assert lines[-1] == "^XZ"
+
+
+def test_text_and_fields_are_scaled_and_placed_by_baseline():
+    zpl = render_badge_zpl(TEMPLATE, CONTACT, dpi=300)
+    # x 40/400 of 4in at 300dpi = 120 dots; 18pt at 300dpi = 75 dots
+    assert "^FT120,180^A0N,75,75^FH^FDGROW UP 2026^FS" in zpl
+    assert "^FT120,900^A0N,100,100^FH^FDAda Lovelace^FS" in zpl
+
+
+def test_field_values_are_escaped():
+    zpl = render_badge_zpl(TEMPLATE, {"name": "^XZ injected"})
+    assert "^FD_5EXZ injected^FS" in zpl
+    assert zpl.count("^XZ") == 1
+
+
+def test_qr_is_skipped_without_data_and_images_never_render():
+    zpl = render_badge_zpl(TEMPLATE, CONTACT)
+    assert "^BQ" not in zpl
+    assert "0" * 64 not in zpl
+
+
+def test_qr_fills_its_box_inside_the_quiet_zone():
+    pytest.importorskip("qrcode")
+    data = "https://example.com/contact/c-1"
+    zpl = render_badge_zpl(TEMPLATE, CONTACT, qr_data=data)
+    assert f"^FH^FDHA,{data}^FS" in zpl
+    command = qr_command(0, 0, DEFAULT_DPI, data)
+    magnification = int(command.split("^BQN,2,")[1].split("^")[0])
+    offset = 4 * magnification
+    assert command.startswith(f"^FO{offset},{offset}")
+    assert 1 <= magnification <= 10
+
+
+def test_batch_is_one_label_per_contact_in_order():
+    contacts = [{"name": f"Contact {n}"} for n in range(3)]
+    zpl = render_badges_zpl(TEMPLATE, contacts, lambda contact: None)
+    assert zpl.count("^XA") == 3
+    assert [zpl.index(f"Contact {n}") for n in range(3)] == sorted(zpl.index(f"Contact {n}") for n in range(3))